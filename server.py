@@ -13,7 +13,7 @@ import sys
 from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 # Load .env file for local development (must be before other imports that use env vars)
 from dotenv import load_dotenv
@@ -507,6 +507,22 @@ async def verify_password(request: Request):
     return True
 
 
+# Dhan API dependencies (overridable in tests via app.dependency_overrides)
+def get_dhan_config() -> DhanConfig:
+    """Load the Dhan configuration for a request."""
+    try:
+        return DhanConfig.load()
+    except Exception as e:
+        logger.error(f"Error loading config: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def get_dhan_client(config: DhanConfig = Depends(get_dhan_config)) -> Iterator[DhanClient]:
+    """Create a Dhan API client for a request and close it afterwards."""
+    with DhanClient(config) as client:
+        yield client
+
+
 # Pydantic models for API responses
 class HealthResponse(BaseModel):
     status: str
@@ -617,11 +633,9 @@ async def health():
 # API Endpoints (password protected)
 
 @app.get("/api/holdings", response_model=PortfolioResponse, dependencies=[Depends(verify_password)])
-async def get_holdings():
+async def get_holdings(client: DhanClient = Depends(get_dhan_client)):
     """Get current portfolio holdings with LTP from NSE."""
     try:
-        config = DhanConfig.load()
-        client = DhanClient(config)
         holdings = client.get_holdings()
 
         if not holdings:
@@ -691,11 +705,12 @@ async def get_holdings():
 
 
 @app.get("/api/protection/status", response_model=ProtectionStatusResponse, dependencies=[Depends(verify_password)])
-async def get_protection_status():
+async def get_protection_status(
+    config: DhanConfig = Depends(get_dhan_config),
+    client: DhanClient = Depends(get_dhan_client),
+):
     """Get current protection status."""
     try:
-        config = DhanConfig.load()
-        client = DhanClient(config)
         protection_config = ProtectionConfig(
             stop_loss_from_high_percent=config.default_stop_loss_from_high_percent,
             stop_loss_percent=config.default_stop_loss_percent,
@@ -721,7 +736,12 @@ async def get_protection_status():
 
 
 @app.post("/api/protection/run", response_model=ProtectionRunResponse, dependencies=[Depends(verify_password)])
-async def run_protection(force: bool = True, background_tasks: BackgroundTasks = None):
+async def run_protection(
+    force: bool = True,
+    background_tasks: BackgroundTasks = None,
+    config: DhanConfig = Depends(get_dhan_config),
+    client: DhanClient = Depends(get_dhan_client),
+):
     """
     Manually trigger portfolio protection.
 
@@ -731,15 +751,13 @@ async def run_protection(force: bool = True, background_tasks: BackgroundTasks =
     global last_protection_run, last_protection_result
 
     try:
-        config = DhanConfig.load()
-        client = DhanClient(config)
         protection_config = ProtectionConfig(
             stop_loss_from_high_percent=config.default_stop_loss_from_high_percent,
             stop_loss_percent=config.default_stop_loss_percent,
         )
 
         protector = PortfolioProtector(client, protection_config)
-        results = protector.protect_portfolio(force=force)
+        results = await protector.protect_portfolio_async(force=force)
 
         success_count = sum(1 for r in results if r.success)
 
@@ -780,11 +798,9 @@ async def run_protection(force: bool = True, background_tasks: BackgroundTasks =
 
 
 @app.post("/api/protection/cancel", dependencies=[Depends(verify_password)])
-async def cancel_protection():
+async def cancel_protection(client: DhanClient = Depends(get_dhan_client)):
     """Cancel all existing protection orders (both Forever Orders and regular AMO orders)."""
     try:
-        config = DhanConfig.load()
-        client = DhanClient(config)
         protection_config = ProtectionConfig()
 
         protector = PortfolioProtector(client, protection_config)
@@ -837,7 +853,11 @@ async def cancel_protection():
 
 
 @app.post("/api/protection/run-amo", response_model=ProtectionRunResponse, dependencies=[Depends(verify_password)])
-async def run_amo_protection_api(amo_time: str = "OPEN"):
+async def run_amo_protection_api(
+    amo_time: str = "OPEN",
+    config: DhanConfig = Depends(get_dhan_config),
+    client: DhanClient = Depends(get_dhan_client),
+):
     """
     Manually trigger AMO (After Market Order) protection.
 
@@ -862,15 +882,13 @@ async def run_amo_protection_api(amo_time: str = "OPEN"):
         )
 
     try:
-        config = DhanConfig.load()
-        client = DhanClient(config)
         protection_config = ProtectionConfig(
             stop_loss_from_high_percent=config.default_stop_loss_from_high_percent,
             stop_loss_percent=config.default_stop_loss_percent,
         )
 
         protector = PortfolioProtector(client, protection_config)
-        results = protector.protect_portfolio_amo(amo_time=amo_time)
+        results = await protector.protect_portfolio_amo_async(amo_time=amo_time)
 
         success_count = sum(1 for r in results if r.success)
 
@@ -911,14 +929,11 @@ async def run_amo_protection_api(amo_time: str = "OPEN"):
 
 
 @app.get("/api/orders", dependencies=[Depends(verify_password)])
-async def get_orders():
+async def get_orders(client: DhanClient = Depends(get_dhan_client)):
     """Get all Forever Orders (GTT) and Super Orders."""
     try:
         from dhan_tracker.models import ForeverOrder
 
-        config = DhanConfig.load()
-        client = DhanClient(config)
-
         # Get Forever Orders (new protection method)
         forever_orders_raw = client.get_forever_orders()
         forever_orders = [ForeverOrder.from_api_response(
@@ -968,14 +983,11 @@ async def get_orders():
 
 
 @app.get("/api/orders/protection", dependencies=[Depends(verify_password)])
-async def get_protection_orders():
+async def get_protection_orders(client: DhanClient = Depends(get_dhan_client)):
     """Get all pending Forever Orders (GTT protection orders)."""
     try:
         from dhan_tracker.models import ForeverOrder
 
-        config = DhanConfig.load()
-        client = DhanClient(config)
-
         forever_orders_raw = client.get_forever_orders()
         forever_orders = [ForeverOrder.from_api_response(
             o) for o in forever_orders_raw]
@@ -1009,11 +1021,9 @@ async def get_protection_orders():
 
 
 @app.get("/api/orders/regular", dependencies=[Depends(verify_password)])
-async def get_regular_orders():
+async def get_regular_orders(client: DhanClient = Depends(get_dhan_client)):
     """Get all regular orders (including AMO orders)."""
     try:
-        config = DhanConfig.load()
-        client = DhanClient(config)
         orders = client.get_orders()
 
         return {
@@ -1363,7 +1373,11 @@ class BuyOrderRequest(BaseModel):
 
 
 @app.post("/api/etf/buy", dependencies=[Depends(verify_password)])
-async def buy_etf(order: BuyOrderRequest):
+async def buy_etf(
+    order: BuyOrderRequest,
+    config: DhanConfig = Depends(get_dhan_config),
+    client: DhanClient = Depends(get_dhan_client),
+):
     """
     Place a buy order for an ETF.
 
@@ -1374,9 +1388,6 @@ async def buy_etf(order: BuyOrderRequest):
         price: Price for LIMIT orders
     """
     try:
-        config = DhanConfig.load()
-        client = DhanClient(config)
-
         # First, get the security_id for the symbol
         # We'll need to look it up from existing holdings or search
         # For now, let's try to use the trading symbol directly
@@ -1402,7 +1413,7 @@ async def buy_etf(order: BuyOrderRequest):
             order_params["price"] = 0  # Market order
 
         # Call Dhan API to place order
-        response = client._request("POST", "/v2/orders", json=order_params)
+        response = client._write_request("POST", "/v2/orders", json=order_params)
 
         return {
             "status": "success",
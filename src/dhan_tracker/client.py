@@ -1,7 +1,10 @@
 """Dhan API Client for interacting with Dhan Trading APIs."""
 
 import logging
-from typing import Optional
+import threading
+import time
+from itertools import islice
+from typing import Iterable, Optional
 
 import httpx
 
@@ -16,6 +19,18 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Pooled keep-alive connections to the Dhan API
+MAX_CONNECTIONS = 16
+
+# Attempts to re-establish a failed connection before giving up
+CONNECT_RETRIES = 3
+
+# Seconds to reuse holdings / super order lists; any order write clears them
+READ_CACHE_TTL = 30.0
+
+# Most instruments Dhan accepts in one /marketfeed request
+MARKETFEED_MAX_INSTRUMENTS = 1000
+
 
 class DhanAPIError(Exception):
     """Exception raised for Dhan API errors."""
@@ -30,8 +45,18 @@ class DhanAPIError(Exception):
 class DhanClient:
     """Client for Dhan Trading APIs."""
 
-    def __init__(self, config: DhanConfig):
-        """Initialize Dhan client with configuration."""
+    def __init__(
+        self,
+        config: DhanConfig,
+        transport: httpx.BaseTransport | None = None,
+    ):
+        """
+        Initialize Dhan client with configuration.
+
+        Args:
+            config: Dhan API configuration
+            transport: Custom httpx transport (e.g. httpx.MockTransport in tests)
+        """
         self.config = config
         self._client = httpx.Client(
             base_url=config.base_url,
@@ -42,7 +67,19 @@ class DhanClient:
                 "client-id": config.client_id,  # Required for market data APIs
             },
             timeout=30.0,
+            # Keep-alive pool sized for concurrent order placement; retry
+            # failed connection attempts before surfacing an error
+            transport=transport or httpx.HTTPTransport(
+                retries=CONNECT_RETRIES,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_CONNECTIONS,
+                ),
+            ),
         )
+        # endpoint -> (fetched_at monotonic time, parsed result)
+        self._read_cache: dict[str, tuple[float, list]] = {}
+        self._read_cache_lock = threading.Lock()
 
     def __enter__(self):
         return self
@@ -54,6 +91,40 @@ class DhanClient:
         """Close the HTTP client."""
         self._client.close()
 
+    def invalidate_cache(self) -> None:
+        """Forget cached holdings and super orders."""
+        with self._read_cache_lock:
+            self._read_cache.clear()
+
+    def _get_cached(self, endpoint: str, fetch) -> list:
+        """Return fetch() for endpoint, reused for READ_CACHE_TTL seconds."""
+        now = time.monotonic()
+        with self._read_cache_lock:
+            cached = self._read_cache.get(endpoint)
+        if cached and now - cached[0] < READ_CACHE_TTL:
+            return list(cached[1])
+
+        result = fetch()
+        with self._read_cache_lock:
+            self._read_cache[endpoint] = (now, result)
+        return list(result)
+
+    def _write_request(
+        self,
+        method: str,
+        endpoint: str,
+        json: dict | None = None,
+    ) -> dict | list:
+        """Make an order-write request, dropping cached reads before and after."""
+        # Placing, modifying or cancelling can change holdings and orders.
+        # Clear again afterwards: a concurrent read may have re-cached the
+        # pre-write state while the request was in flight
+        self.invalidate_cache()
+        try:
+            return self._request(method, endpoint, json=json)
+        finally:
+            self.invalidate_cache()
+
     def _request(
         self,
         method: str,
@@ -146,6 +217,9 @@ class DhanClient:
         """
         Get LTP for a list of holdings.
 
+        All holdings are priced in one /marketfeed/ltp request, split only
+        when there are more than MARKETFEED_MAX_INSTRUMENTS of them.
+
         Args:
             holdings: List of Holding objects
 
@@ -155,29 +229,23 @@ class DhanClient:
         if not holdings:
             return {}
 
-        # Group by exchange segment
-        # Holdings have 'exchange' which is like 'NSE' or 'BSE', we need to map to NSE_EQ/BSE_EQ
-        segments: dict[str, list[str]] = {}
-        for h in holdings:
-            # Map exchange to segment (assuming equity)
-            if h.exchange in ("NSE", "ALL"):
-                segment = "NSE_EQ"
-            elif h.exchange == "BSE":
-                segment = "BSE_EQ"
-            else:
-                segment = "NSE_EQ"  # Default to NSE
-
-            if segment not in segments:
-                segments[segment] = []
-            segments[segment].append(h.security_id)
-
-        ltp_data = self.get_ltp(segments)
-
-        # Flatten to security_id -> LTP mapping
-        result = {}
-        for segment, securities in ltp_data.items():
-            for sec_id, ltp in securities.items():
-                result[sec_id] = ltp
+        # Holdings have 'exchange' which is like 'NSE' or 'BSE', we need to
+        # map to NSE_EQ/BSE_EQ (assuming equity, defaulting to NSE)
+        instruments = (
+            ("BSE_EQ" if h.exchange == "BSE" else "NSE_EQ", h.security_id)
+            for h in holdings
+        )
+
+        result: dict[str, float] = {}
+        while chunk := list(islice(instruments, MARKETFEED_MAX_INSTRUMENTS)):
+            # Group by exchange segment
+            segments: dict[str, list[str]] = {}
+            for segment, security_id in chunk:
+                segments.setdefault(segment, []).append(security_id)
+
+            # Flatten to security_id -> LTP mapping
+            for securities in self.get_ltp(segments).values():
+                result.update(securities)
 
         return result
 
@@ -278,9 +346,15 @@ class DhanClient:
         """
         Retrieve all holdings in demat account.
 
+        Repeat calls within READ_CACHE_TTL seconds reuse the last response.
+
         Returns:
             List of Holding objects representing holdings in the portfolio.
         """
+        return self._get_cached("/holdings", self._fetch_holdings)
+
+    def _fetch_holdings(self) -> list[Holding]:
+        """Fetch and parse /holdings (uncached)."""
         response = self._request("GET", "/holdings")
 
         if not isinstance(response, list):
@@ -314,9 +388,15 @@ class DhanClient:
         """
         Retrieve all super orders for the day.
 
+        Repeat calls within READ_CACHE_TTL seconds reuse the last response.
+
         Returns:
             List of SuperOrder objects.
         """
+        return self._get_cached("/super/orders", self._fetch_super_orders)
+
+    def _fetch_super_orders(self) -> list[SuperOrder]:
+        """Fetch and parse /super/orders (uncached)."""
         response = self._request("GET", "/super/orders")
 
         if not isinstance(response, list):
@@ -379,7 +459,7 @@ class DhanClient:
 
         logger.info(
             f"Placing super order for {security_id}: qty={quantity}, sl={stop_loss_price}")
-        response = self._request("POST", "/super/orders", json=payload)
+        response = self._write_request("POST", "/super/orders", json=payload)
         logger.info(f"Super order response: {response}")
         return response
 
@@ -417,7 +497,7 @@ class DhanClient:
             f"Placing Forever Order (GTT) for {order.trading_symbol}: "
             f"qty={order.quantity}, trigger@{order.stop_loss_price}"
         )
-        response = self._request("POST", "/forever/orders", json=payload)
+        response = self._write_request("POST", "/forever/orders", json=payload)
         logger.info(f"Forever Order response: {response}")
         return response
 
@@ -468,7 +548,7 @@ class DhanClient:
             payload["trailingJump"] = trailing_jump
 
         logger.info(f"Modifying super order {order_id}, leg={leg_name}")
-        response = self._request(
+        response = self._write_request(
             "PUT", f"/super/orders/{order_id}", json=payload)
         return response
 
@@ -484,7 +564,7 @@ class DhanClient:
             Cancellation response
         """
         logger.info(f"Cancelling super order {order_id}, leg={leg_name}")
-        response = self._request(
+        response = self._write_request(
             "DELETE", f"/super/orders/{order_id}/{leg_name}")
         return response
 
@@ -545,13 +625,26 @@ class DhanClient:
 
         logger.info(
             f"Placing SL order for {security_id}: qty={quantity}, trigger={trigger_price}, AMO={after_market_order}")
-        response = self._request("POST", "/orders", json=payload)
+        response = self._write_request("POST", "/orders", json=payload)
         logger.info(f"SL order response: {response}")
         return response
 
-    def get_orders(self) -> list[dict]:
+    def get_orders(
+        self,
+        statuses: Iterable[str] | None = None,
+        transaction_type: str | None = None,
+        order_types: Iterable[str] | None = None,
+    ) -> list[dict]:
         """
-        Retrieve all orders for the day.
+        Retrieve orders for the day, optionally filtered.
+
+        The /orders endpoint has no server-side filters, so filtering
+        happens here in a single pass over the order book.
+
+        Args:
+            statuses: Keep only orders with one of these orderStatus values
+            transaction_type: Keep only BUY or SELL orders
+            order_types: Keep only orders with one of these orderType values
 
         Returns:
             List of order dictionaries.
@@ -563,7 +656,18 @@ class DhanClient:
             return []
 
         logger.info(f"Retrieved {len(response)} orders")
-        return response
+
+        if statuses is None and transaction_type is None and order_types is None:
+            return response
+
+        statuses = frozenset(statuses) if statuses is not None else None
+        order_types = frozenset(order_types) if order_types is not None else None
+        return [
+            o for o in response
+            if (transaction_type is None or o.get("transactionType") == transaction_type)
+            and (order_types is None or o.get("orderType") in order_types)
+            and (statuses is None or o.get("orderStatus") in statuses)
+        ]
 
     def cancel_order(self, order_id: str) -> dict:
         """
@@ -576,7 +680,7 @@ class DhanClient:
             Cancellation response
         """
         logger.info(f"Cancelling order {order_id}")
-        response = self._request("DELETE", f"/orders/{order_id}")
+        response = self._write_request("DELETE", f"/orders/{order_id}")
         return response
 
     def modify_order(
@@ -618,7 +722,7 @@ class DhanClient:
             payload["triggerPrice"] = trigger_price
 
         logger.info(f"Modifying order {order_id}: trigger={trigger_price}")
-        response = self._request("PUT", f"/orders/{order_id}", json=payload)
+        response = self._write_request("PUT", f"/orders/{order_id}", json=payload)
         logger.info(f"Modify order response: {response}")
         return response
 
@@ -781,7 +885,7 @@ class DhanClient:
             f"trigger@{trigger_price} ({order_flag})"
         )
 
-        response = self._request("POST", "/forever/orders", json=payload)
+        response = self._write_request("POST", "/forever/orders", json=payload)
         logger.info(f"Forever Order response: {response}")
         return response
 
@@ -816,7 +920,7 @@ class DhanClient:
             API response
         """
         logger.info(f"Cancelling Forever Order: {order_id}")
-        response = self._request("DELETE", f"/forever/orders/{order_id}")
+        response = self._write_request("DELETE", f"/forever/orders/{order_id}")
         logger.info(f"Cancel Forever Order response: {response}")
         return response
 
@@ -861,7 +965,7 @@ class DhanClient:
 
         logger.info(
             f"Modifying Forever Order {order_id}: trigger={trigger_price}")
-        response = self._request(
+        response = self._write_request(
             "PUT", f"/forever/orders/{order_id}", json=payload)
         logger.info(f"Modify Forever Order response: {response}")
         return response
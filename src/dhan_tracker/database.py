@@ -2,6 +2,7 @@
 
 import logging
 import os
+import time
 from datetime import datetime
 from typing import Optional
 from contextlib import contextmanager
@@ -62,6 +63,11 @@ CREATE INDEX IF NOT EXISTS idx_order_triggers_triggered_at ON order_triggers(tri
 """
 
 
+def _json_param(metadata: Optional[dict]):
+    """Adapt a metadata dict for a JSONB column (None stays SQL NULL)."""
+    return psycopg2.extras.Json(metadata) if metadata is not None else None
+
+
 def get_connection_string() -> Optional[str]:
     """Get PostgreSQL connection string from environment."""
     return os.getenv("PG_DB_CONNECTION_STRING")
@@ -102,6 +108,27 @@ def get_db_connection():
         conn.close()
 
 
+@contextmanager
+def get_db_connection_ro():
+    """Get a read-only autocommit connection for plain SELECT helpers.
+
+    Skips the implicit BEGIN/COMMIT round-trip that get_db_connection pays.
+    """
+    if not HAS_PSYCOPG2:
+        raise RuntimeError("psycopg2 is not installed")
+
+    conn_str = get_connection_string()
+    if not conn_str:
+        raise RuntimeError("PG_DB_CONNECTION_STRING not configured")
+
+    conn = psycopg2.connect(conn_str)
+    try:
+        conn.set_session(readonly=True, autocommit=True)
+        yield conn
+    finally:
+        conn.close()
+
+
 def init_database() -> bool:
     """Initialize the database schema. Creates tables if they don't exist."""
     if not is_database_available():
@@ -115,7 +142,7 @@ def init_database() -> bool:
         logger.info("Database initialized successfully")
         return True
     except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
+        logger.error("Failed to initialize database: %s", e)
         return False
 
 
@@ -133,7 +160,7 @@ def get_api_key(key_name: str) -> Optional[dict]:
         return None
 
     try:
-        with get_db_connection() as conn:
+        with get_db_connection_ro() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute(
                     "SELECT * FROM api_keys WHERE key_name = %s",
@@ -142,7 +169,7 @@ def get_api_key(key_name: str) -> Optional[dict]:
                 row = cur.fetchone()
                 return dict(row) if row else None
     except Exception as e:
-        logger.error(f"Failed to get API key '{key_name}': {e}")
+        logger.error("Failed to get API key '%s': %s", key_name, e)
         return None
 
 
@@ -184,12 +211,12 @@ def save_api_key(
                         metadata = EXCLUDED.metadata,
                         updated_at = CURRENT_TIMESTAMP
                 """, (key_name, key_value, client_id, expires_at,
-                      psycopg2.extras.Json(metadata) if metadata else None))
+                      _json_param(metadata)))
 
-        logger.info(f"API key '{key_name}' saved successfully")
+        logger.info("API key '%s' saved successfully", key_name)
         return True
     except Exception as e:
-        logger.error(f"Failed to save API key '{key_name}': {e}")
+        logger.error("Failed to save API key '%s': %s", key_name, e)
         return False
 
 
@@ -206,6 +233,9 @@ def delete_api_key(key_name: str) -> bool:
     if not is_database_available():
         return False
 
+    if key_name == DHAN_TOKEN_KEY:
+        _clear_token_cache()
+
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
@@ -216,10 +246,10 @@ def delete_api_key(key_name: str) -> bool:
                 deleted = cur.rowcount > 0
 
         if deleted:
-            logger.info(f"API key '{key_name}' deleted")
+            logger.info("API key '%s' deleted", key_name)
         return deleted
     except Exception as e:
-        logger.error(f"Failed to delete API key '{key_name}': {e}")
+        logger.error("Failed to delete API key '%s': %s", key_name, e)
         return False
 
 
@@ -227,6 +257,22 @@ def delete_api_key(key_name: str) -> bool:
 
 DHAN_TOKEN_KEY = "dhan_access_token"
 
+# Refetch the token this many seconds before its stored expiry
+_TOKEN_CACHE_MARGIN = 30.0
+
+# Longest a cached token row is trusted (seconds). Another worker process
+# may have saved a new token, and only this process's cache is cleared
+_TOKEN_CACHE_MAX_AGE = 300.0
+
+# Process-local (token row, valid_until on the monotonic clock)
+_token_cache: Optional[tuple[dict, float]] = None
+
+
+def _clear_token_cache() -> None:
+    """Drop the cached Dhan token so the next read hits the database."""
+    global _token_cache
+    _token_cache = None
+
 
 def get_dhan_token() -> Optional[str]:
     """
@@ -235,10 +281,8 @@ def get_dhan_token() -> Optional[str]:
     Returns:
         The access token string or None if not found
     """
-    key_data = get_api_key(DHAN_TOKEN_KEY)
-    if key_data:
-        return key_data.get("key_value")
-    return None
+    token_info = get_dhan_token_info()
+    return token_info.get("key_value") if token_info else None
 
 
 def save_dhan_token(
@@ -257,7 +301,7 @@ def save_dhan_token(
     Returns:
         True if saved successfully
     """
-    return save_api_key(
+    saved = save_api_key(
         key_name=DHAN_TOKEN_KEY,
         key_value=access_token,
         client_id=client_id,
@@ -265,16 +309,39 @@ def save_dhan_token(
         metadata={"source": "refresh",
                   "refreshed_at": datetime.utcnow().isoformat()}
     )
+    # Cleared after the write so a concurrent read can't re-cache the old row
+    _clear_token_cache()
+    return saved
 
 
 def get_dhan_token_info() -> Optional[dict]:
     """
     Get full information about the stored Dhan token.
 
+    Served from memory for up to _TOKEN_CACHE_MAX_AGE seconds, and never
+    past _TOKEN_CACHE_MARGIN seconds before the token's expires_at.
+
     Returns:
         Dict with token details including expiry, or None
     """
-    return get_api_key(DHAN_TOKEN_KEY)
+    global _token_cache
+    now = time.monotonic()
+    if _token_cache and now < _token_cache[1]:
+        return _token_cache[0]
+
+    key_data = get_api_key(DHAN_TOKEN_KEY)
+    if not key_data:
+        return None
+
+    ttl = _TOKEN_CACHE_MAX_AGE
+    expires_at = key_data.get("expires_at")
+    if expires_at:
+        # expires_at is stored as naive UTC (see save_dhan_token callers)
+        remaining = (expires_at - datetime.utcnow()).total_seconds()
+        ttl = min(ttl, remaining - _TOKEN_CACHE_MARGIN)
+    if ttl > 0:
+        _token_cache = (key_data, now + ttl)
+    return key_data
 
 
 # ==================== Order Triggers tracking ====================
@@ -341,14 +408,14 @@ def save_order_trigger(
                     transaction_type, quantity, trigger_price, executed_price,
                     order_type, order_status, trigger_type,
                     cost_price, pnl_amount, pnl_percent, protection_tier,
-                    psycopg2.extras.Json(metadata) if metadata else None,
+                    _json_param(metadata),
                 ))
 
-        logger.info(
-            f"Order trigger saved: {trading_symbol} @ ₹{trigger_price}")
+        logger.info("Order trigger saved: %s @ ₹%s",
+                    trading_symbol, trigger_price)
         return True
     except Exception as e:
-        logger.error(f"Failed to save order trigger: {e}")
+        logger.error("Failed to save order trigger: %s", e)
         return False
 
 
@@ -372,7 +439,7 @@ def get_order_triggers(
         return []
 
     try:
-        with get_db_connection() as conn:
+        with get_db_connection_ro() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 query = "SELECT * FROM order_triggers WHERE 1=1"
                 params = []
@@ -392,10 +459,36 @@ def get_order_triggers(
                 rows = cur.fetchall()
                 return [dict(row) for row in rows]
     except Exception as e:
-        logger.error(f"Failed to get order triggers: {e}")
+        logger.error("Failed to get order triggers: %s", e)
         return []
 
 
+def get_processed_order_ids() -> set[str]:
+    """
+    Get the order IDs of triggers already logged today.
+
+    Used to warm-start the trigger monitor after a restart, since the order
+    book it polls only holds the current day's orders.
+
+    Returns:
+        Set of order IDs (empty if the database is unavailable)
+    """
+    if not is_database_available():
+        return set()
+
+    try:
+        with get_db_connection_ro() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT order_id FROM order_triggers
+                    WHERE triggered_at >= CURRENT_DATE
+                """)
+                return {row[0] for row in cur.fetchall()}
+    except Exception as e:
+        logger.error("Failed to get processed order ids: %s", e)
+        return set()
+
+
 def mark_trigger_email_sent(order_id: str) -> bool:
     """
     Mark an order trigger as having email notification sent.
@@ -419,10 +512,38 @@ def mark_trigger_email_sent(order_id: str) -> bool:
                 """, (order_id,))
                 return cur.rowcount > 0
     except Exception as e:
-        logger.error(f"Failed to mark email sent for {order_id}: {e}")
+        logger.error("Failed to mark email sent for %s: %s", order_id, e)
         return False
 
 
+def mark_triggers_email_sent(order_ids: list[str]) -> int:
+    """
+    Mark several order triggers as notified in a single UPDATE.
+
+    Args:
+        order_ids: The order IDs to update
+
+    Returns:
+        Number of rows updated
+    """
+    if not order_ids or not is_database_available():
+        return 0
+
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE order_triggers
+                    SET email_sent = TRUE, email_sent_at = CURRENT_TIMESTAMP
+                    WHERE order_id = ANY(%s)
+                """, (list(order_ids),))
+                return cur.rowcount
+    except Exception as e:
+        logger.error("Failed to mark email sent for %d triggers: %s",
+                     len(order_ids), e)
+        return 0
+
+
 def get_pending_email_triggers() -> list[dict]:
     """
     Get order triggers that need email notifications.
@@ -434,7 +555,7 @@ def get_pending_email_triggers() -> list[dict]:
         return []
 
     try:
-        with get_db_connection() as conn:
+        with get_db_connection_ro() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT * FROM order_triggers 
@@ -444,5 +565,5 @@ def get_pending_email_triggers() -> list[dict]:
                 rows = cur.fetchall()
                 return [dict(row) for row in rows]
     except Exception as e:
-        logger.error(f"Failed to get pending email triggers: {e}")
+        logger.error("Failed to get pending email triggers: %s", e)
         return []
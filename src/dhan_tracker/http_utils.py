@@ -0,0 +1,22 @@
+"""Optional HTTP speedups shared by the market data clients."""
+
+import httpx
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import h2  # noqa: F401 - only needed so httpx can negotiate HTTP/2
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+
+def parse_json(response: httpx.Response):
+    """Decode a JSON response body, using orjson when it is installed."""
+    if HAS_ORJSON:
+        return orjson.loads(response.content)
+    return response.json()
@@ -6,7 +6,28 @@ from enum import Enum
 from typing import Optional
 
 
-class Exchange(str, Enum):
+class ApiEnum(str, Enum):
+    """Base for enums parsed from raw API strings."""
+
+    @classmethod
+    def from_value(cls, value: str):
+        """Look up a member by its API value, returning None if unknown.
+
+        Uses the value-to-member map directly instead of Enum.__call__.
+        """
+        return cls._value2member_map_.get(value)
+
+    def __str__(self) -> str:
+        # Format as the raw API string, like the plain str fields these replace
+        return self.value
+
+
+def _parse_enum(enum_cls: type[ApiEnum], value: str) -> str:
+    """Map a raw API string to its enum member, keeping unknown values as-is."""
+    return enum_cls.from_value(value) or value
+
+
+class Exchange(ApiEnum):
     """Exchange types."""
     NSE_EQ = "NSE_EQ"
     BSE_EQ = "BSE_EQ"
@@ -17,13 +38,13 @@ class Exchange(str, Enum):
     MCX_COMM = "MCX_COMM"
 
 
-class TransactionType(str, Enum):
+class TransactionType(ApiEnum):
     """Transaction types."""
     BUY = "BUY"
     SELL = "SELL"
 
 
-class ProductType(str, Enum):
+class ProductType(ApiEnum):
     """Product types."""
     CNC = "CNC"  # Cash and Carry (Delivery)
     INTRADAY = "INTRADAY"
@@ -31,13 +52,13 @@ class ProductType(str, Enum):
     MTF = "MTF"  # Margin Trading Facility
 
 
-class OrderType(str, Enum):
+class OrderType(ApiEnum):
     """Order types."""
     LIMIT = "LIMIT"
     MARKET = "MARKET"
 
 
-class OrderStatus(str, Enum):
+class OrderStatus(ApiEnum):
     """Order status types."""
     TRANSIT = "TRANSIT"
     PENDING = "PENDING"
@@ -48,7 +69,7 @@ class OrderStatus(str, Enum):
     TRADED = "TRADED"
 
 
-class LegName(str, Enum):
+class LegName(ApiEnum):
     """Super order leg names."""
     ENTRY_LEG = "ENTRY_LEG"
     TARGET_LEG = "TARGET_LEG"
@@ -120,8 +141,8 @@ class Position:
             trading_symbol=data.get("tradingSymbol", ""),
             security_id=data.get("securityId", ""),
             position_type=data.get("positionType", ""),
-            exchange_segment=data.get("exchangeSegment", ""),
-            product_type=data.get("productType", ""),
+            exchange_segment=_parse_enum(Exchange, data.get("exchangeSegment", "")),
+            product_type=_parse_enum(ProductType, data.get("productType", "")),
             buy_avg=data.get("buyAvg", 0.0),
             buy_qty=data.get("buyQty", 0),
             cost_price=data.get("costPrice", 0.0),
@@ -152,13 +173,13 @@ class LegDetail:
         """Create LegDetail from API response."""
         return cls(
             order_id=data.get("orderId", ""),
-            leg_name=data.get("legName", ""),
-            transaction_type=data.get("transactionType", ""),
+            leg_name=_parse_enum(LegName, data.get("legName", "")),
+            transaction_type=_parse_enum(TransactionType, data.get("transactionType", "")),
             total_quantity=data.get("totalQuatity", 0),  # API has typo
             remaining_quantity=data.get("remainingQuantity", 0),
             triggered_quantity=data.get("triggeredQuantity", 0),
             price=data.get("price", 0.0),
-            order_status=data.get("orderStatus", ""),
+            order_status=_parse_enum(OrderStatus, data.get("orderStatus", "")),
             trailing_jump=data.get("trailingJump", 0.0),
         )
 
@@ -200,18 +221,18 @@ class SuperOrder:
             dhan_client_id=data.get("dhanClientId", ""),
             order_id=data.get("orderId", ""),
             correlation_id=data.get("correlationId", ""),
-            order_status=data.get("orderStatus", ""),
-            transaction_type=data.get("transactionType", ""),
-            exchange_segment=data.get("exchangeSegment", ""),
-            product_type=data.get("productType", ""),
-            order_type=data.get("orderType", ""),
+            order_status=_parse_enum(OrderStatus, data.get("orderStatus", "")),
+            transaction_type=_parse_enum(TransactionType, data.get("transactionType", "")),
+            exchange_segment=_parse_enum(Exchange, data.get("exchangeSegment", "")),
+            product_type=_parse_enum(ProductType, data.get("productType", "")),
+            order_type=_parse_enum(OrderType, data.get("orderType", "")),
             trading_symbol=data.get("tradingSymbol", ""),
             security_id=data.get("securityId", ""),
             quantity=data.get("quantity", 0),
             remaining_quantity=data.get("remainingQuantity", 0),
             ltp=data.get("ltp", 0.0),
             price=data.get("price", 0.0),
-            leg_name=data.get("legName", ""),
+            leg_name=_parse_enum(LegName, data.get("legName", "")),
             create_time=data.get("createTime", ""),
             update_time=data.get("updateTime", ""),
             average_traded_price=data.get("averageTradedPrice", 0.0),
@@ -236,7 +257,7 @@ class SuperOrder:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class ProtectiveOrder:
     """Configuration for a protective sell order."""
 
@@ -307,11 +328,11 @@ class ForeverOrder:
             dhan_client_id=data.get("dhanClientId", ""),
             order_id=data.get("orderId", ""),
             order_flag=data.get("orderFlag", "SINGLE"),
-            order_status=data.get("orderStatus", ""),
-            transaction_type=data.get("transactionType", ""),
-            exchange_segment=data.get("exchangeSegment", ""),
-            product_type=data.get("productType", ""),
-            order_type=data.get("orderType", ""),
+            order_status=_parse_enum(OrderStatus, data.get("orderStatus", "")),
+            transaction_type=_parse_enum(TransactionType, data.get("transactionType", "")),
+            exchange_segment=_parse_enum(Exchange, data.get("exchangeSegment", "")),
+            product_type=_parse_enum(ProductType, data.get("productType", "")),
+            order_type=_parse_enum(OrderType, data.get("orderType", "")),
             trading_symbol=data.get("tradingSymbol", ""),
             security_id=data.get("securityId", ""),
             quantity=data.get("quantity", 0),
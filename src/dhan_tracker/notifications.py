@@ -1,18 +1,176 @@
 """Email notification service using Gmail SMTP."""
 
+import atexit
 import logging
 import os
+import queue
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading
+import time
+from email.message import EmailMessage
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 from dataclasses import dataclass
+from string import Template
 
 logger = logging.getLogger(__name__)
 
+# Reconnect instead of reusing an SMTP session older than this (seconds)
+SMTP_MAX_CONNECTION_AGE = 60.0
 
-@dataclass
+# Maximum number of queued emails the worker sends over one SMTP session
+EMAIL_QUEUE_BATCH_SIZE = 50
+
+EmailItem = tuple[str, str, Optional[str]]
+
+# Static head of the SL trigger email; outcome colours are picked by a class
+# on the container so none of the CSS depends on the notification.
+_SL_TRIGGER_HTML_PREFIX = """
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #1a73e8; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+        .content { background: #f8f9fa; padding: 20px; border-radius: 0 0 8px 8px; }
+        .highlight { background: white; padding: 15px; border-radius: 8px; margin: 15px 0; border-left: 4px solid #6c757d; }
+        .label { color: #6c757d; font-size: 12px; text-transform: uppercase; }
+        .value { font-size: 18px; font-weight: bold; color: #333; }
+        .pnl { color: #6c757d; font-size: 24px; font-weight: bold; }
+        .profit .highlight { border-left-color: #28a745; }
+        .profit .pnl { color: #28a745; }
+        .loss .highlight { border-left-color: #dc3545; }
+        .loss .pnl { color: #dc3545; }
+        .grid { display: grid; grid-template-columns: 1fr 1fr; gap: 15px; }
+        .footer { text-align: center; color: #6c757d; font-size: 12px; margin-top: 20px; }
+        .status { display: inline-block; padding: 4px 8px; border-radius: 4px; font-size: 12px; }
+        .status-traded { background: #d4edda; color: #155724; }
+        .status-rejected { background: #f8d7da; color: #721c24; }
+    </style>
+</head>
+<body>
+"""
+
+_SL_TRIGGER_HTML_BODY = Template("""\
+    <div class="container ${pnl_class}">
+        <div class="header">
+            <h1 style="margin: 0;">🔔 Stop Loss Triggered</h1>
+            <p style="margin: 10px 0 0 0; opacity: 0.9;">${trading_symbol}</p>
+        </div>
+        <div class="content">
+            <div class="highlight">
+                <div class="label">P&L Result</div>
+                <div class="pnl">${pnl_str} ${pnl_pct_str}</div>
+            </div>
+            
+            <div class="grid">
+                <div class="highlight">
+                    <div class="label">Quantity Sold</div>
+                    <div class="value">${quantity} units</div>
+                </div>
+                <div class="highlight">
+                    <div class="label">Trigger Price</div>
+                    <div class="value">₹${trigger_price}</div>
+                </div>
+                <div class="highlight">
+                    <div class="label">Executed At</div>
+                    <div class="value">${exec_price_str}</div>
+                </div>
+                <div class="highlight">
+                    <div class="label">Cost Price</div>
+                    <div class="value">${cost_str}</div>
+                </div>
+            </div>
+            
+            <div class="highlight">
+                <div class="label">Protection Strategy</div>
+                <div class="value">${protection_tier}</div>
+            </div>
+            
+            <div class="highlight">
+                <div class="label">Order Details</div>
+                <div class="value">
+                    Order ID: ${order_id}<br>
+                    Status: <span class="status status-${status_class}">${order_status}</span>
+                </div>
+            </div>
+            
+            <div class="footer">
+                <p>Dhan Portfolio Tracker • ${timestamp}</p>
+            </div>
+        </div>
+    </div>
+""")
+
+_SL_TRIGGER_HTML_SUFFIX = """</body>
+</html>
+"""
+
+_SL_TRIGGER_TEXT_TEMPLATE = Template("""
+🔔 STOP LOSS ${outcome}: ${trading_symbol}
+
+Quantity: ${quantity} units
+Trigger Price: ₹${trigger_price}
+Executed At: ${exec_price_str}
+Cost Price: ${cost_str}
+P&L: ${pnl_str} ${pnl_pct_str}
+
+Strategy: ${protection_tier}
+Order ID: ${order_id}
+Status: ${order_status}
+
+---
+Dhan Portfolio Tracker
+${timestamp}
+""")
+
+_DAILY_SUMMARY_HTML_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #1a73e8; color: white; padding: 20px; text-align: center; }
+        table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+        th, td { padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background: #f1f3f4; }
+        .total { font-size: 24px; color: ${pnl_color}; font-weight: bold; text-align: center; padding: 20px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>📊 Daily SL Summary</h1>
+            <p>${date}</p>
+        </div>
+        
+        <div class="total">
+            Total P&L: ${total_pnl}
+        </div>
+        
+        <table>
+            <thead>
+                <tr>
+                    <th>Symbol</th>
+                    <th>Qty</th>
+                    <th>Trigger</th>
+                    <th>P&L</th>
+                    <th>Status</th>
+                </tr>
+            </thead>
+            <tbody>
+                ${rows_html}
+            </tbody>
+        </table>
+    </div>
+</body>
+</html>
+""")
+
+
+@dataclass(slots=True)
 class EmailConfig:
     """Email configuration for Gmail SMTP."""
 
@@ -42,10 +200,126 @@ class EmailNotifier:
 
     def __init__(self, config: EmailConfig | None = None):
         self.config = config or EmailConfig.from_env()
+        self._configured = self.config.is_configured()
+        self._smtp: smtplib.SMTP | None = None
+        self._smtp_opened_at: float = 0
+        self._smtp_lock = threading.Lock()
+        self._q: queue.Queue = queue.Queue()
+        self._worker_thread: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+
+    def _get_smtp(self) -> smtplib.SMTP:
+        """
+        Get a live SMTP connection, reusing the cached one when possible.
+
+        The cached session is health-checked with NOOP and replaced if it
+        has gone stale or is older than SMTP_MAX_CONNECTION_AGE.
+
+        Returns:
+            Authenticated SMTP connection
+        """
+        if self._smtp is not None:
+            age = time.monotonic() - self._smtp_opened_at
+            try:
+                if age <= SMTP_MAX_CONNECTION_AGE and self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except smtplib.SMTPException:
+                pass
+            self._reset_smtp()
+
+        server = smtplib.SMTP(self.config.smtp_server, self.config.smtp_port)
+        try:
+            server.ehlo()
+            server.starttls()
+            server.ehlo()
+            server.login(self.config.sender_email, self.config.sender_password)
+        except Exception:
+            server.close()
+            raise
+
+        self._smtp = server
+        self._smtp_opened_at = time.monotonic()
+        return server
+
+    def _reset_smtp(self) -> None:
+        """Drop the cached SMTP connection without raising."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+    def close(self) -> None:
+        """Flush queued emails, stop the worker and close the SMTP connection."""
+        with self._worker_lock:
+            worker, self._worker_thread = self._worker_thread, None
+        if worker is not None:
+            self._q.put(None)
+            worker.join()
+        with self._smtp_lock:
+            self._reset_smtp()
+
+    def enqueue(
+        self,
+        items: list[EmailItem],
+        on_sent: Optional[Callable[[list[bool]], None]] = None,
+    ) -> None:
+        """
+        Queue emails for the background worker and return immediately.
+
+        Args:
+            items: (subject, body_html, body_text) tuples
+            on_sent: Called from the worker with per-item success flags
+        """
+        with self._worker_lock:
+            if self._worker_thread is None:
+                self._worker_thread = threading.Thread(
+                    target=self._worker, name="email-notifier", daemon=True)
+                self._worker_thread.start()
+        self._q.put((items, on_sent))
+
+    def _worker(self) -> None:
+        """Drain the queue, coalescing pending entries into one SMTP batch."""
+        stopping = False
+        while not stopping:
+            entry = self._q.get()
+            if entry is None:
+                break
+            entries = [entry]
+            pending = len(entry[0])
+            while pending < EMAIL_QUEUE_BATCH_SIZE:
+                try:
+                    entry = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                entries.append(entry)
+                pending += len(entry[0])
+
+            batch = [item for items, _ in entries for item in items]
+            try:
+                results = self.send_batch(batch)
+            except Exception as e:
+                # Keep the worker alive; a dead thread would strand every later email
+                logger.exception(f"Email batch failed: {e}")
+                results = [False] * len(batch)
+            offset = 0
+            for items, on_sent in entries:
+                chunk = results[offset:offset + len(items)]
+                offset += len(items)
+                if on_sent is not None:
+                    try:
+                        on_sent(chunk)
+                    except Exception as e:
+                        logger.error(f"Email callback failed: {e}")
 
     def is_configured(self) -> bool:
         """Check if email notifications are enabled."""
-        return self.config.is_configured()
+        return self._configured
 
     def send_email(
         self,
@@ -69,28 +343,21 @@ class EmailNotifier:
             return False
 
         try:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = self.config.sender_email
-            msg["To"] = self.config.recipient_email
-
-            # Add plain text version
-            if body_text:
-                msg.attach(MIMEText(body_text, "plain"))
-
-            # Add HTML version
-            msg.attach(MIMEText(body_html, "html"))
-
-            # Connect and send
-            with smtplib.SMTP(self.config.smtp_server, self.config.smtp_port) as server:
-                server.starttls()
-                server.login(self.config.sender_email,
-                             self.config.sender_password)
-                server.sendmail(
-                    self.config.sender_email,
-                    self.config.recipient_email,
-                    msg.as_string()
-                )
+            msg = self._build_message(subject, body_html, body_text)
+
+            # Send over the shared connection, retrying once on a fresh one
+            with self._smtp_lock:
+                for attempt in range(2):
+                    server = self._get_smtp()
+                    try:
+                        server.send_message(msg)
+                        break
+                    except smtplib.SMTPAuthenticationError:
+                        raise
+                    except (smtplib.SMTPServerDisconnected, smtplib.SMTPException):
+                        self._reset_smtp()
+                        if attempt:
+                            raise
 
             logger.info(f"Email sent: {subject}")
             return True
@@ -103,7 +370,85 @@ class EmailNotifier:
             logger.error(f"Failed to send email: {e}")
             return False
 
-    def send_sl_trigger_notification(
+    def _build_message(
+        self,
+        subject: str,
+        body_html: str,
+        body_text: Optional[str] = None,
+    ) -> EmailMessage:
+        """Build a text/HTML alternative message for the configured recipient."""
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.config.sender_email
+        msg["To"] = self.config.recipient_email
+
+        # Plain text version first, HTML as the preferred alternative
+        if body_text:
+            msg.set_content(body_text)
+            msg.add_alternative(body_html, subtype="html")
+        else:
+            msg.set_content(body_html, subtype="html")
+        return msg
+
+    def send_batch(self, items: list[EmailItem]) -> list[bool]:
+        """
+        Send several emails over a single SMTP session.
+
+        Messages are pipelined over the persistent connection with RSET
+        between them. Large batches are abandoned early if at least a third
+        of the messages fail.
+
+        Args:
+            items: (subject, body_html, body_text) tuples
+
+        Returns:
+            Per-item success flags, in the same order as items
+        """
+        results = [False] * len(items)
+        if not items:
+            return results
+        if not self.is_configured():
+            logger.warning(f"Email not configured - {len(items)} notifications skipped")
+            return results
+
+        with self._smtp_lock:
+            self._send_batch_locked(items, results)
+        return results
+
+    def _send_batch_locked(self, items: list[EmailItem], results: list[bool]) -> None:
+        """Send a batch over the shared connection; caller holds _smtp_lock."""
+        try:
+            server = self._get_smtp()
+        except Exception as e:
+            logger.error(f"Failed to open SMTP connection: {e}")
+            return
+
+        failed = 0
+        for i, (subject, body_html, body_text) in enumerate(items):
+            msg = self._build_message(subject, body_html, body_text)
+            try:
+                server.send_message(msg)
+                results[i] = True
+                logger.info(f"Email sent: {subject}")
+            except smtplib.SMTPServerDisconnected as e:
+                logger.error(f"SMTP connection lost mid-batch: {e}")
+                self._reset_smtp()
+                break
+            except Exception as e:
+                failed += 1
+                logger.error(f"Failed to send email '{subject}': {e}")
+
+            if len(items) >= 30 and failed >= len(items) // 3:
+                logger.error(f"Aborting email batch after {failed} failures")
+                break
+
+            try:
+                server.rset()
+            except smtplib.SMTPException:
+                self._reset_smtp()
+                break
+
+    def build_sl_trigger_email(
         self,
         trading_symbol: str,
         quantity: int,
@@ -115,9 +460,9 @@ class EmailNotifier:
         protection_tier: str | None,
         order_id: str,
         order_status: str,
-    ) -> bool:
+    ) -> tuple[str, str, str]:
         """
-        Send notification when a stop loss order is triggered.
+        Render the subject and bodies for a stop loss trigger notification.
 
         Args:
             trading_symbol: Stock/ETF symbol
@@ -132,17 +477,17 @@ class EmailNotifier:
             order_status: TRADED, REJECTED, etc.
 
         Returns:
-            True if notification sent
+            (subject, body_html, body_text) tuple
         """
         now = datetime.now()
 
         # Determine if profit or loss
         if pnl_amount is not None:
-            pnl_color = "#28a745" if pnl_amount >= 0 else "#dc3545"
+            pnl_class = "profit" if pnl_amount >= 0 else "loss"
             pnl_sign = "+" if pnl_amount >= 0 else ""
             outcome = "PROFIT PROTECTED" if pnl_amount >= 0 else "LOSS LIMITED"
         else:
-            pnl_color = "#6c757d"
+            pnl_class = "neutral"
             pnl_sign = ""
             outcome = "TRIGGERED"
 
@@ -153,98 +498,72 @@ class EmailNotifier:
 
         subject = f"🔔 SL {outcome}: {trading_symbol} @ ₹{trigger_price:.2f}"
 
-        body_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: #1a73e8; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-        .content {{ background: #f8f9fa; padding: 20px; border-radius: 0 0 8px 8px; }}
-        .highlight {{ background: white; padding: 15px; border-radius: 8px; margin: 15px 0; border-left: 4px solid {pnl_color}; }}
-        .label {{ color: #6c757d; font-size: 12px; text-transform: uppercase; }}
-        .value {{ font-size: 18px; font-weight: bold; color: #333; }}
-        .pnl {{ color: {pnl_color}; font-size: 24px; font-weight: bold; }}
-        .grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 15px; }}
-        .footer {{ text-align: center; color: #6c757d; font-size: 12px; margin-top: 20px; }}
-        .status {{ display: inline-block; padding: 4px 8px; border-radius: 4px; font-size: 12px; }}
-        .status-traded {{ background: #d4edda; color: #155724; }}
-        .status-rejected {{ background: #f8d7da; color: #721c24; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1 style="margin: 0;">🔔 Stop Loss Triggered</h1>
-            <p style="margin: 10px 0 0 0; opacity: 0.9;">{trading_symbol}</p>
-        </div>
-        <div class="content">
-            <div class="highlight">
-                <div class="label">P&L Result</div>
-                <div class="pnl">{pnl_str} {pnl_pct_str}</div>
-            </div>
-            
-            <div class="grid">
-                <div class="highlight">
-                    <div class="label">Quantity Sold</div>
-                    <div class="value">{quantity} units</div>
-                </div>
-                <div class="highlight">
-                    <div class="label">Trigger Price</div>
-                    <div class="value">₹{trigger_price:.2f}</div>
-                </div>
-                <div class="highlight">
-                    <div class="label">Executed At</div>
-                    <div class="value">{exec_price_str}</div>
-                </div>
-                <div class="highlight">
-                    <div class="label">Cost Price</div>
-                    <div class="value">{cost_str}</div>
-                </div>
-            </div>
-            
-            <div class="highlight">
-                <div class="label">Protection Strategy</div>
-                <div class="value">{protection_tier or 'Stop Loss'}</div>
-            </div>
-            
-            <div class="highlight">
-                <div class="label">Order Details</div>
-                <div class="value">
-                    Order ID: {order_id}<br>
-                    Status: <span class="status status-{'traded' if order_status == 'TRADED' else 'rejected'}">{order_status}</span>
-                </div>
-            </div>
-            
-            <div class="footer">
-                <p>Dhan Portfolio Tracker • {now.strftime('%d %b %Y, %I:%M %p IST')}</p>
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-"""
+        template_vars = {
+            "pnl_class": pnl_class,
+            "trading_symbol": trading_symbol,
+            "outcome": outcome,
+            "pnl_str": pnl_str,
+            "pnl_pct_str": pnl_pct_str,
+            "quantity": quantity,
+            "trigger_price": f"{trigger_price:.2f}",
+            "exec_price_str": exec_price_str,
+            "cost_str": cost_str,
+            "protection_tier": protection_tier or "Stop Loss",
+            "order_id": order_id,
+            "order_status": order_status,
+            "status_class": "traded" if order_status == "TRADED" else "rejected",
+            "timestamp": now.strftime("%d %b %Y, %I:%M %p IST"),
+        }
+        body_html = "".join((
+            _SL_TRIGGER_HTML_PREFIX,
+            _SL_TRIGGER_HTML_BODY.substitute(template_vars),
+            _SL_TRIGGER_HTML_SUFFIX,
+        ))
+        body_text = _SL_TRIGGER_TEXT_TEMPLATE.substitute(template_vars)
+
+        return subject, body_html, body_text
 
-        body_text = f"""
-🔔 STOP LOSS {outcome}: {trading_symbol}
+    def send_sl_trigger_notification(
+        self,
+        trading_symbol: str,
+        quantity: int,
+        trigger_price: float,
+        executed_price: float | None,
+        cost_price: float | None,
+        pnl_amount: float | None,
+        pnl_percent: float | None,
+        protection_tier: str | None,
+        order_id: str,
+        order_status: str,
+    ) -> bool:
+        """
+        Queue a notification for a triggered stop loss order.
 
-Quantity: {quantity} units
-Trigger Price: ₹{trigger_price:.2f}
-Executed At: {exec_price_str}
-Cost Price: {cost_str}
-P&L: {pnl_str} {pnl_pct_str}
+        The email is sent by the background worker so callers on the
+        order-polling path never wait on SMTP.
 
-Strategy: {protection_tier or 'Stop Loss'}
-Order ID: {order_id}
-Status: {order_status}
+        Args are the same as build_sl_trigger_email.
 
----
-Dhan Portfolio Tracker
-{now.strftime('%d %b %Y, %I:%M %p IST')}
-"""
+        Returns:
+            True if the notification was queued
+        """
+        if not self.is_configured():
+            logger.warning("Email not configured - notification skipped")
+            return False
 
-        return self.send_email(subject, body_html, body_text)
+        self.enqueue([self.build_sl_trigger_email(
+            trading_symbol=trading_symbol,
+            quantity=quantity,
+            trigger_price=trigger_price,
+            executed_price=executed_price,
+            cost_price=cost_price,
+            pnl_amount=pnl_amount,
+            pnl_percent=pnl_percent,
+            protection_tier=protection_tier,
+            order_id=order_id,
+            order_status=order_status,
+        )])
+        return True
 
     def send_daily_summary(
         self,
@@ -270,65 +589,28 @@ Dhan Portfolio Tracker
         pnl_sign = "+" if total_pnl >= 0 else ""
 
         # Build trigger rows
-        rows_html = ""
-        for t in triggers:
-            pnl = t.get("pnl_amount", 0) or 0
-            row_color = "#28a745" if pnl >= 0 else "#dc3545"
-            rows_html += f"""
+        rows_html = "".join(
+            f"""
             <tr>
                 <td>{t['trading_symbol']}</td>
                 <td>{t['quantity']}</td>
                 <td>₹{t['trigger_price']:.2f}</td>
-                <td style="color: {row_color}">{"+" if pnl >= 0 else ""}₹{pnl:.2f}</td>
+                <td style="color: {"#28a745" if pnl >= 0 else "#dc3545"}">{"+" if pnl >= 0 else ""}₹{pnl:.2f}</td>
                 <td>{t['order_status']}</td>
             </tr>
             """
+            for t in triggers
+            for pnl in (t.get("pnl_amount", 0) or 0,)
+        )
 
         subject = f"📊 Daily SL Summary: {len(triggers)} triggers, {pnl_sign}₹{total_pnl:.2f}"
 
-        body_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: Arial, sans-serif; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: #1a73e8; color: white; padding: 20px; text-align: center; }}
-        table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-        th, td {{ padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }}
-        th {{ background: #f1f3f4; }}
-        .total {{ font-size: 24px; color: {pnl_color}; font-weight: bold; text-align: center; padding: 20px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>📊 Daily SL Summary</h1>
-            <p>{now.strftime('%d %b %Y')}</p>
-        </div>
-        
-        <div class="total">
-            Total P&L: {pnl_sign}₹{total_pnl:.2f}
-        </div>
-        
-        <table>
-            <thead>
-                <tr>
-                    <th>Symbol</th>
-                    <th>Qty</th>
-                    <th>Trigger</th>
-                    <th>P&L</th>
-                    <th>Status</th>
-                </tr>
-            </thead>
-            <tbody>
-                {rows_html}
-            </tbody>
-        </table>
-    </div>
-</body>
-</html>
-"""
+        body_html = _DAILY_SUMMARY_HTML_TEMPLATE.substitute(
+            pnl_color=pnl_color,
+            date=now.strftime("%d %b %Y"),
+            total_pnl=f"{pnl_sign}₹{total_pnl:.2f}",
+            rows_html=rows_html,
+        )
 
         return self.send_email(subject, body_html)
 
@@ -342,6 +624,7 @@ def get_notifier() -> EmailNotifier:
     global _notifier
     if _notifier is None:
         _notifier = EmailNotifier()
+        atexit.register(_notifier.close)
     return _notifier
 
 
@@ -358,10 +641,10 @@ def send_sl_trigger_email(
     protection_tier: str | None = None,
 ) -> bool:
     """
-    Convenience function to send SL trigger notification.
+    Convenience function to queue an SL trigger notification.
 
     Returns:
-        True if email sent successfully
+        True if the email was queued
     """
     notifier = get_notifier()
     return notifier.send_sl_trigger_notification(
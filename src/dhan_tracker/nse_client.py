@@ -1,18 +1,52 @@
 """NSE India API client for fetching market data."""
 
+import heapq
+import json
 import logging
+import threading
+import time
 import httpx
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+from pathlib import Path
+
+from .http_utils import HAS_H2, parse_json
 
 logger = logging.getLogger(__name__)
 
+# Session cookies are reused across processes for this long (seconds)
+COOKIE_CACHE_TTL = 15 * 60
+COOKIE_CACHE_PATH = Path.home() / ".cache" / "dhan-tracker" / "nse_cookies.json"
+
+# Concurrent quote requests in get_ltp_batch
+MAX_CONCURRENT_REQUESTS = 8
+
+# Idle keep-alive connections to NSE are kept open this long (seconds)
+KEEPALIVE_EXPIRY = 60.0
+
+# Repeated get_ltp calls for a symbol within this window reuse the last price (seconds)
+LTP_CACHE_TTL = 5.0
+
+
+_STRIP_COMMAS = str.maketrans("", "", ",")
+
+
+def _num(value, default: float = 0.0) -> float:
+    """Parse an NSE numeric field that may be a number or a comma-grouped string."""
+    if value is None or value == "":
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(value.translate(_STRIP_COMMAS))
+
 
 class NSEError(Exception):
     """NSE API error."""
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class NSEQuote:
     """NSE quote data."""
     symbol: str
@@ -28,7 +62,7 @@ class NSEQuote:
     isin: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ETFData:
     """ETF data from NSE."""
     symbol: str
@@ -51,8 +85,19 @@ class NSEClient:
     BASE_URL = "https://www.nseindia.com"
     QUOTE_API = "/api/NextApi/apiClient/GetQuoteApi"
 
-    def __init__(self):
-        """Initialize NSE client with proper headers."""
+    def __init__(
+        self,
+        cookie_cache_path: Path | None = COOKIE_CACHE_PATH,
+        transport: httpx.BaseTransport | None = None,
+    ):
+        """
+        Initialize NSE client with proper headers.
+
+        Args:
+            cookie_cache_path: File used to persist session cookies between
+                runs, or None to always start a fresh session
+            transport: Custom httpx transport (e.g. httpx.MockTransport in tests)
+        """
         # Don't request brotli encoding to avoid decoding issues
         self._client = httpx.Client(
             base_url=self.BASE_URL,
@@ -65,26 +110,110 @@ class NSEClient:
             },
             timeout=30.0,
             follow_redirects=True,
+            # HTTP/2 multiplexes concurrent quotes over one TLS connection
+            http2=HAS_H2,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENT_REQUESTS,
+                max_keepalive_connections=MAX_CONCURRENT_REQUESTS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            transport=transport,
         )
         self._initialized = False
+        self._init_lock = threading.Lock()
+        # Bumped each time fresh cookies are fetched
+        self._session_generation = 0
+        # (symbol, series) -> (fetched_at, price)
+        self._ltp_cache: dict[tuple[str, str], tuple[float, float]] = {}
+        self._cookie_cache_path = cookie_cache_path
+        self._load_cookies()
+
+    def _load_cookies(self):
+        """Reuse session cookies from disk if they are recent enough."""
+        path = self._cookie_cache_path
+        if path is None:
+            return
+
+        now = time.time()
+        try:
+            if now - path.stat().st_mtime > COOKIE_CACHE_TTL:
+                return
+            # Parsed into a separate jar so a malformed cache leaves no partial session
+            cookies = httpx.Cookies()
+            for name, (value, domain, expires) in json.loads(path.read_text()).items():
+                if expires is None or expires > now:
+                    cookies.set(name, value, domain=domain)
+        # A malformed cache (wrong shape or types) is treated as a miss
+        except (OSError, ValueError, TypeError, AttributeError):
+            return
+
+        self._client.cookies.update(cookies)
+
+        if self._client.cookies:
+            self._initialized = True
+            logger.debug("NSE session restored from cookie cache")
 
-    def _init_session(self):
-        """Initialize session by visiting the main page to get cookies."""
-        if self._initialized:
+    def _save_cookies(self):
+        """Persist the current session cookies for the next process."""
+        path = self._cookie_cache_path
+        if path is None:
             return
 
+        cookies = {
+            c.name: (c.value, c.domain, c.expires)
+            for c in self._client.cookies.jar
+        }
         try:
-            # Visit main page to get session cookies
-            response = self._client.get("/")
-            if response.status_code == 200:
-                self._initialized = True
-                logger.debug("NSE session initialized")
-        except Exception as e:
-            logger.warning(f"Failed to initialize NSE session: {e}")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(cookies))
+        except OSError as e:
+            logger.debug(f"Could not write NSE cookie cache: {e}")
 
-    def get_quote(self, symbol: str, series: str = "EQ", market_type: str = "N") -> NSEQuote:
+    def _init_session(self, stale_generation: int | None = None):
         """
-        Get quote data for a symbol.
+        Initialize session by visiting the main page to get cookies.
+
+        Args:
+            stale_generation: Session generation whose cookies were rejected;
+                forces a refresh unless another thread already replaced them
+        """
+        if self._initialized and stale_generation is None:
+            return
+
+        with self._init_lock:
+            if self._initialized and (
+                stale_generation is None or stale_generation != self._session_generation
+            ):
+                return
+
+            try:
+                # Visit main page to get session cookies
+                response = self._client.get("/")
+                if response.status_code == 200:
+                    self._initialized = True
+                    self._session_generation += 1
+                    self._save_cookies()
+                    logger.debug("NSE session initialized")
+            except Exception as e:
+                logger.warning(f"Failed to initialize NSE session: {e}")
+
+    def _get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET an API endpoint, fetching session cookies only if NSE asks for them.
+
+        The request is tried with whatever cookies are already present; on a
+        401/403 the session is (re)initialized and the request retried once.
+        """
+        generation = self._session_generation
+        response = self._client.get(url, **kwargs)
+        if response.status_code in (401, 403):
+            self._init_session(stale_generation=generation)
+            response = self._client.get(url, **kwargs)
+        return response
+
+    def _fetch_equity(self, symbol: str, series: str = "EQ", market_type: str = "N") -> dict:
+        """
+        Fetch the raw equityResponse entry for a symbol.
 
         Args:
             symbol: Trading symbol (e.g., TATSILV, RELIANCE)
@@ -92,10 +221,8 @@ class NSEClient:
             market_type: Market type (default: N for NSE)
 
         Returns:
-            NSEQuote with current market data
+            First equityResponse dict from the quote API
         """
-        self._init_session()
-
         params = {
             "functionName": "getSymbolData",
             "marketType": market_type,
@@ -104,17 +231,40 @@ class NSEClient:
         }
 
         try:
-            response = self._client.get(self.QUOTE_API, params=params)
+            response = self._get(self.QUOTE_API, params=params)
 
             if response.status_code != 200:
                 raise NSEError(f"NSE API returned {response.status_code}")
 
-            data = response.json()
+            data = parse_json(response)
 
             if not data.get("equityResponse"):
                 raise NSEError(f"No data found for symbol: {symbol}")
 
-            equity = data["equityResponse"][0]
+            return data["equityResponse"][0]
+
+        except httpx.RequestError as e:
+            logger.error(f"NSE request error: {e}")
+            raise NSEError(f"Failed to fetch quote: {e}")
+        except (KeyError, ValueError, TypeError) as e:
+            logger.error(f"NSE response parsing error: {e}")
+            raise NSEError(f"Failed to parse quote response: {e}")
+
+    def get_quote(self, symbol: str, series: str = "EQ", market_type: str = "N") -> NSEQuote:
+        """
+        Get quote data for a symbol.
+
+        Args:
+            symbol: Trading symbol (e.g., TATSILV, RELIANCE)
+            series: Series type (default: EQ for equity)
+            market_type: Market type (default: N for NSE)
+
+        Returns:
+            NSEQuote with current market data
+        """
+        equity = self._fetch_equity(symbol, series, market_type)
+
+        try:
             order_book = equity.get("orderBook", {})
             meta_data = equity.get("metaData", {})
 
@@ -132,9 +282,6 @@ class NSEClient:
                 isin=meta_data.get("isinCode", ""),
             )
 
-        except httpx.RequestError as e:
-            logger.error(f"NSE request error: {e}")
-            raise NSEError(f"Failed to fetch quote: {e}")
         except (KeyError, ValueError, TypeError) as e:
             logger.error(f"NSE response parsing error: {e}")
             raise NSEError(f"Failed to parse quote response: {e}")
@@ -143,6 +290,10 @@ class NSEClient:
         """
         Get just the last traded price for a symbol.
 
+        Reads the two price fields straight from the raw response rather
+        than building a full NSEQuote. Prices are cached for LTP_CACHE_TTL
+        seconds; call clear_ltp_cache() to force a refresh.
+
         Args:
             symbol: Trading symbol
             series: Series type (default: EQ)
@@ -150,15 +301,37 @@ class NSEClient:
         Returns:
             Last traded price as float (uses closePrice for accuracy)
         """
-        quote = self.get_quote(symbol, series)
-        # Use close_price as it matches what Dhan shows
-        # fall back to last_price if close_price is 0
-        return quote.close_price if quote.close_price > 0 else quote.last_price
+        key = (symbol.upper(), series)
+        cached = self._ltp_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < LTP_CACHE_TTL:
+            return cached[1]
+
+        equity = self._fetch_equity(symbol, series)
+
+        try:
+            # Use close price as it matches what Dhan shows,
+            # fall back to last price if close price is 0
+            price = float(equity.get("metaData", {}).get("closePrice") or 0)
+            if price <= 0:
+                price = float(equity.get("orderBook", {}).get("lastPrice") or 0)
+        except (ValueError, TypeError) as e:
+            logger.error(f"NSE response parsing error: {e}")
+            raise NSEError(f"Failed to parse quote response: {e}")
+
+        self._ltp_cache[key] = (time.monotonic(), price)
+        return price
+
+    def clear_ltp_cache(self):
+        """Drop cached LTPs so the next get_ltp calls hit NSE."""
+        self._ltp_cache.clear()
 
     def get_ltp_batch(self, symbols: list[str]) -> dict[str, float]:
         """
         Get LTP for multiple symbols.
 
+        Quotes are fetched concurrently over the shared client; if the
+        session needs refreshing, only one worker fetches new cookies.
+
         Args:
             symbols: List of trading symbols
 
@@ -166,13 +339,21 @@ class NSEClient:
             Dict mapping symbol to LTP
         """
         result = {}
-        for symbol in symbols:
-            try:
-                result[symbol] = self.get_ltp(symbol)
-            except NSEError as e:
-                logger.warning(f"Failed to get LTP for {symbol}: {e}")
-                result[symbol] = 0.0
-        return result
+        if not symbols:
+            return result
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            futures = {executor.submit(self.get_ltp, s): s for s in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    result[symbol] = future.result()
+                except NSEError as e:
+                    logger.warning(f"Failed to get LTP for {symbol}: {e}")
+                    result[symbol] = 0.0
+
+        # Preserve the caller's symbol order
+        return {symbol: result[symbol] for symbol in symbols}
 
     def close(self):
         """Close the HTTP client."""
@@ -184,51 +365,49 @@ class NSEClient:
     def __exit__(self, *args):
         self.close()
 
-    def get_etf_data(self) -> list[ETFData]:
+    def get_etf_data(
+        self,
+        predicate: Callable[[float, float, float], bool] | None = None,
+    ) -> list[ETFData]:
         """
         Get all ETF data from NSE including NAV for discount/premium calculation.
 
+        Args:
+            predicate: Optional filter called as predicate(ltp, nav,
+                discount_premium); rows it rejects are skipped before the
+                remaining fields are parsed
+
         Returns:
             List of ETFData with discount/premium calculated
         """
-        self._init_session()
-
         try:
             # Fetch ETF data from NSE API
-            response = self._client.get("/api/etf")
+            response = self._get("/api/etf")
 
             if response.status_code != 200:
                 raise NSEError(f"NSE ETF API returned {response.status_code}")
 
-            data = response.json()
+            data = parse_json(response)
             etf_list = data.get("data", [])
 
             result = []
             for etf in etf_list:
                 try:
-                    ltp = float(etf.get("ltP", 0) or 0)
-                    nav = float(etf.get("nav", 0) or 0)
+                    ltp = _num(etf.get("ltP"))
+                    nav = _num(etf.get("nav"))
 
                     # Calculate discount/premium percentage
                     # Negative = discount (good to buy), Positive = premium (avoid)
-                    if nav > 0:
-                        discount_premium = ((ltp - nav) / nav) * 100
-                    else:
-                        discount_premium = 0
-
-                    # Parse volume - can be string with commas or int
-                    qty_raw = etf.get("qty", "0")
-                    if isinstance(qty_raw, str):
-                        qty_raw = qty_raw.replace(",", "")
-                    volume = int(float(qty_raw) if qty_raw else 0)
-
-                    # Parse turnover (traded value) - convert from raw value to Crores
-                    trd_val_raw = etf.get("trdVal", 0)
-                    if isinstance(trd_val_raw, str):
-                        trd_val_raw = trd_val_raw.replace(",", "")
-                    # Convert to Cr
-                    turnover = float(trd_val_raw) / \
-                        10000000 if trd_val_raw else 0
+                    discount_premium = round(
+                        (ltp - nav) / nav * 100 if nav > 0 else 0.0, 2)
+
+                    if predicate is not None and not predicate(ltp, nav, discount_premium):
+                        continue
+
+                    # Volume and traded value may be strings with commas
+                    volume = int(_num(etf.get("qty")))
+                    # Convert turnover from raw value to Crores
+                    turnover = _num(etf.get("trdVal")) / 10000000
 
                     result.append(ETFData(
                         symbol=etf.get("symbol", ""),
@@ -236,13 +415,13 @@ class NSEClient:
                             "underlying", ""),
                         ltp=ltp,
                         nav=nav,
-                        change=float(etf.get("chn", 0) or 0),
-                        pchange=float(etf.get("per", 0) or 0),
+                        change=_num(etf.get("chn")),
+                        pchange=_num(etf.get("per")),
                         volume=volume,
                         turnover=round(turnover, 2),
-                        week52_high=float(etf.get("wkhi", 0) or 0),
-                        week52_low=float(etf.get("wklo", 0) or 0),
-                        discount_premium=round(discount_premium, 2),
+                        week52_high=_num(etf.get("wkhi")),
+                        week52_low=_num(etf.get("wklo")),
+                        discount_premium=discount_premium,
                         isin=etf.get("meta", {}).get(
                             "isin", "") or etf.get("isinCode", ""),
                     ))
@@ -271,15 +450,10 @@ class NSEClient:
         Returns:
             List of ETFs sorted by discount (best discounts first)
         """
-        all_etfs = self.get_etf_data()
-
         # Filter ETFs with valid NAV and trading at discount
-        discounted = [
-            etf for etf in all_etfs
-            if etf.nav > 0 and etf.ltp > 0 and etf.discount_premium <= min_discount
-        ]
-
-        # Sort by discount (most negative first = best discount)
-        discounted.sort(key=lambda x: x.discount_premium)
+        discounted = self.get_etf_data(
+            predicate=lambda ltp, nav, dp: nav > 0 and ltp > 0 and dp <= min_discount
+        )
 
-        return discounted[:max_results]
+        # Best discounts (most negative) first
+        return heapq.nsmallest(max_results, discounted, key=lambda x: x.discount_premium)
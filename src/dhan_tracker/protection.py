@@ -1,20 +1,48 @@
 """Portfolio protection strategies using Forever Orders (GTT)."""
 
+import asyncio
 import logging
-from dataclasses import dataclass
+import math
+import sys
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Optional
 
-from .client import DhanClient
+import httpx
+
+from .client import DhanClient, DhanAPIError
 from .nse_client import NSEClient, NSEError
 from .upstox_client import UpstoxClient, UpstoxAPIError, MarketData
-from .models import Holding, SuperOrder, ProtectiveOrder, ForeverOrder
+from .models import Holding, SuperOrder, ProtectiveOrder, ForeverOrder, ProductType
 
 
 logger = logging.getLogger(__name__)
 
+# NSE price tick (₹)
+TICK_SIZE = 0.05
+
+# Order type/status sets used to recognise our protection orders
+_PROTECTIVE_TYPES = frozenset({"STOP_LOSS", "STOP_LOSS_MARKET"})
+_PENDING_STATUSES = frozenset({"PENDING", "TRANSIT"})
+_ACTIVE_STATUSES = _PENDING_STATUSES | {"PART_TRADED"}
+# Forever Order statuses that count a holding as protected in the summary
+_SUMMARY_STATUSES = _ACTIVE_STATUSES | {"CONFIRM"}
+
+# Protective orders always sell delivery holdings
+PRODUCT_TYPE = ProductType.CNC.value
 
-@dataclass
+# Errors expected from broker order calls (ValueError: undecodable body).
+# Anything else is logged as a bug by _map_orders and fails only that holding
+ORDER_ERRORS = (DhanAPIError, httpx.HTTPError, TimeoutError, ValueError)
+
+
+@dataclass(slots=True)
 class ProtectionConfig:
     """Configuration for portfolio protection.
 
@@ -73,14 +101,122 @@ class ProtectionConfig:
     # Exchange segment (NSE_EQ or BSE_EQ)
     exchange_segment: str = "NSE_EQ"
 
+    # Concurrent LTP requests (lower this if the data provider throttles)
+    ltp_concurrency: int = 8
+
+    # Reuse a fetched LTP for this long before asking the provider again (seconds)
+    ltp_cache_ttl_seconds: float = 30.0
+
+    # Concurrent order place/modify requests (kept low for broker rate limits)
+    order_concurrency: int = 6
+
+    # Reuse fetched holdings for read-only views (plan, summary, 200-DMA)
+    holdings_cache_ttl_seconds: float = 10.0
+
+    # Concurrent order cancellations (lower this for tight broker rate limits)
+    cancel_concurrency: int = 8
+
+    # Reuse fetched Forever/pending SL orders for this long (seconds); the
+    # cache is dropped whenever this protector places, modifies or cancels
+    order_cache_ttl_seconds: float = 30.0
+
+    # Existing orders are only modified when the trigger moves by more than
+    # this (₹) or 0.1% of the old trigger, whichever is larger
+    modify_epsilon: float = TICK_SIZE
+
     # DEPRECATED: Legacy settings kept for backward compatibility
     stop_loss_from_high_percent: float = 10.0
     stop_loss_percent: float = 5.0
     profit_lock_threshold: float = 10.0
     profit_lock_percent: float = 5.0
 
+    # Derived price multipliers, computed once from the percentages above
+    _sl_mult: float = field(init=False, repr=False, compare=False)
+    _tgt_mult: float = field(init=False, repr=False, compare=False)
+    _modify_epsilon_paise: int = field(init=False, repr=False, compare=False)
+
+    # profit_tiers sorted by threshold, split for bisect lookups
+    _tier_thresholds: tuple = field(init=False, repr=False, compare=False)
+    _tier_locks: tuple = field(init=False, repr=False, compare=False)
+    # The same locks in basis points, for integer-paise SL arithmetic
+    _tier_lock_bps: tuple = field(init=False, repr=False, compare=False)
+    # %-templates for the profit tier labels, offset by one so index 0 is
+    # the below-first-tier (breakeven) label; only P&L is filled in per call
+    _tier_templates: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._sl_mult = 1 - self.stop_loss_percent / 100
+        self._tgt_mult = 1 + self.target_percent / 100
+        self._modify_epsilon_paise = round(self.modify_epsilon * 100)
+        tiers = sorted(self.profit_tiers)
+        self._tier_thresholds = tuple(min_pnl for min_pnl, _ in tiers)
+        self._tier_locks = tuple(lock_pct for _, lock_pct in tiers)
+        self._tier_lock_bps = tuple(round(lock_pct * 100) for lock_pct in self._tier_locks)
+        self._tier_templates = tuple(
+            _profit_tier_template(lock_pct)
+            for lock_pct in (0.0, *self._tier_locks)
+        )
+
+
+def _profit_tier_template(lock_percent: float) -> str:
+    """Tier label for a profit lock, with a %-placeholder for the P&L."""
+    if lock_percent > 0:
+        name = f"PROFIT LOCK +{lock_percent:.0f}%%"
+        action = f"SL at cost +{lock_percent}%%"
+    else:
+        name = "CAPITAL PROTECT"
+        action = "SL at cost (breakeven)"
+    return f"{name} (P&L %+.1f%%): {action}"
+
+
+def snap_to_tick(price: float, tick_size: float = TICK_SIZE) -> float:
+    """Round a price to the nearest exchange tick (₹0.05 for most NSE scrips)."""
+    # Count ticks, then scale in integer paise so the result is the exact
+    # 2-decimal price rather than e.g. 29.750000000000004
+    return round(price / tick_size) * round(tick_size * 100) / 100
+
+
+def _floor_to_tick(price: float, tick_size: float = TICK_SIZE) -> float:
+    """Round a price down to an exchange tick, for SELL stop triggers."""
+    tick_paise = round(tick_size * 100)
+    return round(price * 100) // tick_paise * tick_paise / 100
+
+
+def _apply_bps(price: float, bps: int) -> float:
+    """price * (1 + bps/10000) in integer paise, rounded half-up to the paisa."""
+    paise = round(price * 100)
+    return (paise * (10000 + bps) + 5000) // 10000 / 100
+
+
+# Shared market data clients
+_nse_client: NSEClient | None = None
+_upstox_client: UpstoxClient | None = None
 
-@dataclass
+
+def get_nse_client() -> NSEClient:
+    """Get the shared NSE client instance."""
+    global _nse_client
+    if _nse_client is None:
+        _nse_client = NSEClient()
+    return _nse_client
+
+
+def get_upstox_client() -> UpstoxClient:
+    """Get the shared Upstox client instance."""
+    global _upstox_client
+    if _upstox_client is None:
+        _upstox_client = UpstoxClient()
+    return _upstox_client
+
+
+def _index_holdings(holdings: list[Holding] | dict[str, Holding]) -> dict[str, Holding]:
+    """Map security_id to holding, passing through an already-built index."""
+    if isinstance(holdings, dict):
+        return holdings
+    return {h.security_id: h for h in holdings}
+
+
+@dataclass(slots=True, frozen=True)
 class ProtectionResult:
     """Result of a protection order attempt."""
 
@@ -93,6 +229,151 @@ class ProtectionResult:
     target_price: float = 0.0
 
 
+def _active_protection(forever_orders: list[ForeverOrder]) -> dict[str, ForeverOrder]:
+    """Map security_id to its live SELL Forever Order."""
+    return {
+        o.security_id: o
+        for o in forever_orders
+        if o.transaction_type == "SELL"
+        and o.order_status in _ACTIVE_STATUSES
+    }
+
+
+def _get_pending_sl_orders(client: DhanClient) -> list[dict]:
+    """Fetch pending SELL SL orders (our AMO protection) from the order book."""
+    return client.get_orders(
+        statuses=_PENDING_STATUSES,
+        transaction_type="SELL",
+        order_types=_PROTECTIVE_TYPES,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _tiered_sl(
+    cost_price: float,
+    current_price: float,
+    max_loss_percent: float,
+    deep_loss_sl_percent: float,
+    tier_thresholds: tuple,
+    tier_lock_bps: tuple,
+    tier_templates: tuple,
+) -> tuple[float, str]:
+    """Memoized body of PortfolioProtector.calculate_tiered_stop_loss()."""
+    deep_loss_bps = -round(deep_loss_sl_percent * 100)
+    if cost_price <= 0:
+        # Fallback to LTP-based
+        return (_floor_to_tick(_apply_bps(current_price, deep_loss_bps)),
+                "LTP-based (no cost data)")
+
+    pnl_percent = ((current_price - cost_price) / cost_price) * 100
+
+    # PROFIT: Use progressive tiers
+    if pnl_percent >= 0:
+        # Find the highest profit tier at or below the current P&L
+        idx = bisect_right(tier_thresholds, pnl_percent) - 1
+        lock_bps = tier_lock_bps[idx] if idx >= 0 else 0
+
+        sl = _apply_bps(cost_price, lock_bps)
+        tier = tier_templates[idx + 1] % pnl_percent
+
+    elif pnl_percent > -max_loss_percent:
+        # SMALL LOSS: Allow recovery, max 10% loss
+        sl = _apply_bps(cost_price, -round(max_loss_percent * 100))
+        tier = f"RECOVERY ROOM (P&L {pnl_percent:+.1f}%): SL at cost -{max_loss_percent}%"
+
+    else:
+        # DEEP LOSS: Limit further damage
+        sl = _apply_bps(current_price, deep_loss_bps)
+        tier = f"DAMAGE LIMIT (P&L {pnl_percent:+.1f}%): SL at LTP -{deep_loss_sl_percent}%"
+
+    # Triggers must sit on the tick grid; rounding down keeps the stop at or
+    # below the tier's level
+    return _floor_to_tick(sl), tier
+
+
+@lru_cache(maxsize=4096)
+def _order_sl(cost_price: float, ltp: float, *tier_args) -> tuple[float, str, float]:
+    """
+    Tiered SL for an order, with the safety fallback and P&L folded in.
+
+    Memoized like _tiered_sl(), so planning a whole portfolio is a series of
+    cache hits once prices settle.
+
+    Returns:
+        Tuple of (stop_loss_price, tier_description, pnl_percent)
+    """
+    sl, tier = _tiered_sl(cost_price, ltp, *tier_args)
+
+    # Don't place SL if it's above current price (would trigger immediately)
+    if sl >= ltp:
+        sl = _floor_to_tick(_apply_bps(ltp, -500))  # Fallback to 5% below LTP
+        tier = "SAFETY FALLBACK: SL at LTP -5% (original SL >= LTP)"
+
+    pnl_percent = (ltp - cost_price) / cost_price * 100 if cost_price > 0 else 0
+    return sl, tier, pnl_percent
+
+
+@dataclass(slots=True)
+class _OrderAction:
+    """Order call decided for one holding, to be sent in the I/O phase."""
+
+    holding: Holding
+    ltp: float
+    stop_loss: float
+    tier: str
+    pnl_percent: float
+    # ForeverOrder (regular) or order dict (AMO) to modify; None to place new
+    existing: ForeverOrder | dict | None = None
+    target: float = 0.0
+    # Response from modify_amo_orders_bulk for an existing AMO order; None if
+    # the modify failed
+    modify_response: dict | None = None
+
+
+@dataclass(slots=True)
+class HoldingPlan:
+    """Planned protection for one holding (see get_protection_plan)."""
+
+    symbol: str
+    quantity: int
+    cost_price: float
+    current_price: float
+    invested: float
+    current_value: float
+    pnl: float
+    pnl_percent: float
+    stop_loss: float
+    tier: str
+    protected_value: float
+    loss_if_triggered: float
+    loss_percent_from_current: float
+    loss_from_cost: float
+    loss_percent_from_cost: float
+
+
+class _OrderIndex:
+    """
+    Pending SL orders and Forever Orders fetched once, indexed by security_id.
+
+    Build one per run and pass it to the PortfolioProtector methods that
+    accept order_index, so the order endpoints are hit once per run.
+    """
+
+    def __init__(self, client: DhanClient):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            sl_orders = executor.submit(_get_pending_sl_orders, client)
+            forever_orders = executor.submit(client.get_forever_orders)
+            self.pending_sl_orders: list[dict] = sl_orders.result()
+            self.forever_orders: list[ForeverOrder] = [
+                ForeverOrder.from_api_response(o) for o in forever_orders.result()
+            ]
+
+        self.protection_by_secid = _active_protection(self.forever_orders)
+        self.pending_amo_by_secid = {
+            o.get("securityId", ""): o for o in self.pending_sl_orders
+        }
+
+
 class PortfolioProtector:
     """
     Manages portfolio protection by placing DDPI super orders with stop losses.
@@ -122,10 +403,77 @@ class PortfolioProtector:
         self.client = client
         self.config = config or ProtectionConfig()
         self._ltp_cache: dict[str, float] = {}
+        # trading_symbol -> (ltp, fetched_at monotonic time)
+        self._ltp_ttl_cache: dict[str, tuple[float, float]] = {}
         self._52week_high_cache: dict[str, float] = {}
         self._200dma_cache: dict[str, float | None] = {}
-        self._nse_client = NSEClient()
-        self._upstox_client = UpstoxClient()
+        # ISIN -> MarketData, so repeat lookups within a run are free
+        self._market_data_cache: dict[str, MarketData] = {}
+        # (fetched_at monotonic time, orders by security_id)
+        self._forever_cache: tuple[float, list[ForeverOrder]] | None = None
+        self._protection_cache: tuple[float, dict[str, ForeverOrder]] | None = None
+        self._pending_sl_cache: tuple[float, dict[str, dict]] | None = None
+        # Inputs and results of the last non-forced protect_portfolio() run
+        self._last_protect_sig: tuple | None = None
+        self._last_protect_results: list[ProtectionResult] = []
+        self._holdings_cache: list[Holding] | None = None
+        self._holdings_cache_ts = 0.0
+        # Market data clients are shared so their connection pools (and NSE
+        # session cookies) survive across protector instances
+        self._nse_client = get_nse_client()
+        self._upstox_client = get_upstox_client()
+        # Shared by every fan-out helper; created on first use
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker pool (the API clients are left open)."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        """Worker pool reused for LTP fetches, order placement and cancels."""
+        with self._executor_lock:
+            if self._executor is None:
+                cfg = self.config
+                workers = max(1, cfg.ltp_concurrency,
+                              cfg.order_concurrency, cfg.cancel_concurrency)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="protect")
+            return self._executor
+
+    @staticmethod
+    def _bounded(func: Callable, limit: int) -> Callable:
+        """Wrap func so at most limit calls run at once on the shared pool."""
+        gate = threading.BoundedSemaphore(max(1, limit))
+
+        def run(*args):
+            with gate:
+                return func(*args)
+
+        return run
+
+    def _get_active_holdings(self) -> list[Holding]:
+        """Holdings with available quantity, reused for holdings_cache_ttl_seconds."""
+        now = time.monotonic()
+        if (
+            self._holdings_cache is not None
+            and now - self._holdings_cache_ts < self.config.holdings_cache_ttl_seconds
+        ):
+            return self._holdings_cache
+
+        self._holdings_cache = [
+            h for h in self.client.get_holdings() if h.available_qty > 0]
+        self._holdings_cache_ts = now
+        return self._holdings_cache
 
     def calculate_tiered_stop_loss(
         self,
@@ -149,42 +497,44 @@ class PortfolioProtector:
         Returns:
             Tuple of (stop_loss_price, tier_description)
         """
-        if cost_price <= 0:
-            # Fallback to LTP-based
-            sl = round(current_price *
-                       (1 - self.config.deep_loss_sl_percent / 100), 2)
-            return sl, "LTP-based (no cost data)"
-
-        pnl_percent = ((current_price - cost_price) / cost_price) * 100
-
-        # PROFIT: Use progressive tiers
-        if pnl_percent >= 0:
-            # Find the appropriate profit tier
-            lock_percent = 0.0
-            tier_name = "CAPITAL PROTECT"
-
-            for min_pnl, lock_pct in self.config.profit_tiers:
-                if pnl_percent >= min_pnl:
-                    lock_percent = lock_pct
-                    if lock_pct > 0:
-                        tier_name = f"PROFIT LOCK +{lock_pct:.0f}%"
-                    break
+        return _tiered_sl(
+            cost_price,
+            current_price,
+            self.config.max_loss_percent,
+            self.config.deep_loss_sl_percent,
+            self.config._tier_thresholds,
+            self.config._tier_lock_bps,
+            self.config._tier_templates,
+        )
 
-            sl = round(cost_price * (1 + lock_percent / 100), 2)
-            tier = f"{tier_name} (P&L {pnl_percent:+.1f}%): SL at cost {'+' + str(lock_percent) + '%' if lock_percent > 0 else '(breakeven)'}"
+    def _order_stop_loss(self, cost_price: float, ltp: float) -> tuple[float, str, float]:
+        """
+        Stop loss to place for a holding: the tiered SL, or 5% below LTP if
+        the tier would put it at or above the LTP.
 
-        elif pnl_percent > -self.config.max_loss_percent:
-            # SMALL LOSS: Allow recovery, max 10% loss
-            sl = round(cost_price * (1 - self.config.max_loss_percent / 100), 2)
-            tier = f"RECOVERY ROOM (P&L {pnl_percent:+.1f}%): SL at cost -{self.config.max_loss_percent}%"
+        Args:
+            cost_price: Average cost price
+            ltp: Current market price
 
-        else:
-            # DEEP LOSS: Limit further damage
-            sl = round(current_price *
-                       (1 - self.config.deep_loss_sl_percent / 100), 2)
-            tier = f"DAMAGE LIMIT (P&L {pnl_percent:+.1f}%): SL at LTP -{self.config.deep_loss_sl_percent}%"
+        Returns:
+            Tuple of (stop_loss_price, tier_description, pnl_percent)
+        """
+        cfg = self.config
+        return _order_sl(
+            cost_price,
+            ltp,
+            cfg.max_loss_percent,
+            cfg.deep_loss_sl_percent,
+            cfg._tier_thresholds,
+            cfg._tier_lock_bps,
+            cfg._tier_templates,
+        )
 
-        return sl, tier
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop memoized stop loss results (only needed to free memory)."""
+        _tiered_sl.cache_clear()
+        _order_sl.cache_clear()
 
     def calculate_stop_loss_from_high(self, high_52week: float) -> float:
         """
@@ -208,9 +558,9 @@ class PortfolioProtector:
             ltp: Last Traded Price (current market price)
 
         Returns:
-            Stop loss trigger price
+            Stop loss trigger price, snapped to the exchange tick size
         """
-        return round(ltp * (1 - self.config.stop_loss_percent / 100), 2)
+        return snap_to_tick(ltp * self.config._sl_mult)
 
     def calculate_target_price(self, ltp: float) -> float:
         """
@@ -220,82 +570,180 @@ class PortfolioProtector:
             ltp: Last Traded Price (current market price)
 
         Returns:
-            Target price for profit booking
+            Target price for profit booking, snapped to the exchange tick size
         """
-        return round(ltp * (1 + self.config.target_percent / 100), 2)
+        return snap_to_tick(ltp * self.config._tgt_mult)
 
     def fetch_52_week_highs(self, holdings: list[Holding]) -> dict[str, float]:
         """
         Fetch 52-week high for all holdings using Upstox API.
 
+        Served from fetch_all_market_data(), so it shares one set of Upstox
+        requests with the 200-DMA and close lookups.
+
         Args:
             holdings: List of holdings
 
         Returns:
             Dictionary mapping security_id to 52-week high
         """
-        logger.info(
-            f"Fetching 52-week highs from Upstox for {len(holdings)} holdings...")
-        self._52week_high_cache = {}
-
-        for holding in holdings:
-            try:
-                high = self._upstox_client.get_52_week_high(
-                    holding.isin, holding.exchange)
-                self._52week_high_cache[holding.security_id] = high
-                if high > 0:
-                    logger.info(
-                        f"52W High for {holding.trading_symbol}: ₹{high:.2f}")
-            except Exception as e:
-                logger.warning(
-                    f"Failed to get 52W high for {holding.trading_symbol}: {e}")
-                self._52week_high_cache[holding.security_id] = 0.0
-
+        market_data = self.fetch_all_market_data(holdings)
+        self._52week_high_cache = {
+            h.security_id: market_data[h.isin].high_52_week if h.isin in market_data else 0.0
+            for h in holdings
+        }
         return self._52week_high_cache
 
     def fetch_ltp_for_holdings(self, holdings: list[Holding]) -> dict[str, float]:
         """
-        Fetch current LTP for all holdings using Upstox latest close price.
+        Fetch current LTP for all holdings.
 
-        Uses Upstox historical API which works without authentication.
-        Returns latest closing price as proxy for LTP (updated daily).
+        Holdings are priced with a single Dhan market feed request. Any the
+        feed cannot price fall back to the Upstox latest close (historical
+        API, no authentication) and then NSE, concurrently, up to
+        config.ltp_concurrency at a time.
 
         Args:
             holdings: List of holdings
 
         Returns:
-            Dictionary mapping security_id to LTP (latest close)
+            Dictionary mapping security_id to LTP
         """
         self._ltp_cache = {}
+        if not holdings:
+            return self._ltp_cache
 
+        started = time.monotonic()
+        uncached = []
+        seen: set[str] = set()
         for holding in holdings:
-            try:
-                # Use Upstox latest close as LTP proxy
-                ltp = self._upstox_client.get_latest_close(
-                    holding.isin, holding.exchange)
+            ltp = self._cached_ltp(holding)
+            if ltp is not None:
                 self._ltp_cache[holding.security_id] = ltp
-                logger.info(
-                    f"LTP for {holding.trading_symbol}: ₹{ltp:.2f} (Upstox close)")
-            except UpstoxAPIError as e:
-                logger.warning(
-                    f"Failed to get LTP from Upstox for {holding.trading_symbol}: {e}")
-                # Fallback to NSE
-                try:
-                    ltp = self._nse_client.get_ltp(holding.trading_symbol)
+            elif holding.security_id not in seen:
+                seen.add(holding.security_id)
+                uncached.append(holding)
+
+        batch = self._fetch_ltp_batch(uncached) if uncached else {}
+
+        pending = []
+        for holding in uncached:
+            ltp = batch.get(holding.security_id, 0.0)
+            if ltp > 0:
+                self._ltp_cache[holding.security_id] = ltp
+            else:
+                pending.append(holding)
+
+        if pending:
+            # Fetch each symbol once, then fan out to every holding using it
+            by_symbol: dict[str, list[Holding]] = defaultdict(list)
+            for holding in pending:
+                by_symbol[holding.trading_symbol].append(holding)
+            groups = list(by_symbol.values())
+
+            fetch = self._bounded(lambda group: self._fetch_ltp(group[0]),
+                                  self.config.ltp_concurrency)
+            for group, ltp in zip(groups, self._pool().map(fetch, groups)):
+                for holding in group:
                     self._ltp_cache[holding.security_id] = ltp
-                    logger.info(
-                        f"LTP for {holding.trading_symbol}: ₹{ltp:.2f} (NSE fallback)")
-                except NSEError as nse_e:
-                    logger.warning(f"NSE fallback also failed: {nse_e}")
-                    self._ltp_cache[holding.security_id] = 0.0
 
+        ok = sum(1 for ltp in self._ltp_cache.values() if ltp > 0)
+        logger.info("Fetched LTP for %d/%d holdings in %.1fs",
+                    ok, len(self._ltp_cache), time.monotonic() - started)
         return self._ltp_cache
 
+    def _fetch_ltp_batch(self, holdings: list[Holding]) -> dict[str, float]:
+        """
+        Price holdings with one Dhan market feed (/marketfeed/ltp) request.
+
+        Args:
+            holdings: Holdings to price
+
+        Returns:
+            Dictionary mapping security_id to LTP; empty if the feed is unavailable
+        """
+        now = time.monotonic()
+        fresh: dict[str, tuple[float, float]] = {}
+        try:
+            ltps = self.client.get_ltp_for_holdings(holdings)
+            for holding in holdings:
+                ltp = ltps.get(holding.security_id, 0.0)
+                if ltp > 0:
+                    fresh[holding.trading_symbol] = (ltp, now)
+        # Non-JSON or unexpectedly shaped responses fall back like API errors
+        except (*ORDER_ERRORS, KeyError, TypeError, AttributeError) as e:
+            logger.warning(
+                "Dhan batch LTP unavailable, pricing holdings individually: %s", e)
+            return {}
+
+        self._ltp_ttl_cache.update(fresh)
+        return ltps
+
+    def _cached_ltp(self, holding: Holding) -> float | None:
+        """Return the holding's LTP if fetched within config.ltp_cache_ttl_seconds."""
+        cached = self._ltp_ttl_cache.get(holding.trading_symbol)
+        if cached and time.monotonic() - cached[1] < self.config.ltp_cache_ttl_seconds:
+            return cached[0]
+        return None
+
+    def clear_ltp_cache(self) -> None:
+        """Forget previously fetched prices so the next fetch hits the providers."""
+        self._ltp_cache = {}
+        self._ltp_ttl_cache.clear()
+        self._market_data_cache.clear()
+
+    def _fetch_ltp(self, holding: Holding) -> float:
+        """
+        Fetch LTP for one holding: Upstox latest close, falling back to NSE.
+
+        Prices fetched within config.ltp_cache_ttl_seconds are reused.
+
+        Args:
+            holding: Holding to price
+
+        Returns:
+            LTP, or 0.0 if both sources failed
+        """
+        cached = self._cached_ltp(holding)
+        if cached is not None:
+            return cached
+
+        ltp = self._fetch_ltp_uncached(holding)
+        if ltp > 0:
+            self._ltp_ttl_cache[holding.trading_symbol] = (ltp, time.monotonic())
+        return ltp
+
+    def _fetch_ltp_uncached(self, holding: Holding) -> float:
+        """Query Upstox, then NSE, for a holding's LTP."""
+        try:
+            # Use Upstox latest close as LTP proxy
+            ltp = self._upstox_client.get_latest_close(
+                holding.isin, holding.exchange)
+            logger.debug("LTP for %s: ₹%.2f (Upstox close)",
+                         holding.trading_symbol, ltp)
+            return ltp
+        except UpstoxAPIError as e:
+            logger.warning(
+                "Failed to get LTP from Upstox for %s: %s", holding.trading_symbol, e)
+
+        # Fallback to NSE
+        try:
+            ltp = self._nse_client.get_ltp(holding.trading_symbol)
+            logger.debug("LTP for %s: ₹%.2f (NSE fallback)",
+                         holding.trading_symbol, ltp)
+            return ltp
+        except NSEError as nse_e:
+            logger.warning("NSE fallback also failed: %s", nse_e)
+            return 0.0
+
     def fetch_all_market_data(self, holdings: list[Holding]) -> dict[str, MarketData]:
         """
         Fetch all market data (LTP, 52W high, 200-DMA) for holdings in one batch.
 
-        More efficient than separate calls as it caches the API responses.
+        This is the single Upstox entry point: responses are cached by ISIN,
+        so only holdings not seen before by this protector are requested.
+        One candle series yields the close, 52W high and 200-DMA together;
+        holdings are fetched concurrently, config.ltp_concurrency at a time.
 
         Args:
             holdings: List of holdings
@@ -303,54 +751,66 @@ class PortfolioProtector:
         Returns:
             Dictionary mapping ISIN to MarketData
         """
-        logger.info(
-            f"Fetching market data from Upstox for {len(holdings)} holdings...")
-
-        market_data = self._upstox_client.get_market_data_bulk(holdings)
+        missing = [h for h in holdings if h.isin not in self._market_data_cache]
+        if missing:
+            logger.info(
+                "Fetching market data from Upstox for %d holdings...", len(missing))
+            fetch = self._bounded(self._fetch_market_data, self.config.ltp_concurrency)
+            for holding, data in zip(missing, self._pool().map(fetch, missing)):
+                if data is not None:
+                    self._market_data_cache[holding.isin] = data
+
+        market_data = {
+            h.isin: self._market_data_cache[h.isin]
+            for h in holdings
+            if h.isin in self._market_data_cache
+        }
 
         # Populate caches
         for holding in holdings:
             data = market_data.get(holding.isin)
             if data:
                 self._ltp_cache[holding.security_id] = data.latest_close
+                if data.latest_close > 0:
+                    self._ltp_ttl_cache[holding.trading_symbol] = (
+                        data.latest_close, time.monotonic())
                 self._52week_high_cache[holding.security_id] = data.high_52_week
                 self._200dma_cache[holding.security_id] = data.dma_200
-                dma_str = f"₹{data.dma_200:.2f}" if data.dma_200 else "N/A"
-                logger.info(
-                    f"{holding.trading_symbol}: Close=₹{data.latest_close:.2f}, "
-                    f"52WH=₹{data.high_52_week:.2f}, "
-                    f"200DMA={dma_str}"
-                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    dma_str = f"₹{data.dma_200:.2f}" if data.dma_200 else "N/A"
+                    logger.debug(
+                        "%s: Close=₹%.2f, 52WH=₹%.2f, 200DMA=%s",
+                        holding.trading_symbol, data.latest_close,
+                        data.high_52_week, dma_str,
+                    )
 
         return market_data
 
+    def _fetch_market_data(self, holding: Holding) -> MarketData | None:
+        """Upstox market data for one holding, or None if it failed (logged)."""
+        try:
+            return self._upstox_client.get_market_data(holding.isin, holding.exchange)
+        except UpstoxAPIError as e:
+            logger.warning("Failed to get market data for %s: %s", holding.isin, e)
+            return None
+
     def fetch_200_dma(self, holdings: list[Holding]) -> dict[str, float | None]:
         """
         Fetch 200-day moving average for all holdings.
 
+        Served from fetch_all_market_data(), like fetch_52_week_highs().
+
         Args:
             holdings: List of holdings
 
         Returns:
             Dictionary mapping security_id to 200-DMA (or None if insufficient data)
         """
-        logger.info(
-            f"Fetching 200-DMA from Upstox for {len(holdings)} holdings...")
-        self._200dma_cache = {}
-
-        for holding in holdings:
-            try:
-                dma = self._upstox_client.get_200_dma(
-                    holding.isin, holding.exchange)
-                self._200dma_cache[holding.security_id] = dma
-                if dma:
-                    logger.info(
-                        f"200-DMA for {holding.trading_symbol}: ₹{dma:.2f}")
-            except Exception as e:
-                logger.warning(
-                    f"Failed to get 200-DMA for {holding.trading_symbol}: {e}")
-                self._200dma_cache[holding.security_id] = None
-
+        market_data = self.fetch_all_market_data(holdings)
+        self._200dma_cache = {
+            h.security_id: market_data[h.isin].dma_200 if h.isin in market_data else None
+            for h in holdings
+        }
         return self._200dma_cache
 
     def check_200_dma_status(self, holdings: list[Holding] | None = None) -> list[dict]:
@@ -366,8 +826,7 @@ class PortfolioProtector:
             List of dicts with holding info and 200-DMA status
         """
         if holdings is None:
-            holdings = self.client.get_holdings()
-            holdings = [h for h in holdings if h.available_qty > 0]
+            holdings = self._get_active_holdings()
 
         if not holdings:
             return []
@@ -376,40 +835,44 @@ class PortfolioProtector:
         market_data = self.fetch_all_market_data(holdings)
 
         results = []
+        append = results.append
+        get_data = market_data.get
         for holding in holdings:
-            data = market_data.get(holding.isin)
+            data = get_data(holding.isin)
             if not data:
                 continue
 
+            close = data.latest_close
+            dma = data.dma_200
+            avg_cost = holding.avg_cost_price
             status = {
                 "symbol": holding.trading_symbol,
                 "isin": holding.isin,
                 "quantity": holding.available_qty,
-                "avg_cost": holding.avg_cost_price,
-                "latest_close": data.latest_close,
+                "avg_cost": avg_cost,
+                "latest_close": close,
                 "high_52_week": data.high_52_week,
-                "dma_200": data.dma_200,
-                "above_200dma": data.latest_close > data.dma_200 if data.dma_200 else None,
-                "pnl_percent": ((data.latest_close - holding.avg_cost_price) /
-                                holding.avg_cost_price * 100) if holding.avg_cost_price > 0 else 0,
+                "dma_200": dma,
+                "above_200dma": None,
+                "pnl_percent": (close - avg_cost) / avg_cost * 100 if avg_cost > 0 else 0,
             }
 
-            if data.dma_200:
-                status["dma_diff_percent"] = ((data.latest_close - data.dma_200) /
-                                              data.dma_200 * 100)
+            # Compare and divide only when a 200-DMA is available
+            if dma:
+                above = close > dma
+                status["above_200dma"] = above
+                status["dma_diff_percent"] = (close - dma) / dma * 100
+                if not above:
+                    logger.warning(
+                        "⚠ %s is BELOW 200-DMA: Close=₹%.2f, 200-DMA=₹%.2f",
+                        holding.trading_symbol, close, dma,
+                    )
 
-            results.append(status)
-
-            # Log warning for holdings below 200-DMA
-            if status.get("above_200dma") is False:
-                logger.warning(
-                    f"⚠ {holding.trading_symbol} is BELOW 200-DMA: "
-                    f"Close=₹{data.latest_close:.2f}, 200-DMA=₹{data.dma_200:.2f}"
-                )
+            append(status)
 
         return results
 
-    def get_protection_plan(self, holdings: list[Holding] | None = None) -> list[dict]:
+    def get_protection_plan(self, holdings: list[Holding] | None = None) -> dict | list:
         """
         Calculate protection plan for all holdings WITHOUT placing orders.
 
@@ -420,19 +883,18 @@ class PortfolioProtector:
             holdings: List of holdings (fetches if None)
 
         Returns:
-            List of dicts with protection plan for each holding
+            {"holdings": list of HoldingPlan, "summary": totals dict}, or an
+            empty list if there is nothing to protect
         """
         if holdings is None:
-            holdings = self.client.get_holdings()
-            holdings = [h for h in holdings if h.available_qty > 0]
+            holdings = self._get_active_holdings()
 
         if not holdings:
             logger.info("No holdings to protect")
             return []
 
         # Fetch market data
-        logger.info(
-            f"Calculating protection plan for {len(holdings)} holdings...")
+        logger.info("Calculating protection plan for %d holdings...", len(holdings))
         market_data = self.fetch_all_market_data(holdings)
 
         plan = []
@@ -441,8 +903,12 @@ class PortfolioProtector:
         total_protected_value = 0
         total_max_loss = 0
 
+        # Bound once; this loop is pure arithmetic per holding
+        get_data = market_data.get
+        tiered_stop_loss = self.calculate_tiered_stop_loss
+
         for holding in holdings:
-            data = market_data.get(holding.isin)
+            data = get_data(holding.isin)
             if not data:
                 # Use avg cost if no market data
                 current_price = holding.avg_cost_price
@@ -455,46 +921,47 @@ class PortfolioProtector:
             current_value = current_price * quantity
 
             # Calculate tiered stop loss
-            sl_price, tier = self.calculate_tiered_stop_loss(
-                cost_price, current_price)
+            sl_price, tier = tiered_stop_loss(cost_price, current_price)
             protected_value = sl_price * quantity
 
+            # Per-share percentages need one reciprocal each; quantity cancels
+            pct_of_current = 100 / current_price if current_value > 0 else 0
+            pct_of_cost = 100 / cost_price if cost_price > 0 else 0
+
             # Calculate potential loss if SL triggers
             loss_if_triggered = current_value - protected_value
-            loss_percent_from_current = (
-                loss_if_triggered / current_value * 100) if current_value > 0 else 0
+            loss_percent_from_current = (current_price - sl_price) * pct_of_current
             loss_from_cost = invested - protected_value
             loss_percent_from_cost = (
-                loss_from_cost / invested * 100) if invested > 0 else 0
+                (cost_price - sl_price) * pct_of_cost if quantity > 0 else 0)
 
             # P&L
             pnl = current_value - invested
-            pnl_percent = ((current_price - cost_price) /
-                           cost_price * 100) if cost_price > 0 else 0
-
-            holding_plan = {
-                "symbol": holding.trading_symbol,
-                "quantity": quantity,
-                "cost_price": cost_price,
-                "current_price": current_price,
-                "invested": invested,
-                "current_value": current_value,
-                "pnl": pnl,
-                "pnl_percent": pnl_percent,
-                "stop_loss": sl_price,
-                "tier": tier,
-                "protected_value": protected_value,
-                "loss_if_triggered": loss_if_triggered,
-                "loss_percent_from_current": loss_percent_from_current,
-                "loss_from_cost": loss_from_cost,
-                "loss_percent_from_cost": loss_percent_from_cost,
-            }
-            plan.append(holding_plan)
+            pnl_percent = (current_price - cost_price) * pct_of_cost
+
+            plan.append(HoldingPlan(
+                symbol=holding.trading_symbol,
+                quantity=quantity,
+                cost_price=cost_price,
+                current_price=current_price,
+                invested=invested,
+                current_value=current_value,
+                pnl=pnl,
+                pnl_percent=pnl_percent,
+                stop_loss=sl_price,
+                tier=tier,
+                protected_value=protected_value,
+                loss_if_triggered=loss_if_triggered,
+                loss_percent_from_current=loss_percent_from_current,
+                loss_from_cost=loss_from_cost,
+                loss_percent_from_cost=loss_percent_from_cost,
+            ))
 
             total_invested += invested
             total_current_value += current_value
             total_protected_value += protected_value
-            total_max_loss += max(0, invested - protected_value)
+            if loss_from_cost > 0:
+                total_max_loss += loss_from_cost
 
         # Add summary
         summary = {
@@ -524,72 +991,131 @@ class PortfolioProtector:
         plan = result["holdings"]
         summary = result["summary"]
 
-        print("\n" + "=" * 80)
-        print("PROTECTION PLAN (Progressive Profit Lock + 10% Max Loss)")
-        print("=" * 80)
-        print(
+        # Build the report in memory and write it once
+        out: list[str] = []
+        add = out.append
+
+        add("\n" + "=" * 80)
+        add("PROTECTION PLAN (Progressive Profit Lock + 10% Max Loss)")
+        add("=" * 80)
+        add(
             f"Max Loss: {self.config.max_loss_percent}% | Deep Loss SL: LTP -{self.config.deep_loss_sl_percent}%")
-        print("Profit Tiers:")
+        add("Profit Tiers:")
         for min_pnl, lock_pct in self.config.profit_tiers:
             if lock_pct > 0:
-                print(
+                add(
                     f"  P&L >= {min_pnl:>2.0f}% → Lock {lock_pct:.0f}% profit (SL at cost +{lock_pct}%)")
             else:
-                print(
+                add(
                     f"  P&L >= {min_pnl:>2.0f}% → Protect capital (SL at cost)")
-        print("-" * 80)
+        add("-" * 80)
 
         for h in plan:
-            print(f"\n{h['symbol']}")
-            print(
-                f"  Qty: {h['quantity']} | Cost: ₹{h['cost_price']:.2f} | Current: ₹{h['current_price']:.2f}")
-            print(
-                f"  Invested: ₹{h['invested']:.2f} | Value: ₹{h['current_value']:.2f} | P&L: ₹{h['pnl']:.2f} ({h['pnl_percent']:+.1f}%)")
-            print(f"  → Stop Loss: ₹{h['stop_loss']:.2f}")
-            print(f"  → Strategy: {h['tier']}")
-            if h['loss_from_cost'] > 0:
-                print(
-                    f"  → If SL triggers: Lose ₹{h['loss_from_cost']:.2f} ({h['loss_percent_from_cost']:.1f}% of invested)")
+            add(f"\n{h.symbol}")
+            add(
+                f"  Qty: {h.quantity} | Cost: ₹{h.cost_price:.2f} | Current: ₹{h.current_price:.2f}")
+            add(
+                f"  Invested: ₹{h.invested:.2f} | Value: ₹{h.current_value:.2f} | P&L: ₹{h.pnl:.2f} ({h.pnl_percent:+.1f}%)")
+            add(f"  → Stop Loss: ₹{h.stop_loss:.2f}")
+            add(f"  → Strategy: {h.tier}")
+            if h.loss_from_cost > 0:
+                add(
+                    f"  → If SL triggers: Lose ₹{h.loss_from_cost:.2f} ({h.loss_percent_from_cost:.1f}% of invested)")
             else:
-                print(
-                    f"  → If SL triggers: Gain ₹{-h['loss_from_cost']:.2f} ({-h['loss_percent_from_cost']:.1f}% profit locked)")
-
-        print("\n" + "-" * 80)
-        print("SUMMARY")
-        print("-" * 80)
-        print(f"Total Invested:    ₹{summary['total_invested']:.2f}")
-        print(f"Current Value:     ₹{summary['total_current_value']:.2f}")
-        print(
+                add(
+                    f"  → If SL triggers: Gain ₹{-h.loss_from_cost:.2f} ({-h.loss_percent_from_cost:.1f}% profit locked)")
+
+        add("\n" + "-" * 80)
+        add("SUMMARY")
+        add("-" * 80)
+        add(f"Total Invested:    ₹{summary['total_invested']:.2f}")
+        add(f"Current Value:     ₹{summary['total_current_value']:.2f}")
+        add(
             f"Total P&L:         ₹{summary['total_pnl']:.2f} ({summary['total_pnl_percent']:+.1f}%)")
-        print(f"Protected Value:   ₹{summary['total_protected_value']:.2f}")
-        print(
+        add(f"Protected Value:   ₹{summary['total_protected_value']:.2f}")
+        add(
             f"Max Possible Loss: ₹{summary['total_max_loss']:.2f} ({summary['max_loss_percent']:.1f}% of invested)")
-        print("=" * 80)
+        add("=" * 80)
+        sys.stdout.write("\n".join(out) + "\n")
 
-    def get_existing_protection(self, holdings: list[Holding]) -> dict[str, ForeverOrder]:
+    def get_existing_protection(
+        self,
+        holdings: list[Holding] | dict[str, Holding],
+        order_index: _OrderIndex | None = None,
+    ) -> dict[str, ForeverOrder]:
         """
         Get existing Forever Orders (GTT) for holdings.
 
         Args:
-            holdings: List of holdings to check
+            holdings: Holdings to check, as a list or a _index_holdings() dict
+            order_index: Pre-fetched orders to use instead of calling the API
 
         Returns:
             Dictionary mapping security_id to existing Forever Order
         """
-        security_ids = {h.security_id for h in holdings}
-        forever_orders = self.client.get_forever_orders()
+        holdings_by_id = _index_holdings(holdings)
+        if order_index is not None:
+            active = order_index.protection_by_secid
+        else:
+            active = self._get_active_protection_cached()
+
+        # Walk whichever side is smaller and probe the other
+        if len(holdings_by_id) < len(active):
+            return {
+                security_id: active[security_id]
+                for security_id in holdings_by_id
+                if security_id in active
+            }
+        return {
+            security_id: order
+            for security_id, order in active.items()
+            if security_id in holdings_by_id
+        }
 
-        existing = {}
-        for order_data in forever_orders:
-            order = ForeverOrder.from_api_response(order_data)
-            if (
-                order.security_id in security_ids
-                and order.transaction_type == "SELL"
-                and order.order_status in ["PENDING", "TRANSIT", "PART_TRADED"]
-            ):
-                existing[order.security_id] = order
+    def _get_forever_orders_cached(self) -> list[ForeverOrder]:
+        """All Forever Orders, fetched once per order_cache_ttl_seconds."""
+        now = time.monotonic()
+        cached = self._forever_cache
+        if cached and now - cached[0] < self.config.order_cache_ttl_seconds:
+            return cached[1]
+
+        orders = [
+            ForeverOrder.from_api_response(o)
+            for o in self.client.get_forever_orders()
+        ]
+        self._forever_cache = (now, orders)
+        return orders
+
+    def _get_active_protection_cached(self) -> dict[str, ForeverOrder]:
+        """Live SELL Forever Orders by security_id, reused for order_cache_ttl_seconds."""
+        now = time.monotonic()
+        cached = self._protection_cache
+        if cached and now - cached[0] < self.config.order_cache_ttl_seconds:
+            return cached[1]
+
+        active = _active_protection(self._get_forever_orders_cached())
+        self._protection_cache = (now, active)
+        return active
+
+    def _get_pending_sl_cached(self) -> dict[str, dict]:
+        """Pending SELL SL orders by security_id, reused for order_cache_ttl_seconds."""
+        now = time.monotonic()
+        cached = self._pending_sl_cache
+        if cached and now - cached[0] < self.config.order_cache_ttl_seconds:
+            return cached[1]
+
+        pending = {
+            o.get("securityId", ""): o for o in _get_pending_sl_orders(self.client)
+        }
+        self._pending_sl_cache = (now, pending)
+        return pending
 
-        return existing
+    def invalidate_order_cache(self) -> None:
+        """Forget cached orders; called after anything that changes the order book."""
+        self._forever_cache = None
+        self._protection_cache = None
+        self._pending_sl_cache = None
+        self._last_protect_sig = None
 
     def get_existing_super_orders(self, holdings: list[Holding]) -> dict[str, SuperOrder]:
         """
@@ -610,66 +1136,83 @@ class PortfolioProtector:
             if (
                 order.security_id in security_ids
                 and order.transaction_type == "SELL"
-                and order.order_status in ["PENDING", "TRANSIT", "PART_TRADED"]
+                and order.order_status in _ACTIVE_STATUSES
             ):
                 existing[order.security_id] = order
 
         return existing
 
-    def cancel_existing_orders(self, holdings: list[Holding]) -> int:
+    def cancel_existing_orders(
+        self,
+        holdings: list[Holding],
+        existing: dict[str, ForeverOrder] | None = None,
+        order_index: _OrderIndex | None = None,
+    ) -> int:
         """
         Cancel all existing protective Forever Orders for holdings.
 
         Args:
             holdings: List of holdings
+            existing: Result of get_existing_protection() to reuse instead of
+                fetching again; successfully cancelled orders are removed
+                from it, so it can be passed on to protect_portfolio()
+            order_index: Pre-fetched orders to use when existing is None
 
         Returns:
             Number of orders cancelled
         """
-        existing = self.get_existing_protection(holdings)
+        if existing is None:
+            existing = self.get_existing_protection(holdings, order_index)
         cancelled = 0
 
-        for security_id, order in existing.items():
+        cancel = self._bounded(self.client.cancel_forever_order,
+                               self.config.cancel_concurrency)
+        executor = self._pool()
+        futures = {
+            executor.submit(cancel, order.order_id): security_id
+            for security_id, order in existing.items()
+        }
+        for future in as_completed(futures):
+            security_id = futures[future]
+            order = existing[security_id]
             try:
-                self.client.cancel_forever_order(order.order_id)
-                logger.info(
-                    f"Cancelled Forever Order {order.order_id} for {order.trading_symbol}")
+                future.result()
+                logger.debug("Cancelled Forever Order %s for %s",
+                             order.order_id, order.trading_symbol)
+                del existing[security_id]
                 cancelled += 1
-            except Exception as e:
-                logger.warning(f"Failed to cancel order {order.order_id}: {e}")
+            except ORDER_ERRORS as e:
+                logger.warning("Failed to cancel order %s: %s", order.order_id, e)
 
+        self.invalidate_order_cache()
         return cancelled
 
-    def get_pending_amo_orders(self, holdings: list[Holding]) -> dict[str, dict]:
+    def get_pending_amo_orders(
+        self,
+        holdings: list[Holding] | dict[str, Holding],
+        order_index: _OrderIndex | None = None,
+    ) -> dict[str, dict]:
         """
         Get existing pending AMO SL orders for holdings.
 
         Args:
-            holdings: List of holdings to check
+            holdings: Holdings to check, as a list or a _index_holdings() dict
+            order_index: Pre-fetched orders to use instead of calling the API
 
         Returns:
             Dictionary of security_id -> order for pending AMO orders
         """
-        security_ids = {h.security_id for h in holdings}
-        orders = self.client.get_orders()
-
-        pending_amo = {}
-        for order in orders:
-            security_id = order.get("securityId", "")
-            order_status = order.get("orderStatus", "")
-            order_type = order.get("orderType", "")
-            transaction_type = order.get("transactionType", "")
-
-            # Check if it's a pending SL SELL order (our protection order)
-            if (
-                security_id in security_ids
-                and transaction_type == "SELL"
-                and order_type in ["STOP_LOSS", "STOP_LOSS_MARKET"]
-                and order_status in ["PENDING", "TRANSIT"]
-            ):
-                pending_amo[security_id] = order
+        holdings_by_id = _index_holdings(holdings)
+        if order_index is not None:
+            pending = order_index.pending_amo_by_secid
+        else:
+            pending = self._get_pending_sl_cached()
 
-        return pending_amo
+        return {
+            security_id: order
+            for security_id, order in pending.items()
+            if security_id in holdings_by_id
+        }
 
     def modify_amo_order(
         self,
@@ -697,6 +1240,37 @@ class PortfolioProtector:
             trigger_price=new_trigger_price,
         )
 
+    def modify_amo_orders_bulk(
+        self,
+        items: list[tuple[dict, float]],
+    ) -> list[dict | None]:
+        """
+        Modify several AMO SL orders' trigger prices concurrently.
+
+        Args:
+            items: (existing order dict, new trigger price) pairs
+
+        Returns:
+            Modify responses in the same order as items; None where the
+            modify failed (the error is logged)
+        """
+        def modify(item: tuple[dict, float]) -> dict | None:
+            order, new_trigger_price = item
+            try:
+                return self.modify_amo_order(order, new_trigger_price)
+            except ORDER_ERRORS as e:
+                logger.warning("Failed to modify AMO order %s: %s",
+                               order.get("orderId", ""), e)
+                return None
+
+        if not items:
+            return []
+
+        modify = self._bounded(modify, self.config.order_concurrency)
+        results = list(self._pool().map(modify, items))
+        self.invalidate_order_cache()
+        return results
+
     def cancel_pending_amo_orders(self, holdings: list[Holding]) -> int:
         """
         Cancel all pending AMO SL orders for holdings.
@@ -712,16 +1286,25 @@ class PortfolioProtector:
         pending = self.get_pending_amo_orders(holdings)
         cancelled = 0
 
-        for security_id, order in pending.items():
+        cancel = self._bounded(self.client.cancel_order, self.config.cancel_concurrency)
+        executor = self._pool()
+        futures = {
+            executor.submit(cancel, order.get("orderId", "")): security_id
+            for security_id, order in pending.items()
+        }
+        for future in as_completed(futures):
+            security_id = futures[future]
+            order = pending[security_id]
             try:
-                order_id = order.get("orderId", "")
-                symbol = order.get("tradingSymbol", security_id)
-                self.client.cancel_order(order_id)
-                logger.info(f"Cancelled AMO order {order_id} for {symbol}")
+                future.result()
+                logger.debug("Cancelled AMO order %s for %s",
+                             order.get("orderId", ""),
+                             order.get("tradingSymbol", security_id))
                 cancelled += 1
-            except Exception as e:
-                logger.warning(f"Failed to cancel AMO order: {e}")
+            except ORDER_ERRORS as e:
+                logger.warning("Failed to cancel AMO order: %s", e)
 
+        self.invalidate_order_cache()
         return cancelled
 
     def create_protective_order(
@@ -741,9 +1324,10 @@ class PortfolioProtector:
         Returns:
             ProtectiveOrder configuration
         """
+        config = self.config
         if stop_loss_price is None:
-            stop_loss_price = self.calculate_stop_loss_price(ltp)
-        target_price = self.calculate_target_price(ltp)
+            stop_loss_price = snap_to_tick(ltp * config._sl_mult)
+        target_price = snap_to_tick(ltp * config._tgt_mult)
 
         return ProtectiveOrder(
             security_id=holding.security_id,
@@ -752,11 +1336,18 @@ class PortfolioProtector:
             entry_price=ltp,  # Use current LTP as entry
             stop_loss_price=stop_loss_price,
             target_price=target_price,
-            trailing_jump=self.config.trailing_jump,
-            exchange_segment=self.config.exchange_segment,
-            product_type="CNC",
+            trailing_jump=config.trailing_jump,
+            exchange_segment=config.exchange_segment,
+            product_type=PRODUCT_TYPE,
         )
 
+    def _needs_modify(self, old_trigger: float, new_trigger: float) -> bool:
+        """Check whether a trigger change is large enough to send a modify."""
+        # Compare in whole paise so e.g. a 0.05 move isn't lost to float error
+        old_paise = round(old_trigger * 100)
+        delta = abs(old_paise - round(new_trigger * 100))
+        return delta > max(self.config._modify_epsilon_paise, old_paise / 1000)
+
     def protect_holding(
         self,
         holding: Holding,
@@ -784,6 +1375,25 @@ class PortfolioProtector:
         Returns:
             ProtectionResult with order details
         """
+        action = self._plan_holding(holding, ltp, existing_orders, force)
+        if isinstance(action, ProtectionResult):
+            return action
+        return self._execute_action(action)
+
+    def _plan_holding(
+        self,
+        holding: Holding,
+        ltp: float,
+        existing_orders: dict[str, ForeverOrder],
+        force: bool,
+    ) -> ProtectionResult | _OrderAction:
+        """
+        Decide what protect_holding() should do, without calling the API.
+
+        Returns:
+            The final ProtectionResult when no order call is needed,
+            otherwise the _OrderAction to execute
+        """
         # Check if holding meets minimum criteria
         if holding.available_qty < self.config.min_quantity:
             return ProtectionResult(
@@ -811,22 +1421,11 @@ class PortfolioProtector:
                 message="Could not fetch LTP for this security"
             )
 
-        cost_price = holding.avg_cost_price
-
-        # Calculate tiered stop loss based on cost and current price
-        new_stop_loss, tier_description = self.calculate_tiered_stop_loss(
-            cost_price, ltp)
-
-        # Don't place SL if it's above current price (would trigger immediately)
-        if new_stop_loss >= ltp:
-            new_stop_loss = round(ltp * 0.95, 2)  # Fallback to 5% below LTP
-            tier_description = f"SAFETY FALLBACK: SL at LTP -5% (original SL >= LTP)"
+        # Tiered stop loss (with safety fallback) and P&L for logging
+        new_stop_loss, tier_description, pnl_percent = self._order_stop_loss(
+            holding.avg_cost_price, ltp)
 
-        new_target = self.calculate_target_price(ltp)
-
-        # Calculate P&L for logging
-        pnl_percent = ((ltp - cost_price) / cost_price *
-                       100) if cost_price > 0 else 0
+        new_target = snap_to_tick(ltp * self.config._tgt_mult)
 
         # Check for existing protection (Forever Order)
         existing_order = existing_orders.get(holding.security_id)
@@ -843,8 +1442,44 @@ class PortfolioProtector:
                 stop_loss_price=sl_price,
             )
 
-        # If existing order and force=True, MODIFY the Forever Order
-        if existing_order and force:
+        # Skip the API call if the trigger would barely move
+        if existing_order and force and not self._needs_modify(existing_order.trigger_price, new_stop_loss):
+            return ProtectionResult(
+                holding=holding,
+                success=True,
+                ltp=ltp,
+                order_id=existing_order.order_id,
+                message=f"Already protected at SL ₹{existing_order.trigger_price:.2f} (no change needed)",
+                stop_loss_price=existing_order.trigger_price,
+            )
+
+        return _OrderAction(
+            holding=holding,
+            ltp=ltp,
+            stop_loss=new_stop_loss,
+            tier=tier_description,
+            pnl_percent=pnl_percent,
+            existing=existing_order,
+            target=new_target,
+        )
+
+    def _execute_action(self, action: _OrderAction) -> ProtectionResult:
+        """
+        Modify (or cancel and replace) or place the Forever Order for one holding.
+
+        Args:
+            action: Decision from _plan_holding()
+
+        Returns:
+            ProtectionResult for the holding
+        """
+        holding = action.holding
+        ltp = action.ltp
+        new_stop_loss = action.stop_loss
+        existing_order = action.existing
+
+        # Existing order (only planned when force=True): MODIFY the Forever Order
+        if existing_order:
             try:
                 # Modify the Forever Order with new trigger price
                 response = self.client.modify_forever_order(
@@ -857,29 +1492,32 @@ class PortfolioProtector:
                 )
                 order_status = response.get("orderStatus", "")
 
-                logger.info(
-                    f"Modified Forever Order {existing_order.order_id} for {holding.trading_symbol}: "
-                    f"SL ₹{existing_order.trigger_price:.2f} → ₹{new_stop_loss:.2f}"
+                logger.debug(
+                    "Modified Forever Order %s for %s: SL ₹%.2f → ₹%.2f",
+                    existing_order.order_id, holding.trading_symbol,
+                    existing_order.trigger_price, new_stop_loss,
                 )
 
                 return ProtectionResult(
                     holding=holding,
-                    success=order_status in ["PENDING", "TRANSIT"],
+                    success=order_status in _PENDING_STATUSES,
                     ltp=ltp,
                     order_id=existing_order.order_id,
                     message=f"Order modified: SL updated to ₹{new_stop_loss:.2f}",
                     stop_loss_price=new_stop_loss,
-                    target_price=new_target,
+                    target_price=action.target,
                 )
 
-            except Exception as e:
+            except ORDER_ERRORS as e:
                 logger.warning(
-                    f"Failed to modify order, will cancel and place new: {e}")
+                    "Failed to modify order, will cancel and place new: %s", e)
+                logger.debug("Modify failure for %s", existing_order.order_id,
+                             exc_info=True)
                 # Cancel and fall through to place new order
                 try:
                     self.client.cancel_forever_order(existing_order.order_id)
-                except Exception as cancel_err:
-                    logger.warning(f"Failed to cancel order: {cancel_err}")
+                except ORDER_ERRORS as cancel_err:
+                    logger.warning("Failed to cancel order: %s", cancel_err)
 
         # Create and place protective order (only if no existing order or modify failed)
         protective_order = self.create_protective_order(
@@ -891,25 +1529,27 @@ class PortfolioProtector:
             order_id = response.get("orderId", "")
             order_status = response.get("orderStatus", "")
 
-            logger.info(
-                f"✓ Protected {holding.trading_symbol}: "
-                f"LTP=₹{ltp:.2f}, Cost=₹{cost_price:.2f}, SL=₹{new_stop_loss:.2f}, P&L={pnl_percent:+.1f}%"
+            logger.debug(
+                "✓ Protected %s: LTP=₹%.2f, Cost=₹%.2f, SL=₹%.2f, P&L=%+.1f%% → %s",
+                holding.trading_symbol, ltp, holding.avg_cost_price, new_stop_loss,
+                action.pnl_percent, action.tier,
             )
-            logger.info(f"  → {tier_description}")
 
             return ProtectionResult(
                 holding=holding,
-                success=order_status in ["PENDING", "TRANSIT"],
+                success=order_status in _PENDING_STATUSES,
                 ltp=ltp,
                 order_id=order_id,
-                message=f"Protected: {tier_description}",
+                message=f"Protected: {action.tier}",
                 stop_loss_price=protective_order.stop_loss_price,
                 target_price=protective_order.target_price,
             )
 
-        except Exception as e:
+        except ORDER_ERRORS as e:
             logger.error(
-                f"Failed to place protective order for {holding.trading_symbol}: {e}")
+                "Failed to place protective order for %s: %s",
+                holding.trading_symbol, e,
+            )
             return ProtectionResult(
                 holding=holding,
                 success=False,
@@ -921,6 +1561,8 @@ class PortfolioProtector:
         self,
         holdings: list[Holding] | None = None,
         force: bool = False,
+        existing_orders: dict[str, ForeverOrder] | None = None,
+        order_index: _OrderIndex | None = None,
     ) -> list[ProtectionResult]:
         """
         Place protective orders for all eligible holdings.
@@ -933,6 +1575,9 @@ class PortfolioProtector:
         Args:
             holdings: Holdings to protect (fetches if None)
             force: If True, update existing orders with new prices
+            existing_orders: Result of get_existing_protection() to reuse
+                instead of fetching Forever Orders again
+            order_index: Pre-fetched orders to use when existing_orders is None
 
         Returns:
             List of ProtectionResult for each holding
@@ -940,56 +1585,229 @@ class PortfolioProtector:
         if holdings is None:
             holdings = self.client.get_holdings()
 
-        # Filter to holdings with available quantity
-        holdings = [h for h in holdings if h.available_qty > 0]
+        # Set aside holdings that can't meet the minimums before fetching prices
+        holdings, skipped = self._filter_protectable(holdings)
 
         if not holdings:
             logger.info("No holdings with available quantity to protect")
-            return []
+            return skipped
 
         # Fetch all market data
-        logger.info(f"Fetching market data for {len(holdings)} holdings...")
+        logger.info("Fetching market data for %d holdings...", len(holdings))
         self.fetch_all_market_data(holdings)
 
         # Get existing orders
-        existing_orders = self.get_existing_protection(holdings)
-
-        results = []
-
-        for holding in holdings:
-            ltp = self._ltp_cache.get(holding.security_id, 0.0)
-
-            result = self.protect_holding(
-                holding, ltp, existing_orders, force=force
+        if existing_orders is None:
+            existing_orders = self.get_existing_protection(
+                _index_holdings(holdings), order_index)
+
+        ltp_cache = self._ltp_cache
+
+        # Nothing moved since the last clean run: same holdings, prices and
+        # orders give the same results, so skip planning entirely
+        sig = None
+        if not force:
+            sig = self._protect_signature(holdings, existing_orders)
+            if sig == self._last_protect_sig:
+                logger.info("Portfolio unchanged since last run, reusing results")
+                return self._last_protect_results + skipped
+
+        # Decide every holding locally first; only order calls hit the pool
+        planned = [
+            self._plan_holding(
+                holding, ltp_cache.get(holding.security_id, 0.0),
+                existing_orders, force,
             )
-            results.append(result)
+            for holding in holdings
+        ]
+        results = self._map_orders(self._execute_action, planned)
 
+        failed = False
+        for result in results:
             if not result.success:
+                failed = True
                 logger.warning(
-                    f"✗ Failed to protect {holding.trading_symbol}: {result.message}")
+                    "✗ Failed to protect %s: %s",
+                    result.holding.trading_symbol, result.message,
+                )
+
+        # Only reuse runs that made no changes and had nothing to retry
+        if sig is not None and not failed and not any(
+            isinstance(p, _OrderAction) for p in planned
+        ):
+            self._last_protect_sig = sig
+            self._last_protect_results = results
+
+        return results + skipped
+
+    def _protect_signature(
+        self,
+        holdings: list[Holding],
+        existing_orders: dict[str, ForeverOrder],
+    ) -> tuple:
+        """Everything protect_portfolio() decides on, as a comparable tuple."""
+        ltp_cache = self._ltp_cache
+        sig = []
+        for h in sorted(holdings, key=lambda x: x.security_id):
+            order = existing_orders.get(h.security_id)
+            sig.append((
+                h.security_id,
+                h.available_qty,
+                round(h.avg_cost_price * 100),
+                round(ltp_cache.get(h.security_id, 0.0) * 100),
+                order.order_id if order else None,
+                round(order.trigger_price * 100) if order else None,
+            ))
+        return tuple(sig)
+
+    def _filter_protectable(
+        self, holdings: list[Holding]
+    ) -> tuple[list[Holding], list[ProtectionResult]]:
+        """
+        Split off holdings that protect_holding() would reject, without market data.
+
+        Only min_quantity is checked here. min_value depends on the LTP, so
+        it is left to _plan_holding() once prices are known. Holdings with
+        nothing available are dropped silently.
+
+        Args:
+            holdings: Holdings to filter
+
+        Returns:
+            (holdings worth fetching market data for, skip results for
+            holdings below min_quantity)
+        """
+        min_qty = self.config.min_quantity
+        kept = []
+        skipped = []
+        for h in holdings:
+            if h.available_qty >= max(1, min_qty):
+                kept.append(h)
+            elif h.available_qty > 0:
+                skipped.append(ProtectionResult(
+                    holding=h,
+                    success=False,
+                    ltp=0.0,
+                    message=f"Available quantity ({h.available_qty}) below minimum ({min_qty})"
+                ))
+        if skipped:
+            logger.debug("Skipping %d holdings below min_quantity", len(skipped))
+        return kept, skipped
+
+    async def protect_portfolio_async(
+        self,
+        holdings: list[Holding] | None = None,
+        force: bool = False,
+        existing_orders: dict[str, ForeverOrder] | None = None,
+    ) -> list[ProtectionResult]:
+        """
+        Awaitable protect_portfolio() for use inside an event loop.
 
+        Args:
+            holdings: Holdings to protect (fetches if None)
+            force: If True, update existing orders with new prices
+            existing_orders: Result of get_existing_protection() to reuse
+
+        Returns:
+            List of ProtectionResult for each holding
+        """
+        return await asyncio.to_thread(
+            self.protect_portfolio, holdings, force, existing_orders)
+
+    def _map_orders(
+        self,
+        func: Callable[[_OrderAction], ProtectionResult],
+        planned: list[ProtectionResult | _OrderAction],
+        label: str = "Protection",
+    ) -> list[ProtectionResult]:
+        """
+        Run the order calls for planned holdings concurrently.
+
+        Logs one summary line for the whole run instead of one per holding.
+
+        Args:
+            func: Places/modifies the order for one _OrderAction
+            planned: Per-holding plan; ProtectionResults are passed through
+            label: Prefix for the summary log line
+
+        Returns:
+            Results in the same order as planned
+        """
+        started = time.monotonic()
+        actions = [p for p in planned if isinstance(p, _OrderAction)]
+        if actions:
+            def run(action: _OrderAction) -> ProtectionResult:
+                # Orders for other holdings may already be placed, so one
+                # unexpected failure must not discard the whole batch
+                try:
+                    return func(action)
+                except Exception as e:
+                    logger.exception("Unexpected error protecting %s",
+                                     action.holding.trading_symbol)
+                    return ProtectionResult(
+                        holding=action.holding,
+                        success=False,
+                        ltp=action.ltp,
+                        message=f"Error: {e}",
+                        stop_loss_price=action.stop_loss,
+                    )
+
+            run = self._bounded(run, self.config.order_concurrency)
+            done = iter(list(self._pool().map(run, actions)))
+            results = [
+                next(done) if isinstance(p, _OrderAction) else p for p in planned]
+            self.invalidate_order_cache()
+        else:
+            results = list(planned)
+
+        ok = sum(1 for r in results if r.success)
+        logger.info("%s: %d ok, %d failed in %.1fs", label, ok,
+                    len(results) - ok, time.monotonic() - started)
         return results
 
-    def get_protection_summary(self) -> dict:
+    def get_protection_summary(
+        self,
+        order_index: _OrderIndex | None = None,
+        ltp_map: dict[str, float] | None = None,
+        holdings: list[Holding] | None = None,
+    ) -> dict:
         """
         Get summary of current portfolio protection status.
 
+        LTPs already fetched by this protector (e.g. by a preceding
+        protect_portfolio() call) are reused when they cover every holding.
+
+        Args:
+            order_index: Pre-fetched orders to use instead of calling the API
+            ltp_map: security_id -> LTP to use instead of fetching prices
+            holdings: Holdings to summarize (fetches if None)
+
         Returns:
             Dictionary with protection statistics
         """
-        holdings = self.client.get_holdings()
-        holdings = [h for h in holdings if h.available_qty > 0]
+        if holdings is None:
+            holdings = self._get_active_holdings()
+        else:
+            holdings = [h for h in holdings if h.available_qty > 0]
 
-        # Fetch LTP for current values
-        ltp_map = self.fetch_ltp_for_holdings(holdings)
+        # Fetch LTP for current values unless we already have them
+        if ltp_map is None:
+            if self._ltp_cache and all(
+                h.security_id in self._ltp_cache for h in holdings
+            ):
+                ltp_map = self._ltp_cache
+            else:
+                ltp_map = self.fetch_ltp_for_holdings(holdings)
 
         # Get Forever Orders for protection status
         try:
-            forever_orders = self.client.get_forever_orders()
-            forever_order_list = [
-                ForeverOrder.from_api_response(o) for o in forever_orders]
+            if order_index is not None:
+                forever_order_list = order_index.forever_orders
+            else:
+                # Shared with get_existing_protection() within the cache TTL
+                forever_order_list = self._get_forever_orders_cached()
         except Exception as e:
-            logger.warning(f"Failed to fetch Forever Orders: {e}")
+            logger.warning("Failed to fetch Forever Orders: %s", e)
             forever_order_list = []
 
         # Find holdings with protection (Forever Orders)
@@ -997,26 +1815,30 @@ class PortfolioProtector:
             o.security_id: o
             for o in forever_order_list
             if o.transaction_type == "SELL"
-            and o.order_status in ["PENDING", "TRANSIT", "PART_TRADED", "CONFIRM"]
+            and o.order_status in _SUMMARY_STATUSES
         }
 
+        # Split holdings and their current market values (LTP, falling back
+        # to cost) in a single pass; totals use fsum so large portfolios
+        # don't accumulate rounding error
         protected_holdings = []
         unprotected_holdings = []
+        protected_values = []
+        unprotected_values = []
+        get_ltp = ltp_map.get
 
         for h in holdings:
+            value = h.available_qty * get_ltp(h.security_id, h.avg_cost_price)
             if h.security_id in protected_securities:
                 protected_holdings.append(h)
+                protected_values.append(value)
             else:
                 unprotected_holdings.append(h)
+                unprotected_values.append(value)
 
-        # Calculate values using LTP (current market value)
-        def get_value(h: Holding) -> float:
-            ltp = ltp_map.get(h.security_id, h.avg_cost_price)
-            return h.available_qty * ltp
-
-        total_value = sum(get_value(h) for h in holdings)
-        protected_value = sum(get_value(h) for h in protected_holdings)
-        unprotected_value = sum(get_value(h) for h in unprotected_holdings)
+        protected_value = math.fsum(protected_values)
+        unprotected_value = math.fsum(unprotected_values)
+        total_value = math.fsum(protected_values + unprotected_values)
 
         return {
             "total_holdings": len(holdings),
@@ -1039,6 +1861,7 @@ class PortfolioProtector:
         ltp: float,
         amo_time: str = "OPEN",
         stop_loss_price: float | None = None,
+        order_date: str | None = None,
     ) -> ProtectionResult:
         """
         Place an AMO (After Market Order) Stop Loss order for a holding.
@@ -1051,6 +1874,8 @@ class PortfolioProtector:
             ltp: Current/last known LTP for stop loss calculation
             amo_time: When to inject the order: PRE_OPEN, OPEN, OPEN_30, OPEN_60
             stop_loss_price: Pre-calculated stop loss price (uses LTP-based if None)
+            order_date: YYYYMMDD for the correlation id (today if None); batch
+                callers compute it once per run
 
         Returns:
             ProtectionResult with order details
@@ -1065,8 +1890,10 @@ class PortfolioProtector:
 
         # Use provided stop loss or calculate from LTP
         if stop_loss_price is None:
-            stop_loss_price = self.calculate_stop_loss_price(ltp)
-        correlation_id = f"amo_protect_{holding.security_id}_{datetime.now().strftime('%Y%m%d')}"
+            stop_loss_price = snap_to_tick(ltp * self.config._sl_mult)
+        if order_date is None:
+            order_date = datetime.now().strftime("%Y%m%d")
+        correlation_id = f"amo_protect_{holding.security_id}_{order_date}"
 
         try:
             response = self.client.place_sl_order(
@@ -1076,7 +1903,7 @@ class PortfolioProtector:
                 price=0.0,  # Market order
                 transaction_type="SELL",
                 exchange_segment=self.config.exchange_segment,
-                product_type="CNC",
+                product_type=PRODUCT_TYPE,
                 order_type="STOP_LOSS_MARKET",
                 after_market_order=True,
                 amo_time=amo_time,
@@ -1088,7 +1915,7 @@ class PortfolioProtector:
 
             return ProtectionResult(
                 holding=holding,
-                success=order_status in ["PENDING", "TRANSIT"],
+                success=order_status in _PENDING_STATUSES,
                 ltp=ltp,
                 order_id=order_id,
                 message=f"AMO order placed ({amo_time}): {order_status}",
@@ -1096,9 +1923,9 @@ class PortfolioProtector:
                 target_price=0.0,  # No target for SL order
             )
 
-        except Exception as e:
+        except ORDER_ERRORS as e:
             logger.error(
-                f"Failed to place AMO SL order for {holding.trading_symbol}: {e}")
+                "Failed to place AMO SL order for %s: %s", holding.trading_symbol, e)
             return ProtectionResult(
                 holding=holding,
                 success=False,
@@ -1111,6 +1938,7 @@ class PortfolioProtector:
         holdings: list[Holding] | None = None,
         amo_time: str = "OPEN",
         force: bool = True,
+        order_index: _OrderIndex | None = None,
     ) -> list[ProtectionResult]:
         """
         Place or update AMO Stop Loss orders for all eligible holdings.
@@ -1131,6 +1959,7 @@ class PortfolioProtector:
             holdings: Holdings to protect (fetches if None)
             amo_time: When to inject: PRE_OPEN, OPEN, OPEN_30, OPEN_60
             force: If True (default), update existing orders with new trigger prices
+            order_index: Pre-fetched orders to use instead of calling the API
 
         Returns:
             List of ProtectionResult for each holding
@@ -1138,132 +1967,215 @@ class PortfolioProtector:
         if holdings is None:
             holdings = self.client.get_holdings()
 
-        # Filter to holdings with available quantity
-        holdings = [h for h in holdings if h.available_qty > 0]
+        # Set aside holdings that can't meet the minimums before fetching prices
+        holdings, skipped = self._filter_protectable(holdings)
 
         if not holdings:
             logger.info("No holdings with available quantity to protect")
-            return []
+            return skipped
 
         # Fetch all market data (LTP, 52W high, 200-DMA)
-        logger.info(f"Fetching market data for {len(holdings)} holdings...")
+        logger.info("Fetching market data for %d holdings...", len(holdings))
         self.fetch_all_market_data(holdings)
 
         # Get existing pending AMO orders
-        existing_orders = self.get_pending_amo_orders(holdings)
-        logger.info(
-            f"Found {len(existing_orders)} existing pending AMO orders")
+        existing_orders = self.get_pending_amo_orders(
+            _index_holdings(holdings), order_index)
+        logger.info("Found %d existing pending AMO orders", len(existing_orders))
+
+        planned = [
+            self._plan_holding_amo(holding, existing_orders, force)
+            for holding in holdings
+        ]
+
+        # Send every trigger update as one concurrent batch; holdings whose
+        # modify failed are cancelled and replaced in _execute_amo_action()
+        updates = [
+            action for action in planned
+            if isinstance(action, _OrderAction) and action.existing
+        ]
+        responses = self.modify_amo_orders_bulk(
+            [(action.existing, action.stop_loss) for action in updates])
+        for action, response in zip(updates, responses):
+            action.modify_response = response
+
+        # One date for every order in this run
+        order_date = datetime.now().strftime("%Y%m%d")
+        return self._map_orders(
+            lambda action: self._execute_amo_action(action, amo_time, order_date),
+            planned,
+            label="AMO protection",
+        ) + skipped
+
+    async def protect_portfolio_amo_async(
+        self,
+        holdings: list[Holding] | None = None,
+        amo_time: str = "OPEN",
+        force: bool = True,
+    ) -> list[ProtectionResult]:
+        """
+        Awaitable protect_portfolio_amo() for use inside an event loop.
 
-        results = []
+        Args:
+            holdings: Holdings to protect (fetches if None)
+            amo_time: When to execute the AMO
+            force: If True (default), update existing orders with new trigger prices
 
-        for holding in holdings:
-            ltp = self._ltp_cache.get(holding.security_id, 0.0)
-            cost_price = holding.avg_cost_price
+        Returns:
+            List of ProtectionResult for each holding
+        """
+        return await asyncio.to_thread(
+            self.protect_portfolio_amo, holdings, amo_time, force)
 
-            if ltp <= 0:
-                results.append(ProtectionResult(
-                    holding=holding,
-                    success=False,
-                    ltp=ltp,
-                    message="Invalid LTP"
-                ))
-                continue
+    def _plan_holding_amo(
+        self,
+        holding: Holding,
+        existing_orders: dict[str, dict],
+        force: bool,
+    ) -> ProtectionResult | _OrderAction:
+        """
+        Decide how to place or update the AMO Stop Loss order for a holding.
+
+        No API calls are made here; see _execute_amo_action().
 
-            # Calculate tiered stop loss based on cost and current price
-            new_stop_loss, tier_description = self.calculate_tiered_stop_loss(
-                cost_price, ltp)
-
-            # Don't place SL if it's above current price (would trigger immediately)
-            if new_stop_loss >= ltp:
-                # Fallback to 5% below LTP
-                new_stop_loss = round(ltp * 0.95, 2)
-                tier_description = f"SAFETY FALLBACK: SL at LTP -5% (original SL >= LTP)"
-
-            # Calculate P&L for logging
-            pnl_percent = ((ltp - cost_price) / cost_price *
-                           100) if cost_price > 0 else 0
-
-            # Check if there's an existing order for this holding
-            existing_order = existing_orders.get(holding.security_id)
-
-            if existing_order and force:
-                # MODIFY existing order instead of cancel+replace
-                old_trigger = existing_order.get("triggerPrice", 0)
-                order_id = existing_order.get("orderId", "")
-
-                # Only modify if trigger price needs to change significantly
-                if abs(old_trigger - new_stop_loss) > 0.05:
-                    try:
-                        response = self.modify_amo_order(
-                            existing_order, new_stop_loss)
-                        order_status = response.get("orderStatus", "")
-
-                        logger.info(
-                            f"✓ Modified {holding.trading_symbol}: "
-                            f"SL ₹{old_trigger:.2f} → ₹{new_stop_loss:.2f} | {tier_description}"
-                        )
-
-                        results.append(ProtectionResult(
-                            holding=holding,
-                            success=order_status in ["PENDING", "TRANSIT"],
-                            ltp=ltp,
-                            order_id=order_id,
-                            message=f"Order modified: SL ₹{old_trigger:.2f} → ₹{new_stop_loss:.2f}",
-                            stop_loss_price=new_stop_loss,
-                        ))
-                        continue
-
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to modify order, will place new: {e}")
-                        # Cancel the old order and place new
-                        try:
-                            self.client.cancel_order(order_id)
-                        except Exception:
-                            pass
-                else:
-                    # No change needed
-                    results.append(ProtectionResult(
-                        holding=holding,
-                        success=True,
-                        ltp=ltp,
-                        order_id=order_id,
-                        message=f"Already protected at SL ₹{old_trigger:.2f} (no change needed)",
-                        stop_loss_price=old_trigger,
-                    ))
-                    continue
-
-            elif existing_order and not force:
+        Args:
+            holding: Holding to protect
+            existing_orders: Pending AMO orders by security_id
+            force: If True, update existing orders with new trigger prices
+
+        Returns:
+            The final ProtectionResult when no order call is needed,
+            otherwise the _OrderAction to execute
+        """
+        ltp = self._ltp_cache.get(holding.security_id, 0.0)
+        cost_price = holding.avg_cost_price
+
+        if ltp <= 0:
+            return ProtectionResult(
+                holding=holding,
+                success=False,
+                ltp=ltp,
+                message="Invalid LTP"
+            )
+
+        # Tiered stop loss (with safety fallback) and P&L for logging
+        new_stop_loss, tier_description, pnl_percent = self._order_stop_loss(
+            cost_price, ltp)
+
+        # Check if there's an existing order for this holding
+        existing_order = existing_orders.get(holding.security_id)
+
+        if existing_order:
+            old_trigger = existing_order.get("triggerPrice", 0)
+            order_id = existing_order.get("orderId", "")
+
+            if not force:
                 # Keep existing order as-is
-                old_trigger = existing_order.get("triggerPrice", 0)
-                order_id = existing_order.get("orderId", "")
-                results.append(ProtectionResult(
+                return ProtectionResult(
                     holding=holding,
                     success=True,
                     ltp=ltp,
                     order_id=order_id,
                     message=f"Already protected (order {order_id})",
                     stop_loss_price=old_trigger,
-                ))
-                continue
+                )
 
-            # Place new AMO order (no existing order)
-            result = self.place_amo_sl_order(
-                holding, ltp, amo_time, stop_loss_price=new_stop_loss
-            )
-            results.append(result)
+            # Only modify if trigger price needs to change significantly
+            if not self._needs_modify(old_trigger, new_stop_loss):
+                return ProtectionResult(
+                    holding=holding,
+                    success=True,
+                    ltp=ltp,
+                    order_id=order_id,
+                    message=f"Already protected at SL ₹{old_trigger:.2f} (no change needed)",
+                    stop_loss_price=old_trigger,
+                )
+
+        return _OrderAction(
+            holding=holding,
+            ltp=ltp,
+            stop_loss=new_stop_loss,
+            tier=tier_description,
+            pnl_percent=pnl_percent,
+            existing=existing_order,
+        )
+
+    def _execute_amo_action(
+        self,
+        action: _OrderAction,
+        amo_time: str,
+        order_date: str | None = None,
+    ) -> ProtectionResult:
+        """
+        Finish the AMO SL order for one holding after the batched modify.
+
+        Reports a successful modify, cancels and replaces an order whose
+        modify failed, or places a new order.
+
+        Args:
+            action: Decision from _plan_holding_amo(), with modify_response
+                set for existing orders
+            amo_time: When to inject: PRE_OPEN, OPEN, OPEN_30, OPEN_60
+            order_date: YYYYMMDD for new orders' correlation ids
+
+        Returns:
+            ProtectionResult for the holding
+        """
+        holding = action.holding
+        ltp = action.ltp
+        new_stop_loss = action.stop_loss
+        existing_order = action.existing
+
+        if existing_order:
+            # The existing order was already modified by modify_amo_orders_bulk()
+            old_trigger = existing_order.get("triggerPrice", 0)
+            order_id = existing_order.get("orderId", "")
+            response = action.modify_response
+
+            if response is not None:
+                order_status = response.get("orderStatus", "")
 
-            if result.success:
-                logger.info(
-                    f"✓ AMO Protected {holding.trading_symbol}: "
-                    f"LTP=₹{ltp:.2f}, Cost=₹{cost_price:.2f}, SL=₹{result.stop_loss_price:.2f}, P&L={pnl_percent:+.1f}%"
+                logger.debug(
+                    "✓ Modified %s: SL ₹%.2f → ₹%.2f | %s",
+                    holding.trading_symbol, old_trigger, new_stop_loss,
+                    action.tier,
                 )
-                logger.info(f"  → {tier_description}")
-            else:
-                logger.warning(
-                    f"✗ Failed to AMO protect {holding.trading_symbol}: {result.message}")
 
-        return results
+                return ProtectionResult(
+                    holding=holding,
+                    success=order_status in _PENDING_STATUSES,
+                    ltp=ltp,
+                    order_id=order_id,
+                    message=f"Order modified: SL ₹{old_trigger:.2f} → ₹{new_stop_loss:.2f}",
+                    stop_loss_price=new_stop_loss,
+                )
+
+            logger.warning("Failed to modify order %s, will place new", order_id)
+            # Cancel the old order and place new
+            try:
+                self.client.cancel_order(order_id)
+            except ORDER_ERRORS:
+                pass
+
+        # Place new AMO order (no existing order, or modify failed)
+        result = self.place_amo_sl_order(
+            holding, ltp, amo_time, stop_loss_price=new_stop_loss,
+            order_date=order_date,
+        )
+
+        if result.success:
+            logger.debug(
+                "✓ AMO Protected %s: LTP=₹%.2f, Cost=₹%.2f, SL=₹%.2f, P&L=%+.1f%% → %s",
+                holding.trading_symbol, ltp, holding.avg_cost_price,
+                result.stop_loss_price, action.pnl_percent, action.tier,
+            )
+        else:
+            logger.warning(
+                "✗ Failed to AMO protect %s: %s",
+                holding.trading_symbol, result.message,
+            )
+
+        return result
 
 
 def run_daily_protection(
@@ -1275,37 +2187,34 @@ def run_daily_protection(
     Run daily portfolio protection routine.
 
     This should be scheduled to run at market open each day.
-    It cancels existing orders and places new ones with updated LTP-based triggers.
+    It updates existing orders to the latest LTP-based triggers and places
+    new ones for unprotected holdings.
 
     Args:
         client: Dhan API client
         config: Protection configuration
-        force: If True (default), replace existing orders with new ones
+        force: If True (default), update existing orders with new prices
 
     Returns:
         List of protection results
     """
-    logger.info(f"Starting daily protection run at {datetime.now()}")
+    logger.info("Starting daily protection run at %s", datetime.now())
 
-    protector = PortfolioProtector(client, config)
-
-    # Cancel all existing protection orders first
     holdings = client.get_holdings()
     holdings = [h for h in holdings if h.available_qty > 0]
 
-    if force:
-        cancelled = protector.cancel_existing_orders(holdings)
-        logger.info(f"Cancelled {cancelled} existing protection orders")
-
-    # Place new orders with current LTP
-    results = protector.protect_portfolio(
-        holdings, force=False)  # Already cancelled
+    # Fetch the order book once; existing orders are modified in place
+    # (cancel + place only if modify fails)
+    order_index = _OrderIndex(client)
+    with PortfolioProtector(client, config) as protector:
+        results = protector.protect_portfolio(
+            holdings, force=force, order_index=order_index)
 
     # Log summary
     success_count = sum(1 for r in results if r.success)
     fail_count = sum(1 for r in results if not r.success)
 
     logger.info(
-        f"Daily protection complete: {success_count} protected, {fail_count} failed")
+        "Daily protection complete: %d protected, %d failed", success_count, fail_count)
 
     return results
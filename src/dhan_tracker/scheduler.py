@@ -1,11 +1,15 @@
 """Scheduler for daily portfolio protection."""
 
 import logging
-import sched
+import multiprocessing
 import time
 from datetime import datetime, timedelta
 from typing import Callable
 
+import pytz
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+
 from .client import DhanClient
 from .config import DhanConfig
 from .protection import PortfolioProtector, ProtectionConfig, run_daily_protection
@@ -19,6 +23,12 @@ MARKET_OPEN_MINUTE = 15
 MARKET_CLOSE_HOUR = 15
 MARKET_CLOSE_MINUTE = 30
 
+IST = pytz.timezone("Asia/Kolkata")
+
+# Longest single sleep while waiting for market open, so Ctrl+C and clock
+# jumps (suspend/resume) are noticed promptly
+MAX_SLEEP_SECONDS = 60
+
 
 def is_market_day() -> bool:
     """Check if today is a market trading day (Mon-Fri)."""
@@ -50,6 +60,40 @@ def get_next_market_open() -> datetime:
     return market_open
 
 
+def _protection_entrypoint(
+    config: DhanConfig,
+    protection_config: ProtectionConfig,
+) -> None:
+    """
+    Run one protection pass; body of the scheduler's child process.
+
+    Args:
+        config: Dhan API configuration
+        protection_config: Protection settings
+    """
+    # Spawned children don't inherit the parent's logging setup
+    if not logging.getLogger().handlers:
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+
+    try:
+        with DhanClient(config) as client:
+            results = run_daily_protection(client, protection_config)
+
+            success = sum(1 for r in results if r.success)
+            failed = sum(1 for r in results if not r.success)
+
+            logger.info(
+                f"Protection complete: {success} protected, {failed} failed")
+
+    except Exception as e:
+        logger.error(f"Protection run failed: {e}")
+        raise SystemExit(1)
+
+
 def schedule_daily_protection(
     config: DhanConfig,
     protection_config: ProtectionConfig | None = None,
@@ -71,56 +115,52 @@ def schedule_daily_protection(
     )
 
     def run_protection_job():
-        """Execute the protection job."""
-        try:
-            logger.info("Starting scheduled protection run...")
-
-            with DhanClient(config) as client:
-                results = run_daily_protection(client, protection_config)
-
-                success = sum(1 for r in results if r.success)
-                failed = sum(1 for r in results if not r.success)
-
-                logger.info(
-                    f"Protection complete: {success} protected, {failed} failed")
-
-        except Exception as e:
-            logger.error(f"Protection run failed: {e}")
+        """
+        Execute the protection job in a child process.
+
+        The scheduler runs for weeks; doing each run in a short-lived process
+        hands its clients, caches and holdings back to the OS when it exits.
+        """
+        logger.info("Starting scheduled protection run...")
+
+        # Spawn rather than fork: the scheduler's thread pool may hold locks
+        # that a forked child would inherit in a locked state
+        process = multiprocessing.get_context("spawn").Process(
+            target=_protection_entrypoint,
+            args=(config, protection_config),
+            name="dhan-protection",
+        )
+        process.start()
+        process.join()
+
+        if process.exitcode != 0:
+            logger.error(
+                f"Protection process exited with code {process.exitcode}")
 
     # Run immediately if requested
     if run_immediately:
         logger.info("Running immediate protection...")
         run_protection_job()
 
-    # Schedule loop
-    scheduler = sched.scheduler(time.time, time.sleep)
-
-    def schedule_next():
-        """Schedule the next run."""
-        next_run = get_next_market_open()
-        delay = (next_run - datetime.now()).total_seconds()
-
-        logger.info(f"Next protection run scheduled for: {next_run}")
-
-        scheduler.enter(delay, 1, run_and_reschedule)
-
-    def run_and_reschedule():
-        """Run protection and schedule next run."""
-        if is_market_day():
-            run_protection_job()
-        else:
-            logger.info("Skipping - not a market day")
-
-        schedule_next()
-
-    # Start the schedule
-    schedule_next()
+    # Market open on weekdays; APScheduler handles the waiting
+    scheduler = BlockingScheduler(timezone=IST)
+    scheduler.add_job(
+        run_protection_job,
+        CronTrigger(
+            day_of_week="mon-fri",
+            hour=MARKET_OPEN_HOUR,
+            minute=MARKET_OPEN_MINUTE,
+            timezone=IST,
+        ),
+        id="daily_protection",
+        name="Daily Protection at Market Open",
+    )
 
     logger.info("Scheduler started. Press Ctrl+C to stop.")
 
     try:
-        scheduler.run()
-    except KeyboardInterrupt:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
         logger.info("Scheduler stopped by user.")
 
 
@@ -147,7 +187,10 @@ def run_once_at_market_open(
         wait_seconds = (next_open - now).total_seconds()
         logger.info(f"Waiting for market open at {next_open}...")
         logger.info(f"Sleeping for {wait_seconds / 3600:.1f} hours...")
-        time.sleep(wait_seconds)
+        # Sleep in short steps against the wall clock so a suspend/resume
+        # doesn't push the run late
+        while (remaining := (next_open - datetime.now()).total_seconds()) > 0:
+            time.sleep(min(MAX_SLEEP_SECONDS, remaining))
 
     if is_market_day():
         logger.info("Market is open! Running protection...")
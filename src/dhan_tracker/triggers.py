@@ -1,21 +1,44 @@
 """Order trigger monitoring and logging service."""
 
+import atexit
 import logging
+import queue
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 
 from dhan_tracker.client import DhanClient
+from dhan_tracker.models import Holding
 from dhan_tracker.config import DhanConfig
 from dhan_tracker.database import (
     save_order_trigger,
     get_order_triggers,
-    mark_trigger_email_sent,
+    get_processed_order_ids,
+    mark_triggers_email_sent,
     is_database_available,
 )
-from dhan_tracker.notifications import send_sl_trigger_email, get_notifier
+from dhan_tracker.notifications import get_notifier
 
 logger = logging.getLogger(__name__)
 
+# Most order IDs remembered as processed; the oldest are forgotten first
+MAX_PROCESSED_ORDERS = 50_000
+
+# Protection tier a trigger fell under, by minimum P&L % (ascending)
+_TIER_THRESHOLDS = (-10, 0, 5, 10, 20, 30, 50)
+_TIER_LABELS = (
+    "DAMAGE LIMIT",      # below -10%
+    "RECOVERY ROOM",     # -10% to 0%
+    "CAPITAL PROTECT",
+    "PROFIT LOCK +2%",
+    "PROFIT LOCK +5%",
+    "PROFIT LOCK +12%",
+    "PROFIT LOCK +20%",
+    "PROFIT LOCK +35%",  # 50% and above
+)
+
 
 class TriggerMonitor:
     """Monitor and log order trigger executions."""
@@ -25,59 +48,192 @@ class TriggerMonitor:
             config = DhanConfig.load()
             client = DhanClient(config)
         self.client = client
-        self._processed_orders: set[str] = set()
+        # Insertion-ordered so the oldest IDs can be evicted; seeded with
+        # today's logged triggers so a restart doesn't re-log them
+        self._processed_orders: OrderedDict[str, None] = OrderedDict.fromkeys(
+            get_processed_order_ids())
+        # Trigger batches awaiting persistence; None stops the worker
+        self._q: queue.Queue[list[dict] | None] = queue.Queue()
+        self._worker_thread: threading.Thread | None = None
+        # orderStatus of each order as of the previous poll
+        self._seen_status: dict[str, str] = {}
+
+    def _mark_processed(self, order_id: str) -> None:
+        """Remember an order as handled, forgetting the oldest past the cap."""
+        self._processed_orders[order_id] = None
+        while len(self._processed_orders) > MAX_PROCESSED_ORDERS:
+            self._processed_orders.popitem(last=False)
 
     def check_triggered_orders(self) -> list[dict]:
         """
         Check for orders that have been triggered/executed.
 
         Looks for SELL orders with status TRADED that are stop loss orders.
+        New triggers are saved and emailed by the background worker, so they
+        may not be in the database yet when this returns.
 
         Returns:
-            List of newly triggered orders that were logged
+            List of newly triggered orders, queued for logging
         """
         try:
             orders = self.client.get_orders()
         except Exception as e:
-            logger.error(f"Failed to get orders: {e}")
+            logger.error("Failed to get orders: %s", e)
             return []
 
         triggered = []
+        holdings_by_sid: dict[str, Holding] | None = None
+
+        # Rebuilt from each poll's order book, so it never outgrows the day
+        seen_status: dict[str, str] = {}
 
         for order in orders:
             order_id = order.get("orderId", "")
             order_status = order.get("orderStatus", "")
-            order_type = order.get("orderType", "")
-            transaction_type = order.get("transactionType", "")
+
+            # Skip orders whose status hasn't changed since the last poll
+            previous = self._seen_status.get(order_id)
+            seen_status[order_id] = order_status
+            if previous == order_status:
+                continue
 
             # Skip if already processed
             if order_id in self._processed_orders:
                 continue
 
+            order_type = order.get("orderType", "")
+            transaction_type = order.get("transactionType", "")
+
             # Only process SELL orders that are SL types and TRADED
             if (
                 transaction_type == "SELL"
                 and order_type in ["STOP_LOSS", "STOP_LOSS_MARKET"]
                 and order_status == "TRADED"
             ):
-                self._processed_orders.add(order_id)
+                self._mark_processed(order_id)
+
+                # Fetch holdings once per cycle, only if something triggered
+                if holdings_by_sid is None:
+                    holdings_by_sid = self._get_holdings_by_sid()
 
                 # Log the trigger
-                result = self._log_trigger(order)
-                if result:
-                    triggered.append(result)
+                triggered.append(self._log_trigger(order, holdings_by_sid))
+
+        self._seen_status = seen_status
+
+        if triggered:
+            self._enqueue(triggered)
 
         return triggered
 
-    def _log_trigger(self, order: dict) -> dict | None:
+    def _enqueue(self, triggered: list[dict]) -> None:
+        """
+        Hand a polling cycle's triggers to the background worker.
+
+        Args:
+            triggered: Trigger dicts returned by _log_trigger
+        """
+        if self._worker_thread is None:
+            self._worker_thread = threading.Thread(
+                target=self._drain, name="trigger-logger", daemon=True)
+            self._worker_thread.start()
+        self._q.put(triggered)
+
+    def _drain(self) -> None:
+        """Persist queued trigger batches, then queue their emails."""
+        while True:
+            triggered = self._q.get()
+            if triggered is None:
+                break
+            try:
+                # Rows must exist before the email callback marks them sent
+                for trigger_data in triggered:
+                    self._save_trigger(trigger_data)
+                self._send_trigger_emails(triggered)
+            except Exception as e:
+                logger.error("Failed to process triggers: %s", e)
+
+    def close(self) -> None:
+        """Flush queued triggers and their emails, then stop the worker."""
+        if self._worker_thread is not None:
+            self._q.put(None)
+            self._worker_thread.join()
+            self._worker_thread = None
+            # The notifier's own atexit close may already have run (atexit is
+            # LIFO), so send the emails _drain just queued before exiting
+            get_notifier().close()
+
+    def _send_trigger_emails(self, triggered: list[dict]) -> None:
+        """
+        Queue notifications for a polling cycle's triggers as one batch.
+
+        Emails are sent off the polling path by the notifier's worker, which
+        marks them sent once delivered.
+
+        Args:
+            triggered: Trigger dicts returned by _log_trigger
+        """
+        notifier = get_notifier()
+        if not notifier.is_configured():
+            logger.debug("Email not configured - notification skipped")
+            return
+
+        emails = [
+            notifier.build_sl_trigger_email(
+                trading_symbol=t["trading_symbol"],
+                quantity=t["quantity"],
+                trigger_price=t["trigger_price"],
+                executed_price=t["executed_price"],
+                cost_price=t["cost_price"],
+                pnl_amount=t["pnl_amount"],
+                pnl_percent=t["pnl_percent"],
+                protection_tier=t["protection_tier"],
+                order_id=t["order_id"],
+                order_status=t["order_status"],
+            )
+            for t in triggered
+        ]
+
+        def on_sent(results: list[bool]) -> None:
+            sent = [t for t, ok in zip(triggered, results) if ok]
+            if sent:
+                mark_triggers_email_sent([t["order_id"] for t in sent])
+                if logger.isEnabledFor(logging.INFO):
+                    for t in sent:
+                        logger.info("✓ Email notification sent for %s",
+                                    t["trading_symbol"])
+
+        notifier.enqueue(emails, on_sent=on_sent)
+
+    def _get_holdings_by_sid(self) -> dict[str, Holding]:
+        """
+        Holdings keyed by security_id, for P&L lookups.
+
+        Returns:
+            Mapping of security_id to Holding; empty if holdings are unavailable
+        """
+        try:
+            return {h.security_id: h for h in self.client.get_holdings()}
+        except Exception as e:
+            logger.warning("Could not get holdings for P&L calculation: %s", e)
+            return {}
+
+    def _log_trigger(
+        self,
+        order: dict,
+        holdings_by_sid: dict[str, Holding] | None = None,
+    ) -> dict:
         """
-        Log a triggered order to database and send notification.
+        Build the log record for a triggered order.
+
+        The record is persisted and emailed by the background worker.
 
         Args:
             order: Order dict from Dhan API
+            holdings_by_sid: Holdings by security_id (fetched if None)
 
         Returns:
-            Logged trigger dict or None if failed
+            Trigger dict
         """
         order_id = order.get("orderId", "")
         trading_symbol = order.get("tradingSymbol", "")
@@ -95,41 +251,24 @@ class TriggerMonitor:
         protection_tier = None
         isin = None
 
-        try:
-            holdings = self.client.get_holdings()
-            for h in holdings:
-                if h.security_id == security_id:
-                    cost_price = h.avg_cost_price
-                    isin = h.isin
-
-                    # Calculate P&L
-                    if cost_price > 0 and traded_price > 0:
-                        pnl_amount = (traded_price - cost_price) * quantity
-                        pnl_percent = (
-                            (traded_price - cost_price) / cost_price) * 100
-
-                        # Determine protection tier based on P&L
-                        if pnl_percent >= 50:
-                            protection_tier = "PROFIT LOCK +35%"
-                        elif pnl_percent >= 30:
-                            protection_tier = "PROFIT LOCK +20%"
-                        elif pnl_percent >= 20:
-                            protection_tier = "PROFIT LOCK +12%"
-                        elif pnl_percent >= 10:
-                            protection_tier = "PROFIT LOCK +5%"
-                        elif pnl_percent >= 5:
-                            protection_tier = "PROFIT LOCK +2%"
-                        elif pnl_percent >= 0:
-                            protection_tier = "CAPITAL PROTECT"
-                        elif pnl_percent >= -10:
-                            protection_tier = "RECOVERY ROOM"
-                        else:
-                            protection_tier = "DAMAGE LIMIT"
-                    break
-        except Exception as e:
-            logger.warning(f"Could not get holdings for P&L calculation: {e}")
+        if holdings_by_sid is None:
+            holdings_by_sid = self._get_holdings_by_sid()
+
+        h = holdings_by_sid.get(security_id)
+        if h is not None:
+            cost_price = h.avg_cost_price
+            isin = h.isin
+
+            # Calculate P&L
+            if cost_price > 0 and traded_price > 0:
+                pnl_amount = (traded_price - cost_price) * quantity
+                pnl_percent = (
+                    (traded_price - cost_price) / cost_price) * 100
+
+                # Determine protection tier based on P&L
+                protection_tier = _TIER_LABELS[
+                    bisect_right(_TIER_THRESHOLDS, pnl_percent)]
 
-        # Save to database
         trigger_data = {
             "order_id": order_id,
             "trading_symbol": trading_symbol,
@@ -148,39 +287,26 @@ class TriggerMonitor:
             "protection_tier": protection_tier,
         }
 
-        if is_database_available():
-            saved = save_order_trigger(**trigger_data)
-            if saved:
-                logger.info(
-                    f"✓ Logged trigger: {trading_symbol} x{quantity} @ ₹{trigger_price:.2f}"
-                )
-            else:
-                logger.warning(f"Failed to save trigger to database")
-        else:
+        return trigger_data
+
+    def _save_trigger(self, trigger_data: dict) -> None:
+        """
+        Save a trigger record to the database.
+
+        Args:
+            trigger_data: Trigger dict built by _log_trigger
+        """
+        if not is_database_available():
             logger.warning("Database not available - trigger not persisted")
+            return
 
-        # Send email notification
-        notifier = get_notifier()
-        if notifier.is_configured():
-            email_sent = send_sl_trigger_email(
-                trading_symbol=trading_symbol,
-                quantity=quantity,
-                trigger_price=trigger_price,
-                order_id=order_id,
-                order_status=order_status,
-                executed_price=traded_price,
-                cost_price=cost_price,
-                pnl_amount=pnl_amount,
-                pnl_percent=pnl_percent,
-                protection_tier=protection_tier,
-            )
-            if email_sent:
-                mark_trigger_email_sent(order_id)
-                logger.info(f"✓ Email notification sent for {trading_symbol}")
+        if save_order_trigger(**trigger_data):
+            logger.info("✓ Logged trigger: %s x%s @ ₹%.2f",
+                        trigger_data["trading_symbol"],
+                        trigger_data["quantity"],
+                        trigger_data["trigger_price"])
         else:
-            logger.debug("Email not configured - notification skipped")
-
-        return trigger_data
+            logger.warning("Failed to save trigger to database")
 
     def get_trigger_history(
         self,
@@ -223,11 +349,16 @@ class TriggerMonitor:
                 "symbols": [],
             }
 
-        total_pnl = sum(t.get("pnl_amount", 0) or 0 for t in triggers)
-        profit_triggers = sum(1 for t in triggers if (
-            t.get("pnl_amount", 0) or 0) >= 0)
+        # Single pass over the rows for all the aggregates
+        total_pnl = 0
+        profit_triggers = 0
+        symbols: set[str] = set()
+        for t in triggers:
+            pnl = t.get("pnl_amount", 0) or 0
+            total_pnl += pnl
+            profit_triggers += pnl >= 0
+            symbols.add(t["trading_symbol"])
         loss_triggers = len(triggers) - profit_triggers
-        symbols = list(set(t["trading_symbol"] for t in triggers))
 
         return {
             "period_days": days,
@@ -235,7 +366,7 @@ class TriggerMonitor:
             "total_pnl": total_pnl,
             "profit_triggers": profit_triggers,
             "loss_triggers": loss_triggers,
-            "symbols": symbols,
+            "symbols": list(symbols),
             "triggers": triggers,
         }
 
@@ -249,6 +380,7 @@ def get_trigger_monitor() -> TriggerMonitor:
     global _monitor
     if _monitor is None:
         _monitor = TriggerMonitor()
+        atexit.register(_monitor.close)
     return _monitor
 
 
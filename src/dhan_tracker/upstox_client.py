@@ -1,13 +1,39 @@
 """Upstox API client for market data (no authentication required for historical data)."""
 
+import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import quote
 
 import httpx
 
+from .http_utils import HAS_H2, parse_json
+
 logger = logging.getLogger(__name__)
 
+# Historical candle responses are reused from disk for this long (seconds).
+# Each series has one file, overwritten when its to_date rolls over.
+CANDLE_CACHE_TTL = 6 * 60 * 60
+CANDLE_CACHE_DIR = Path.home() / ".cache" / "dhan-tracker" / "upstox"
+
+# Calendar days requested when only the latest close is needed (covers
+# weekends and holiday runs)
+LATEST_CLOSE_DAYS = 10
+
+# Concurrent candle requests in get_market_data_bulk
+MAX_CONCURRENT_REQUESTS = 16
+
+
+@lru_cache(maxsize=16)
+def _date_range(today: date, days: int) -> tuple[str, str]:
+    """(to_date, from_date) strings for a candle request, formatted once per day."""
+    return today.isoformat(), (today - timedelta(days=days)).isoformat()
+
 
 class UpstoxAPIError(Exception):
     """Upstox API error."""
@@ -43,8 +69,18 @@ class UpstoxClient:
 
     BASE_URL = "https://api.upstox.com/v2"
 
-    def __init__(self):
-        """Initialize Upstox client."""
+    def __init__(self, cache_dir: Path | None = CANDLE_CACHE_DIR):
+        """
+        Initialize Upstox client.
+
+        Args:
+            cache_dir: Directory for cached historical candles, or None to
+                always fetch from the API
+        """
+        self._cache_dir = cache_dir
+        # (isin, exchange) -> (day computed, MarketData); daily candles only
+        # change once a day, so every getter shares one computation per day
+        self._market_data_cache: dict[tuple[str, str], tuple[date, MarketData]] = {}
         self._client = httpx.Client(
             base_url=self.BASE_URL,
             headers={
@@ -53,6 +89,12 @@ class UpstoxClient:
                 "Authorization": "Bearer dummy_token",
             },
             timeout=30.0,
+            # HTTP/2 multiplexes concurrent candle requests over one connection
+            http2=HAS_H2,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENT_REQUESTS,
+                max_keepalive_connections=MAX_CONCURRENT_REQUESTS,
+            ),
         )
 
     def __enter__(self):
@@ -79,6 +121,41 @@ class UpstoxClient:
         segment = "NSE_EQ" if exchange.upper() in ("NSE", "ALL") else "BSE_EQ"
         return f"{segment}|{isin}"
 
+    def _cache_path(self, instrument_key: str, interval: str, days: int) -> Path | None:
+        """File holding the cached candles for one series, if caching is on.
+
+        The name leaves out the end date, so each day's fetch overwrites the
+        previous one instead of adding a new file.
+        """
+        if self._cache_dir is None:
+            return None
+        name = f"{instrument_key.replace('|', '_')}_{interval}_{days}.json"
+        return self._cache_dir / name
+
+    def _load_cached(self, path: Path | None, to_date: str) -> dict | None:
+        """Return a cached response if it is recent enough and ends on to_date."""
+        if path is None:
+            return None
+        try:
+            if time.time() - path.stat().st_mtime > CANDLE_CACHE_TTL:
+                return None
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("to_date") != to_date:
+            return None
+        return entry.get("data")
+
+    def _save_cached(self, path: Path | None, to_date: str, data: dict) -> None:
+        """Persist a successful response for later runs."""
+        if path is None or data.get("status") != "success":
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"to_date": to_date, "data": data}))
+        except OSError as e:
+            logger.debug(f"Could not write Upstox candle cache: {e}")
+
     def get_historical_data(
         self,
         instrument_key: str,
@@ -88,6 +165,9 @@ class UpstoxClient:
         """
         Get historical OHLC data for a security.
 
+        Successful responses are cached on disk for CANDLE_CACHE_TTL seconds,
+        so reruns on the same day don't download the candles again.
+
         Args:
             instrument_key: Upstox instrument key (e.g., NSE_EQ|INF200KA16D8)
             interval: Candle interval (1minute, 30minute, day, week, month)
@@ -96,12 +176,15 @@ class UpstoxClient:
         Returns:
             Dict with candles array and status
         """
-        to_date = datetime.now().strftime("%Y-%m-%d")
-        from_date = (datetime.now() - timedelta(days=days)
-                     ).strftime("%Y-%m-%d")
+        to_date, from_date = _date_range(date.today(), days)
+
+        cache_path = self._cache_path(instrument_key, interval, days)
+        cached = self._load_cached(cache_path, to_date)
+        if cached is not None:
+            return cached
 
-        # URL encode the pipe character
-        encoded_key = instrument_key.replace("|", "%7C")
+        # URL encode the pipe separator
+        encoded_key = quote(instrument_key, safe="")
         endpoint = f"/historical-candle/{encoded_key}/{interval}/{to_date}/{from_date}"
 
         try:
@@ -110,7 +193,7 @@ class UpstoxClient:
             if response.status_code >= 400:
                 error_msg = f"HTTP {response.status_code}"
                 try:
-                    error_data = response.json()
+                    error_data = parse_json(response)
                     errors = error_data.get("errors", [])
                     if errors:
                         error_msg = errors[0].get("message", error_msg)
@@ -118,7 +201,9 @@ class UpstoxClient:
                     error_msg = response.text or error_msg
                 raise UpstoxAPIError(error_msg, response.status_code)
 
-            return response.json()
+            data = parse_json(response)
+            self._save_cached(cache_path, to_date, data)
+            return data
 
         except httpx.RequestError as e:
             logger.error(f"Request error: {e}")
@@ -139,6 +224,11 @@ class UpstoxClient:
         Returns:
             MarketData with 52W high/low, 200-DMA, latest close
         """
+        today = date.today()
+        cached = self._market_data_cache.get((isin, exchange))
+        if cached is not None and cached[0] == today:
+            return cached[1]
+
         instrument_key = self._build_instrument_key(isin, exchange)
 
         try:
@@ -152,10 +242,10 @@ class UpstoxClient:
             if not candles:
                 raise UpstoxAPIError(f"No candle data for {instrument_key}")
 
-            # Candle format: [timestamp, open, high, low, close, volume, oi]
-            highs = [c[2] for c in candles]
-            lows = [c[3] for c in candles]
-            closes = [c[4] for c in candles]
+            # Candle format: [timestamp, open, high, low, close, volume, oi];
+            # transpose once in C rather than a list comprehension per column
+            columns = tuple(zip(*candles))
+            highs, lows, closes = columns[2], columns[3], columns[4]
 
             high_52w = max(highs)
             low_52w = min(lows)
@@ -168,7 +258,7 @@ class UpstoxClient:
             if len(closes) >= 200:
                 dma_200 = sum(closes[:200]) / 200
 
-            return MarketData(
+            data = MarketData(
                 instrument_key=instrument_key,
                 latest_close=latest_close,
                 high_52_week=high_52w,
@@ -177,6 +267,8 @@ class UpstoxClient:
                 data_points=len(candles),
                 last_updated=last_date,
             )
+            self._market_data_cache[(isin, exchange)] = (today, data)
+            return data
 
         except UpstoxAPIError:
             raise
@@ -206,6 +298,9 @@ class UpstoxClient:
         """
         Get latest closing price (proxy for LTP).
 
+        Reuses today's full market data if it was already fetched; otherwise
+        only the last LATEST_CLOSE_DAYS of candles are requested.
+
         Args:
             isin: ISIN code
             exchange: Exchange
@@ -213,9 +308,21 @@ class UpstoxClient:
         Returns:
             Latest closing price
         """
+        cached = self._market_data_cache.get((isin, exchange))
+        if cached is not None and cached[0] == date.today():
+            return cached[1].latest_close
+
         try:
-            data = self.get_market_data(isin, exchange)
-            return data.latest_close
+            instrument_key = self._build_instrument_key(isin, exchange)
+            response = self.get_historical_data(instrument_key, days=LATEST_CLOSE_DAYS)
+            if response.get("status") != "success":
+                raise UpstoxAPIError(f"API returned non-success: {response}")
+
+            candles = response.get("data", {}).get("candles", [])
+            if not candles:
+                raise UpstoxAPIError(f"No candle data for {instrument_key}")
+
+            return candles[0][4]  # Most recent is first
         except Exception as e:
             logger.warning(f"Failed to get latest close for {isin}: {e}")
             return 0.0
@@ -245,6 +352,8 @@ class UpstoxClient:
         """
         Get market data for multiple securities.
 
+        Candles are fetched concurrently over the shared client.
+
         Args:
             holdings: List of Holding objects
 
@@ -252,16 +361,26 @@ class UpstoxClient:
             Dict mapping ISIN to MarketData
         """
         result = {}
-        for holding in holdings:
-            try:
-                exchange = holding.exchange if hasattr(
-                    holding, 'exchange') else 'NSE'
-                data = self.get_market_data(holding.isin, exchange)
-                result[holding.isin] = data
-                logger.debug(f"Got market data for {holding.trading_symbol}: "
-                             f"close={data.latest_close}, 52WH={data.high_52_week}")
-            except Exception as e:
-                logger.warning(
-                    f"Failed to get market data for {holding.isin}: {e}")
+        if not holdings:
+            return result
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            futures = {
+                executor.submit(
+                    self.get_market_data, holding.isin,
+                    getattr(holding, "exchange", "NSE"),
+                ): holding
+                for holding in holdings
+            }
+            for future in as_completed(futures):
+                holding = futures[future]
+                try:
+                    data = future.result()
+                    result[holding.isin] = data
+                    logger.debug(f"Got market data for {holding.trading_symbol}: "
+                                 f"close={data.latest_close}, 52WH={data.high_52_week}")
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to get market data for {holding.isin}: {e}")
 
         return result
@@ -0,0 +1,69 @@
+"""Shared pytest setup: app password and server fixtures."""
+
+import os
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+import pytest_asyncio
+
+# Set test password before importing server
+TEST_PASSWORD = "test_password_123"
+os.environ["APP_PASSWORD"] = TEST_PASSWORD
+
+
+@pytest.fixture(scope="session", autouse=True)
+def default_config():
+    """Patch server.DhanConfig once for the session; tests may re-patch it."""
+    config = Mock()
+    config.access_token = "test_token"
+    config.client_id = "test_client"
+    config.base_url = "https://api.dhan.co/v2"
+    config.default_stop_loss_percent = 5.0
+
+    patcher = patch("server.DhanConfig")
+    MockConfig = patcher.start()
+    MockConfig.load.return_value = config
+    MockConfig.from_file.return_value = config
+    yield config
+    patcher.stop()
+
+
+@pytest.fixture(scope="session")
+def app(default_config):
+    """The FastAPI app with the config dependency overridden."""
+    # Import app after patching
+    from server import app, get_dhan_config
+
+    app.dependency_overrides[get_dhan_config] = lambda: default_config
+    yield app
+    app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def async_client(app):
+    """Create an in-process async client for the app."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture
+def dhan_client_mock(app, monkeypatch):
+    """Override the DhanClient dependency; returns the instance endpoints get."""
+    from server import get_dhan_client
+
+    instance = Mock()
+    app.dependency_overrides[get_dhan_client] = lambda: instance
+    # Scheduler jobs build their own client outside dependency injection
+    monkeypatch.setattr("server.DhanClient", Mock(return_value=instance))
+    yield instance
+    del app.dependency_overrides[get_dhan_client]
+
+
+@pytest.fixture
+def protector_mock(monkeypatch):
+    """Replace server.PortfolioProtector; returns the instance the server will get."""
+    instance = Mock()
+    monkeypatch.setattr("server.PortfolioProtector", Mock(return_value=instance))
+    return instance
@@ -2,32 +2,61 @@
 Tests for Dhan Tracker FastAPI Server
 
 Run with: pytest tests/test_server.py -v
+In parallel (pytest-xdist): pytest -n auto --dist=loadscope tests/test_server.py
 """
 
 import os
+import httpx
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch
 from datetime import datetime
-from fastapi.testclient import TestClient
 
-# Mock the config before importing server
-import sys
-from pathlib import Path
-
-# Add project root to path for server import
-PROJECT_ROOT = Path(__file__).parent.parent
-sys.path.insert(0, str(PROJECT_ROOT))
-sys.path.insert(0, str(PROJECT_ROOT / "src"))
-
-# Set test password before importing server
-TEST_PASSWORD = "test_password_123"
-os.environ["APP_PASSWORD"] = TEST_PASSWORD
-
-
-@pytest.fixture
-def auth_headers():
-    """Return headers with valid password."""
-    return {"X-Password": TEST_PASSWORD}
+from dhan_tracker.client import DhanAPIError, DhanClient
+from dhan_tracker.config import DhanConfig
+from dhan_tracker.models import Holding, LegDetail, SuperOrder
+from dhan_tracker.nse_client import NSEClient
+from dhan_tracker.protection import (
+    PortfolioProtector,
+    ProtectionConfig,
+    ProtectionResult,
+    _apply_bps,
+)
+from dhan_tracker.triggers import TriggerMonitor
+
+# APP_PASSWORD is set by conftest.py before this module is imported
+AUTH_HEADERS = {"X-Password": os.environ["APP_PASSWORD"]}
+
+
+# NSE quote API payload for TATSILV
+_NSE_PAYLOAD = {
+    "equityResponse": [{
+        "orderBook": {"lastPrice": 31.5},
+        "metaData": {
+            "closePrice": 31.31,
+            "previousClose": 29.0,
+            "open": 28.27,
+            "dayHigh": 32.35,
+            "dayLow": 28.27,
+            "change": 2.5,
+            "pChange": 8.62,
+            "companyName": "Tata Silver ETF",
+            "isinCode": "INF277KA1984",
+        }
+    }]
+}
+
+
+def _transport(payload, status_code: int = 200) -> httpx.MockTransport:
+    """Build a transport answering every request with a JSON payload."""
+    return httpx.MockTransport(
+        lambda request: httpx.Response(status_code, json=payload))
+
+
+def _nse_client(transport: httpx.MockTransport):
+    """Build an initialized NSEClient on top of a mock transport."""
+    nse = NSEClient(cookie_cache_path=None, transport=transport)
+    nse._initialized = True  # Skip session init
+    return nse
 
 
 @pytest.fixture
@@ -41,10 +70,9 @@ def mock_config():
     return config
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_holding():
     """Create a mock Holding."""
-    from dhan_tracker.models import Holding
     return Holding(
         security_id="12345",
         trading_symbol="TATSILV",
@@ -59,10 +87,9 @@ def mock_holding():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_holdings_list(mock_holding):
     """Create a list of mock Holdings."""
-    from dhan_tracker.models import Holding
     return [
         mock_holding,
         Holding(
@@ -92,10 +119,9 @@ def mock_holdings_list(mock_holding):
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_super_order():
     """Create a mock SuperOrder."""
-    from dhan_tracker.models import SuperOrder, LegDetail
     return SuperOrder(
         dhan_client_id="1234567890",
         order_id="ORD123456",
@@ -131,39 +157,55 @@ def mock_super_order():
     )
 
 
+@pytest.fixture(scope="module")
+def bare_protector():
+    """PortfolioProtector with only a config, for pure price calculations."""
+    protector = PortfolioProtector.__new__(PortfolioProtector)
+    protector.config = ProtectionConfig(
+        stop_loss_percent=5.0, target_percent=20.0)
+    return protector
+
+
 @pytest.fixture
-def client(mock_config):
-    """Create a test client with mocked dependencies."""
-    with patch("server.DhanConfig") as MockConfig:
-        MockConfig.from_file.return_value = mock_config
+def frozen_now(monkeypatch):
+    """Freeze server.datetime.now() at a fixed instant; returns that instant."""
+    from server import IST
+
+    frozen = IST.localize(datetime(2026, 1, 21, 9, 15))
 
-        # Import app after patching
-        from server import app
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen.astimezone(tz) if tz else frozen.replace(tzinfo=None)
 
-        yield TestClient(app)
+    monkeypatch.setattr("server.datetime", FrozenDatetime)
+    return frozen
 
 
 class TestHealthEndpoints:
     """Tests for health check endpoints."""
 
-    def test_root_health_check(self, client):
+    @pytest.mark.asyncio
+    async def test_root_health_check(self, async_client):
         """Test root endpoint returns HTML UI."""
-        response = client.get("/")
+        response = await async_client.get("/")
         assert response.status_code == 200
         assert "text/html" in response.headers.get("content-type", "")
 
-    def test_simple_health_check(self, client):
+    @pytest.mark.asyncio
+    async def test_simple_health_check(self, async_client, frozen_now):
         """Test /health endpoint for load balancers (no password required)."""
-        response = client.get("/health")
+        response = await async_client.get("/health")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
-        assert "timestamp" in data
+        assert data["timestamp"] == frozen_now.isoformat()
         assert "scheduler_running" in data
 
-    def test_health_check_with_password(self, client, auth_headers):
+    @pytest.mark.asyncio
+    async def test_health_check_with_password(self, async_client, frozen_now):
         """Test /health endpoint also works with password (for backward compatibility)."""
-        response = client.get("/health", headers=auth_headers)
+        response = await async_client.get("/health", headers=AUTH_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
@@ -172,26 +214,21 @@ class TestHealthEndpoints:
 class TestHoldingsEndpoint:
     """Tests for /api/holdings endpoint."""
 
-    def test_get_holdings_success(self, client, mock_config, mock_holdings_list, auth_headers):
+    @pytest.mark.asyncio
+    async def test_get_holdings_success(self, async_client, dhan_client_mock, mock_holdings_list):
         """Test successful holdings retrieval."""
-        with patch("server.DhanConfig") as MockConfig, \
-                patch("server.DhanClient") as MockClient, \
-                patch("server.NSEClient") as MockNSE:
-
-            MockConfig.from_file.return_value = mock_config
+        with patch("server.NSEClient") as MockNSE:
 
-            mock_client_instance = Mock()
-            mock_client_instance.get_holdings.return_value = mock_holdings_list
-            MockClient.return_value = mock_client_instance
+            dhan_client_mock.get_holdings.return_value = mock_holdings_list
 
             # Mock NSE client
-            mock_nse_instance = MagicMock()
+            mock_nse_instance = Mock(spec=NSEClient)
             mock_nse_instance.get_ltp.side_effect = [31.31, 231.18, 23.76]
             mock_nse_instance.__enter__ = Mock(return_value=mock_nse_instance)
             mock_nse_instance.__exit__ = Mock(return_value=False)
             MockNSE.return_value = mock_nse_instance
 
-            response = client.get("/api/holdings", headers=auth_headers)
+            response = await async_client.get("/api/holdings", headers=AUTH_HEADERS)
             assert response.status_code == 200
 
             data = response.json()
@@ -199,184 +236,151 @@ class TestHoldingsEndpoint:
             assert data["total_invested"] > 0
             assert data["total_current"] > 0
 
-    def test_get_holdings_empty(self, client, mock_config, auth_headers):
+    @pytest.mark.asyncio
+    async def test_get_holdings_empty(self, async_client, dhan_client_mock):
         """Test holdings when portfolio is empty."""
-        with patch("server.DhanConfig") as MockConfig, \
-                patch("server.DhanClient") as MockClient:
+        dhan_client_mock.get_holdings.return_value = []
 
-            MockConfig.from_file.return_value = mock_config
-
-            mock_client_instance = Mock()
-            mock_client_instance.get_holdings.return_value = []
-            MockClient.return_value = mock_client_instance
-
-            response = client.get("/api/holdings", headers=auth_headers)
-            assert response.status_code == 200
+        response = await async_client.get("/api/holdings", headers=AUTH_HEADERS)
+        assert response.status_code == 200
 
-            data = response.json()
-            assert data["holdings"] == []
-            assert data["total_invested"] == 0
+        data = response.json()
+        assert data["holdings"] == []
+        assert data["total_invested"] == 0
 
-    def test_get_holdings_api_error(self, client, mock_config, auth_headers):
+    @pytest.mark.asyncio
+    async def test_get_holdings_api_error(self, async_client, dhan_client_mock):
         """Test holdings when API returns error."""
-        with patch("server.DhanConfig") as MockConfig, \
-                patch("server.DhanClient") as MockClient:
+        dhan_client_mock.get_holdings.side_effect = DhanAPIError(
+            "API Error", 401)
 
-            MockConfig.from_file.return_value = mock_config
-
-            from dhan_tracker.client import DhanAPIError
-            mock_client_instance = Mock()
-            mock_client_instance.get_holdings.side_effect = DhanAPIError(
-                "API Error", 401)
-            MockClient.return_value = mock_client_instance
-
-            response = client.get("/api/holdings", headers=auth_headers)
-            assert response.status_code == 401
+        response = await async_client.get("/api/holdings", headers=AUTH_HEADERS)
+        assert response.status_code == 401
 
 
 class TestOrdersEndpoint:
     """Tests for /api/orders endpoint."""
 
-    def test_get_orders_success(self, client, mock_config, mock_super_order, auth_headers):
+    @pytest.mark.asyncio
+    async def test_get_orders_success(self, async_client, dhan_client_mock, mock_super_order):
         """Test successful orders retrieval."""
-        with patch("server.DhanConfig") as MockConfig, \
-                patch("server.DhanClient") as MockClient:
-
-            MockConfig.from_file.return_value = mock_config
-
-            mock_client_instance = Mock()
-            mock_client_instance.get_super_orders.return_value = [
-                mock_super_order]
-            MockClient.return_value = mock_client_instance
-
-            response = client.get("/api/orders", headers=auth_headers)
-            assert response.status_code == 200
-
-            data = response.json()
-            assert data["count"] == 1
-            assert len(data["orders"]) == 1
-            assert data["orders"][0]["symbol"] == "TATSILV"
-            # stop_loss_leg property finds the leg with leg_name == "STOP_LOSS_LEG"
-            assert data["orders"][0]["stop_loss"] == 29.74
+        dhan_client_mock.get_forever_orders.return_value = [{
+            "orderId": "FO123",
+            "orderStatus": "PENDING",
+            "transactionType": "SELL",
+            "orderType": "STOP_LOSS_MARKET",
+            "tradingSymbol": "TATSILV",
+            "securityId": "12345",
+            "quantity": 160,
+            "triggerPrice": 26.05,
+        }]
+        dhan_client_mock.get_super_orders.return_value = [
+            mock_super_order]
+
+        response = await async_client.get("/api/orders", headers=AUTH_HEADERS)
+        assert response.status_code == 200
 
-    def test_get_orders_empty(self, client, mock_config, auth_headers):
+        data = response.json()
+        assert data["forever_orders"]["count"] == 1
+        forever = data["forever_orders"]["orders"][0]
+        assert forever["order_id"] == "FO123"
+        assert forever["status"] == "PENDING"
+        assert forever["trigger_price"] == 26.05
+        assert data["super_orders"]["count"] == 1
+        assert data["super_orders"]["orders"][0]["symbol"] == "TATSILV"
+        # stop_loss_leg property finds the leg with leg_name == "STOP_LOSS_LEG"
+        assert data["super_orders"]["orders"][0]["stop_loss"] == 29.74
+
+    @pytest.mark.asyncio
+    async def test_get_orders_empty(self, async_client, dhan_client_mock):
         """Test orders when none exist."""
-        with patch("server.DhanConfig") as MockConfig, \
-                patch("server.DhanClient") as MockClient:
-
-            MockConfig.from_file.return_value = mock_config
+        dhan_client_mock.get_forever_orders.return_value = []
+        dhan_client_mock.get_super_orders.return_value = []
 
-            mock_client_instance = Mock()
-            mock_client_instance.get_super_orders.return_value = []
-            MockClient.return_value = mock_client_instance
-
-            response = client.get("/api/orders", headers=auth_headers)
-            assert response.status_code == 200
+        response = await async_client.get("/api/orders", headers=AUTH_HEADERS)
+        assert response.status_code == 200
 
-            data = response.json()
-            assert data["count"] == 0
-            assert data["orders"] == []
+        data = response.json()
+        assert data["forever_orders"] == {"count": 0, "orders": []}
+        assert data["super_orders"] == {"count": 0, "orders": []}
 
 
 class TestProtectionEndpoints:
     """Tests for protection-related endpoints."""
 
-    def test_get_protection_status(self, client, mock_config, mock_holdings_list, auth_headers):
+    @pytest.mark.asyncio
+    async def test_get_protection_status(self, async_client, dhan_client_mock, protector_mock, mock_holdings_list):
         """Test protection status endpoint."""
-        with patch("server.DhanConfig") as MockConfig, \
-                patch("server.DhanClient") as MockClient, \
-                patch("server.PortfolioProtector") as MockProtector:
-
-            MockConfig.from_file.return_value = mock_config
-
-            mock_protector_instance = Mock()
-            mock_protector_instance.get_protection_summary.return_value = {
-                "total_holdings": 3,
-                "protected_count": 1,
-                "unprotected_count": 2,
-                "total_value": 6843.62,
-                "protected_value": 5009.60,
-                "unprotected_value": 1834.02,
-                "protection_percent": 73.2,
-                "active_super_orders": [],
-                "protected_holdings": [],
-                "unprotected_holdings": [],
-            }
-            MockProtector.return_value = mock_protector_instance
-
-            response = client.get(
-                "/api/protection/status", headers=auth_headers)
-            assert response.status_code == 200
+        protector_mock.get_protection_summary.return_value = {
+            "total_holdings": 3,
+            "protected_count": 1,
+            "unprotected_count": 2,
+            "total_value": 6843.62,
+            "protected_value": 5009.60,
+            "unprotected_value": 1834.02,
+            "protection_percent": 73.2,
+            "active_super_orders": [],
+            "protected_holdings": [],
+            "unprotected_holdings": [],
+        }
+
+        response = await async_client.get(
+            "/api/protection/status", headers=AUTH_HEADERS)
+        assert response.status_code == 200
 
-            data = response.json()
-            assert data["total_holdings"] == 3
-            assert data["protected_count"] == 1
-            assert data["protection_percent"] == 73.2
+        data = response.json()
+        assert data["total_holdings"] == 3
+        assert data["protected_count"] == 1
+        assert data["protection_percent"] == 73.2
 
-    def test_run_protection_success(self, client, mock_config, mock_holding, auth_headers):
+    @pytest.mark.asyncio
+    async def test_run_protection_success(self, async_client, dhan_client_mock, protector_mock, mock_holding):
         """Test manual protection run."""
-        with patch("server.DhanConfig") as MockConfig, \
-                patch("server.DhanClient") as MockClient, \
-                patch("server.PortfolioProtector") as MockProtector:
-
-            MockConfig.from_file.return_value = mock_config
-
-            from dhan_tracker.protection import ProtectionResult
-            mock_result = ProtectionResult(
-                holding=mock_holding,
-                success=True,
-                ltp=31.31,
-                order_id="ORD123456",
-                message="Order placed",
-                stop_loss_price=29.74,
-                target_price=37.57,
-            )
-
-            mock_protector_instance = Mock()
-            mock_protector_instance.protect_portfolio.return_value = [
-                mock_result]
-            MockProtector.return_value = mock_protector_instance
-
-            response = client.post(
-                "/api/protection/run?force=true", headers=auth_headers)
-            assert response.status_code == 200
+        mock_result = ProtectionResult(
+            holding=mock_holding,
+            success=True,
+            ltp=31.31,
+            order_id="ORD123456",
+            message="Order placed",
+            stop_loss_price=29.74,
+            target_price=37.57,
+        )
+
+        protector_mock.protect_portfolio_async = AsyncMock(
+            return_value=[mock_result])
+
+        response = await async_client.post(
+            "/api/protection/run?force=true", headers=AUTH_HEADERS)
+        assert response.status_code == 200
 
-            data = response.json()
-            assert data["status"] == "success"
-            assert "Protected 1/1 holdings" in data["message"]
-            assert len(data["results"]) == 1
+        data = response.json()
+        assert data["status"] == "success"
+        assert "Protected 1/1 holdings" in data["message"]
+        assert len(data["results"]) == 1
 
-    def test_cancel_protection(self, client, mock_config, mock_holdings_list, auth_headers):
+    @pytest.mark.asyncio
+    async def test_cancel_protection(self, async_client, dhan_client_mock, protector_mock, mock_holdings_list):
         """Test cancel protection orders."""
-        with patch("server.DhanConfig") as MockConfig, \
-                patch("server.DhanClient") as MockClient, \
-                patch("server.PortfolioProtector") as MockProtector:
-
-            MockConfig.from_file.return_value = mock_config
-
-            mock_client_instance = Mock()
-            mock_client_instance.get_holdings.return_value = mock_holdings_list
-            MockClient.return_value = mock_client_instance
+        dhan_client_mock.get_holdings.return_value = mock_holdings_list
 
-            mock_protector_instance = Mock()
-            mock_protector_instance.cancel_existing_orders.return_value = 2
-            MockProtector.return_value = mock_protector_instance
+        protector_mock.cancel_existing_orders.return_value = 2
 
-            response = client.post(
-                "/api/protection/cancel", headers=auth_headers)
-            assert response.status_code == 200
+        response = await async_client.post(
+            "/api/protection/cancel", headers=AUTH_HEADERS)
+        assert response.status_code == 200
 
-            data = response.json()
-            assert data["status"] == "success"
-            assert data["cancelled_count"] == 2
+        data = response.json()
+        assert data["status"] == "success"
+        assert data["cancelled_count"] == 2
 
 
 class TestSchedulerEndpoints:
     """Tests for scheduler-related endpoints."""
 
-    def test_scheduler_status(self, client, auth_headers):
+    @pytest.mark.asyncio
+    async def test_scheduler_status(self, async_client):
         """Test scheduler status endpoint."""
-        response = client.get("/api/scheduler/status", headers=auth_headers)
+        response = await async_client.get("/api/scheduler/status", headers=AUTH_HEADERS)
         assert response.status_code == 200
 
         data = response.json()
@@ -384,28 +388,19 @@ class TestSchedulerEndpoints:
         assert "jobs" in data
         assert data["timezone"] == "Asia/Kolkata"
 
-    def test_scheduler_trigger(self, client, mock_config, auth_headers):
+    @pytest.mark.asyncio
+    async def test_scheduler_trigger(self, async_client, dhan_client_mock, protector_mock):
         """Test manual scheduler trigger."""
-        with patch("server.DhanConfig") as MockConfig, \
-                patch("server.DhanClient") as MockClient, \
-                patch("server.PortfolioProtector") as MockProtector:
-
-            MockConfig.from_file.return_value = mock_config
-
-            mock_client_instance = Mock()
-            mock_client_instance.get_holdings.return_value = []
-            MockClient.return_value = mock_client_instance
+        dhan_client_mock.get_holdings.return_value = []
 
-            mock_protector_instance = Mock()
-            mock_protector_instance.protect_portfolio.return_value = []
-            MockProtector.return_value = mock_protector_instance
+        protector_mock.protect_portfolio.return_value = []
 
-            response = client.post(
-                "/api/scheduler/trigger", headers=auth_headers)
-            assert response.status_code == 200
+        response = await async_client.post(
+            "/api/scheduler/trigger", headers=AUTH_HEADERS)
+        assert response.status_code == 200
 
-            data = response.json()
-            assert data["status"] == "triggered"
+        data = response.json()
+        assert data["status"] == "triggered"
 
 
 class TestNSEClient:
@@ -413,198 +408,163 @@ class TestNSEClient:
 
     def test_get_quote_success(self):
         """Test successful quote fetch from NSE."""
-        with patch("httpx.Client") as MockHttpClient:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = {
-                "equityResponse": [{
-                    "orderBook": {"lastPrice": 31.5},
-                    "metaData": {
-                        "closePrice": 31.31,
-                        "previousClose": 29.0,
-                        "open": 28.27,
-                        "dayHigh": 32.35,
-                        "dayLow": 28.27,
-                        "change": 2.5,
-                        "pChange": 8.62,
-                        "companyName": "Tata Silver ETF",
-                        "isinCode": "INF277KA1984",
-                    }
-                }]
-            }
-
-            mock_client_instance = MagicMock()
-            mock_client_instance.get.return_value = mock_response
-            MockHttpClient.return_value = mock_client_instance
+        nse = _nse_client(_transport(_NSE_PAYLOAD))
 
-            from dhan_tracker.nse_client import NSEClient
+        quote = nse.get_quote("TATSILV")
 
-            nse = NSEClient()
-            nse._initialized = True  # Skip session init
-            nse._client = mock_client_instance
-
-            quote = nse.get_quote("TATSILV")
-
-            assert quote.symbol == "TATSILV"
-            assert quote.close_price == 31.31
-            assert quote.last_price == 31.5
+        assert quote.symbol == "TATSILV"
+        assert quote.close_price == 31.31
+        assert quote.last_price == 31.5
 
     def test_get_ltp_uses_close_price(self):
         """Test that get_ltp returns closePrice (not lastPrice)."""
-        with patch("httpx.Client") as MockHttpClient:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = {
-                "equityResponse": [{
-                    "orderBook": {"lastPrice": 31.5},
-                    "metaData": {
-                        "closePrice": 31.31,
-                        "previousClose": 29.0,
-                        "open": 28.27,
-                        "dayHigh": 32.35,
-                        "dayLow": 28.27,
-                        "change": 2.5,
-                        "pChange": 8.62,
-                        "companyName": "Tata Silver ETF",
-                        "isinCode": "INF277KA1984",
-                    }
-                }]
-            }
+        nse = _nse_client(_transport(_NSE_PAYLOAD))
 
-            mock_client_instance = MagicMock()
-            mock_client_instance.get.return_value = mock_response
-            MockHttpClient.return_value = mock_client_instance
+        ltp = nse.get_ltp("TATSILV")
 
-            from dhan_tracker.nse_client import NSEClient
-
-            nse = NSEClient()
-            nse._initialized = True
-            nse._client = mock_client_instance
-
-            ltp = nse.get_ltp("TATSILV")
-
-            # Should use closePrice, not lastPrice
-            assert ltp == 31.31
+        # Should use closePrice, not lastPrice
+        assert ltp == 31.31
 
 
 class TestProtectionLogic:
     """Tests for protection calculation logic."""
 
-    def test_calculate_stop_loss_price(self, mock_config):
-        """Test stop loss calculation."""
-        from dhan_tracker.protection import ProtectionConfig
-
-        config = ProtectionConfig(stop_loss_percent=5.0)
+    @pytest.mark.parametrize("method,ltp,expected", [
+        ("calculate_stop_loss_price", 100.0, 95.0),  # 5% below 100 = 95
+        ("calculate_stop_loss_price", 31.31, 29.75),  # 5% below, snapped to ₹0.05 tick
+        ("calculate_target_price", 100.0, 120.0),
+        ("calculate_target_price", 31.31, 37.55),  # 20% above, snapped to ₹0.05 tick
+    ])
+    def test_price_calculation(self, bare_protector, method, ltp, expected):
+        """Test stop loss and target price calculations."""
+        assert getattr(bare_protector, method)(ltp) == expected
+
+    @pytest.mark.parametrize("cost,ltp,expected", [
+        (24.83, 27.5, 26.05),   # +5% lock on cost is 26.07, floored to the tick
+        (101.37, 95.0, 91.2),   # cost -10% is 91.23
+        (100.0, 50.0, 47.5),    # deep loss: LTP -5%
+        (0.0, 31.31, 29.7),     # no cost data: LTP -5% is 29.74
+    ])
+    def test_order_stop_loss_on_tick_grid(self, bare_protector, cost, ltp, expected):
+        """Order SL triggers are rounded down to a ₹0.05 tick."""
+        assert bare_protector._order_stop_loss(cost, ltp)[0] == expected
+
+    def test_filter_keeps_low_cost_holdings_for_min_value(self, mock_holding):
+        """min_value is judged on LTP later, not on cost before prices are fetched."""
+        protector = PortfolioProtector.__new__(PortfolioProtector)
+        protector.config = ProtectionConfig(min_value=6000)
+        # 160 x ₹24.80 is ₹3968 at cost, but may clear ₹6000 at a higher LTP
+        assert protector._filter_protectable([mock_holding]) == ([mock_holding], [])
+
+    def test_filter_reports_holdings_below_min_quantity(self, mock_holding):
+        """Holdings below min_quantity still get a failed result."""
+        protector = PortfolioProtector.__new__(PortfolioProtector)
+        protector.config = ProtectionConfig(min_quantity=200)
+
+        kept, skipped = protector._filter_protectable([mock_holding])
+
+        assert kept == []
+        assert [r.holding for r in skipped] == [mock_holding]
+        assert not skipped[0].success
+        assert skipped[0].message == "Available quantity (160) below minimum (200)"
+
+    @pytest.mark.parametrize("price,bps,expected", [
+        (100.0, -500, 95.0),
+        (31.31, -500, 29.74),   # 29.7445 rounds down
+        (24.83, 500, 26.07),    # 26.0715 rounds down
+        (0.10, 500, 0.11),      # exact half paisa rounds up
+        (19.99, 0, 19.99),
+    ])
+    def test_apply_bps_rounds_half_up_to_paisa(self, price, bps, expected):
+        """Basis-point moves are exact in paise, rounding half-up."""
+        assert _apply_bps(price, bps) == expected
+
+    @pytest.mark.parametrize("old,new,expected", [
+        (10.0, 10.05, False),    # one tick is not more than the ₹0.05 epsilon
+        (10.0, 10.10, True),
+        (10.0, 9.90, True),
+        (0.30, 0.35, False),     # 0.30 * 100 is not exactly 30 in floats
+        (100.0, 100.10, False),  # 0.1% of ₹100 is 10 paise
+        (100.0, 100.15, True),
+    ])
+    def test_needs_modify_threshold(self, bare_protector, old, new, expected):
+        """Modifies need a move above max(epsilon, 0.1% of the old trigger)."""
+        assert bare_protector._needs_modify(old, new) is expected
 
-        # 5% below 100 = 95
-        from dhan_tracker.protection import PortfolioProtector
-        from dhan_tracker.client import DhanClient
 
-        with patch.object(DhanClient, "__init__", lambda self, config: None):
-            protector = PortfolioProtector.__new__(PortfolioProtector)
-            protector.config = config
-
-            assert protector.calculate_stop_loss_price(100.0) == 95.0
-            assert protector.calculate_stop_loss_price(
-                31.31) == 29.74  # 5% below
-
-    def test_calculate_target_price(self, mock_config):
-        """Test target price calculation."""
-        from dhan_tracker.protection import ProtectionConfig
-
-        config = ProtectionConfig(target_percent=20.0)
+class TestDhanClient:
+    """Tests for Dhan API Client."""
 
-        from dhan_tracker.protection import PortfolioProtector
-        from dhan_tracker.client import DhanClient
+    def test_get_holdings_success(self, mock_config):
+        """Test successful holdings fetch."""
+        transport = _transport([
+            {
+                "securityId": "12345",
+                "tradingSymbol": "TATSILV",
+                "exchange": "NSE",
+                "isin": "INF277KA1984",
+                "totalQty": 160,
+                "availableQty": 160,
+                "avgCostPrice": 24.80,
+                "collateralQty": 0,
+            }
+        ])
 
-        with patch.object(DhanClient, "__init__", lambda self, config: None):
-            protector = PortfolioProtector.__new__(PortfolioProtector)
-            protector.config = config
+        client = DhanClient(mock_config, transport=transport)
 
-            assert protector.calculate_target_price(100.0) == 120.0
-            assert protector.calculate_target_price(
-                31.31) == 37.57  # 20% above
+        holdings = client.get_holdings()
 
+        assert len(holdings) == 1
+        assert holdings[0].trading_symbol == "TATSILV"
+        assert holdings[0].total_qty == 160
 
-class TestDhanClient:
-    """Tests for Dhan API Client."""
+    def test_holdings_cache_survives_reads_and_clears_on_writes(self, mock_config):
+        """Reads within the TTL reuse holdings; only order writes refetch them."""
+        paths = []
 
-    def test_get_holdings_success(self, mock_config):
-        """Test successful holdings fetch."""
-        with patch("httpx.Client") as MockHttpClient:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = [
-                {
-                    "securityId": "12345",
-                    "tradingSymbol": "TATSILV",
-                    "exchange": "NSE",
-                    "isin": "INF277KA1984",
-                    "totalQty": 160,
-                    "availableQty": 160,
-                    "avgCostPrice": 24.80,
-                    "collateralQty": 0,
-                }
-            ]
-
-            mock_client_instance = MagicMock()
-            mock_client_instance.request.return_value = mock_response
-            MockHttpClient.return_value = mock_client_instance
-
-            from dhan_tracker.client import DhanClient
+        def handler(request):
+            paths.append((request.method, request.url.path))
+            if request.url.path.endswith("/holdings"):
+                return httpx.Response(200, json=[])
+            return httpx.Response(200, json={"data": {}})
 
-            client = DhanClient(mock_config)
-            client._client = mock_client_instance
+        client = DhanClient(mock_config, transport=httpx.MockTransport(handler))
 
-            holdings = client.get_holdings()
+        client.get_holdings()
+        client.get_ltp({"NSE_EQ": ["12345"]})  # read-only POST
+        client.get_holdings()
+        assert paths.count(("GET", "/v2/holdings")) == 1
 
-            assert len(holdings) == 1
-            assert holdings[0].trading_symbol == "TATSILV"
-            assert holdings[0].total_qty == 160
+        client.cancel_order("ORD1")
+        client.get_holdings()
+        assert paths.count(("GET", "/v2/holdings")) == 2
 
     def test_api_error_handling(self, mock_config):
         """Test API error handling for 401 errors."""
-        with patch("httpx.Client") as MockHttpClient:
-            mock_response = Mock()
-            mock_response.status_code = 401
-            mock_response.json.return_value = {"errorMessage": "Invalid token"}
-            mock_response.text = "Unauthorized"
+        transport = _transport(
+            {"errorMessage": "Invalid token"}, status_code=401)
 
-            mock_client_instance = MagicMock()
-            mock_client_instance.request.return_value = mock_response
-            MockHttpClient.return_value = mock_client_instance
-
-            from dhan_tracker.client import DhanClient, DhanAPIError
-
-            client = DhanClient(mock_config)
-            client._client = mock_client_instance
+        client = DhanClient(mock_config, transport=transport)
 
-            # 401 errors should be raised immediately (no auto-refresh on 401)
-            # because token refresh requires a VALID token
-            with pytest.raises(DhanAPIError) as exc_info:
-                client.get_holdings()
+        # 401 errors should be raised immediately (no auto-refresh on 401)
+        # because token refresh requires a VALID token
+        with pytest.raises(DhanAPIError) as exc_info:
+            client.get_holdings()
 
-            assert exc_info.value.status_code == 401
+        assert exc_info.value.status_code == 401
 
     def test_proactive_token_refresh(self, mock_config):
         """Test proactive token refresh (when token is still valid)."""
-        with patch("httpx.post") as mock_post:
-            
-            # Token refresh response (simulating successful refresh)
-            mock_refresh_response = Mock()
-            mock_refresh_response.status_code = 200
-            mock_refresh_response.json.return_value = {"access_token": "new_token_456"}
-            mock_post.return_value = mock_refresh_response
-
-            from dhan_tracker.client import DhanClient
-
+        # RenewToken is a GET; simulate a successful refresh
+        with patch("httpx.get", return_value=httpx.Response(
+                200, json={"access_token": "new_token_456"})) as mock_get:
             client = DhanClient(mock_config)
 
             # Manually call refresh (simulating scheduled job)
             result = client.refresh_token()
 
             # Verify token was refreshed
-            assert mock_post.called
+            assert mock_get.called
             assert client.config.access_token == "new_token_456"
             assert client._client.headers["access-token"] == "new_token_456"
             
@@ -612,27 +572,88 @@ class TestDhanClient:
             assert result["access_token"] == "new_token_456"
 
 
-# Integration test (requires real credentials)
+def _sl_order(order_id: str, status: str, security_id: str = "12345") -> dict:
+    """Order book entry for a SELL stop loss order."""
+    return {
+        "orderId": order_id,
+        "orderStatus": status,
+        "orderType": "STOP_LOSS_MARKET",
+        "transactionType": "SELL",
+        "tradingSymbol": "TATSILV",
+        "securityId": security_id,
+        "quantity": 160,
+        "triggerPrice": 26.05,
+        "price": 26.0,
+    }
+
+
+class TestTriggerMonitor:
+    """Tests for stop loss trigger detection."""
+
+    @pytest.fixture
+    def monitor(self):
+        """TriggerMonitor on a mock client, with one order ID already logged."""
+        client = Mock()
+        client.get_holdings.return_value = []
+        with patch("dhan_tracker.triggers.get_processed_order_ids",
+                   return_value=["WARM1"]):
+            monitor = TriggerMonitor(client)
+        with patch.object(monitor, "_enqueue") as enqueue:
+            yield monitor, client, enqueue
+
+    def test_poll_sequence_logs_each_trigger_once(self, monitor):
+        """PENDING -> TRADED is logged once; repeats and warm-start IDs are skipped."""
+        monitor, client, enqueue = monitor
+        client.get_orders.side_effect = [
+            [_sl_order("ORD1", "PENDING"), _sl_order("WARM1", "TRADED")],
+            [_sl_order("ORD1", "TRADED"), _sl_order("WARM1", "TRADED")],
+            [_sl_order("ORD1", "TRADED"), _sl_order("WARM1", "TRADED")],
+        ]
+
+        polls = [monitor.check_triggered_orders() for _ in range(3)]
+
+        assert [len(p) for p in polls] == [0, 1, 0]
+        assert polls[1][0]["order_id"] == "ORD1"
+        enqueue.assert_called_once_with(polls[1])
+
+    @pytest.mark.parametrize("traded_price,expected", [
+        (89.99, "DAMAGE LIMIT"),
+        (90.0, "RECOVERY ROOM"),      # -10%
+        (100.0, "CAPITAL PROTECT"),   # 0%
+        (105.0, "PROFIT LOCK +2%"),   # +5%
+        (149.99, "PROFIT LOCK +20%"),
+        (150.0, "PROFIT LOCK +35%"),  # +50%
+    ])
+    def test_protection_tier_boundaries(self, monitor, traded_price, expected):
+        """Each tier starts at its threshold (inclusive)."""
+        monitor = monitor[0]
+        holding = Holding(
+            security_id="12345", trading_symbol="TATSILV", exchange="NSE",
+            isin="INF277KA1984", total_qty=10, dp_qty=10, t1_qty=0,
+            available_qty=10, avg_cost_price=100.0, collateral_qty=0,
+        )
+        order = {**_sl_order("ORD1", "TRADED"), "tradedPrice": traded_price}
+
+        record = monitor._log_trigger(order, {"12345": holding})
+
+        assert record["protection_tier"] == expected
+
+
+# Integration test (requires real credentials); run with: pytest -m integration
+@pytest.mark.integration
 class TestIntegration:
     """Integration tests - require real API credentials."""
 
-    @pytest.mark.skip(reason="Requires real API credentials")
     def test_real_holdings_fetch(self):
         """Test with real Dhan API."""
-        from dhan_tracker.config import DhanConfig
-        from dhan_tracker.client import DhanClient
-
         config = DhanConfig.from_file()
         client = DhanClient(config)
         holdings = client.get_holdings()
 
         assert isinstance(holdings, list)
 
-    @pytest.mark.skip(reason="Requires real API credentials")
     def test_real_nse_ltp(self):
         """Test with real NSE API."""
-        from dhan_tracker.nse_client import NSEClient
-
         with NSEClient() as nse:
             ltp = nse.get_ltp("TATSILV")
             assert ltp > 0